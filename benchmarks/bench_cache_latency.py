@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for the in-process backend cache
+Times repeated calendar reads and habit lookups of a long-lived tracker
+with and without the cache, and reports the cache's hit rate
+
+Usage: python benchmarks/bench_cache_latency.py [habits] [repeats]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from habit_tracker import HabitTracker
+
+
+def build_habits(db_path: str, habits: int):
+    """Create habits with 30 days of history each."""
+    tracker = HabitTracker(db_path)
+    today = datetime.now().date()
+    conn = tracker.backend.connect()
+    with conn:
+        conn.executemany('INSERT INTO habits (name) VALUES (?)', [(f"Habit {i}",) for i in range(1, habits + 1)])
+        conn.executemany('INSERT INTO tracking (habit_id, date, done) VALUES (?, ?, ?)',
+                         [(habit_id, (today - timedelta(days=day)).strftime('%Y-%m-%d'), (habit_id + day) % 3 != 0)
+                          for habit_id in range(1, habits + 1) for day in range(30)])
+    conn.close()
+
+
+def calendar_reads(tracker: HabitTracker):
+    """The reads behind one calendar view, without the streaks or printing."""
+    dates = tracker._calendar_dates()
+    for habit_id, _ in tracker.get_habits():
+        tracker.get_tracking_data(habit_id, dates)
+    tracker.get_schedules()
+
+
+def lookups(tracker: HabitTracker):
+    """The habit lookups behind a batch of quick-tracking commands."""
+    for habit_id, habit_name in tracker.get_habits():
+        tracker.backend.get_habit_name(habit_id)
+        tracker.backend.find_habit_id(habit_name)
+
+
+def time_per_call(func, repeats: int) -> float:
+    """Return the mean time per call in milliseconds, after one warm-up call."""
+    func()
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - started) / repeats * 1000
+
+
+def main():
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench_cache.db")
+        build_habits(db_path, habits)
+        plain = HabitTracker(db_path)
+        cached = HabitTracker(db_path, cache_size=4 * habits)
+
+        print(f"{'Workload':<16} {'Uncached':>12} {'Cached':>12} {'Speedup':>8}")
+        print("-" * 52)
+        for name, func in [('calendar reads', calendar_reads), ('habit lookups', lookups)]:
+            before = time_per_call(lambda: func(plain), repeats)
+            after = time_per_call(lambda: func(cached), repeats)
+            print(f"{name:<16} {before:>9.2f} ms {after:>9.2f} ms {before / after:>7.1f}x")
+
+        # A write from another connection invalidates the cache
+        HabitTracker(db_path).backend.upsert_tracking(1, datetime.now().strftime('%Y-%m-%d'), True)
+        calendar_reads(cached)
+        stats = cached.backend.cache_stats()
+        total = stats['hits'] + stats['misses']
+        print(f"\n{habits} habits, {repeats} repeats: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hits'] / total:.1%} hit rate), {stats['invalidations']} invalidations")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Load test for the serve-http JSON API
+Starts a local instance on a temporary database and measures requests per
+second for full calendar responses and for conditional polls answered with
+304 Not Modified, with several concurrent keep-alive clients
+
+Usage: python benchmarks/bench_http_load.py [habits] [seconds] [clients]
+"""
+
+import http.client
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from habit_tracker import HabitTracker, make_http_server
+
+
+def build_habits(db_path: str, habits: int):
+    """Create habits with 30 days of history each."""
+    tracker = HabitTracker(db_path)
+    today = datetime.now().date()
+    conn = tracker.backend.connect()
+    with conn:
+        conn.executemany('INSERT INTO habits (name) VALUES (?)', [(f"Habit {i}",) for i in range(1, habits + 1)])
+        conn.executemany('INSERT INTO tracking (habit_id, date, done) VALUES (?, ?, ?)',
+                         [(habit_id, (today - timedelta(days=day)).strftime('%Y-%m-%d'), (habit_id + day) % 3 != 0)
+                          for habit_id in range(1, habits + 1) for day in range(30)])
+    conn.close()
+
+
+def run_clients(port: int, path: str, conditional: bool, seconds: float, clients: int):
+    """Poll path from several clients for a number of seconds; return (requests, statuses)."""
+    counts = []
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        statuses = {}
+        etag = None
+        while time.perf_counter() < deadline:
+            headers = {'If-None-Match': etag} if conditional and etag else {}
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            etag = response.getheader('ETag') or etag
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+        conn.close()
+        counts.append(statuses)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    totals = {}
+    for statuses in counts:
+        for status, count in statuses.items():
+            totals[status] = totals.get(status, 0) + count
+    return sum(totals.values()), totals
+
+
+def main():
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+    clients = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench_http.db")
+        build_habits(db_path, habits)
+        server = make_http_server(HabitTracker(db_path), port=0, quiet=True)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        port = server.server_address[1]
+
+        print(f"{habits} habits, {clients} clients, {seconds:g} s per run")
+        print(f"{'Workload':<28} {'Requests':>9} {'Req/s':>9}  Statuses")
+        print("-" * 64)
+        for name, path, conditional in [('calendar, full responses', '/calendar', False),
+                                        ('calendar, conditional polls', '/calendar', True),
+                                        ('habits, full responses', '/habits', False),
+                                        ('habits, conditional polls', '/habits', True)]:
+            requests, statuses = run_clients(port, path, conditional, seconds, clients)
+            status_text = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+            print(f"{name:<28} {requests:>9} {requests / seconds:>9.0f}  {status_text}")
+
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for parallel streak recomputation
+Times the recompute command over many habits with years of history for
+growing numbers of worker processes, up to the number of CPUs
+
+Usage: python benchmarks/bench_recompute_scaling.py [habits] [days]
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from habit_tracker import HabitTracker
+
+
+def build_history(db_path: str, habits: int, days: int):
+    """Create habits with days of history each, one missed day in seven."""
+    tracker = HabitTracker(db_path)
+    today = datetime.now().date()
+    dates = [(today - timedelta(days=day)).strftime('%Y-%m-%d') for day in range(days)]
+    conn = tracker.backend.connect()
+    with conn:
+        conn.executemany('INSERT INTO habits (name) VALUES (?)', [(f"Habit {i}",) for i in range(1, habits + 1)])
+        for habit_id in range(1, habits + 1):
+            conn.executemany('INSERT INTO tracking (habit_id, date, done) VALUES (?, ?, ?)',
+                             [(habit_id, date, (habit_id + day) % 7 != 0) for day, date in enumerate(dates)])
+    conn.close()
+
+
+def main():
+    habits = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 365
+    cpus = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "bench_recompute.db")
+        build_history(db_path, habits, days)
+        tracker = HabitTracker(db_path)
+
+        print(f"{habits} habits x {days} days, {cpus} CPUs")
+        print(f"{'Workers':>7} {'Time':>10} {'Speedup':>8}")
+        print("-" * 28)
+        baseline = None
+        workers = 1
+        while True:
+            started = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                tracker.recompute_streaks(workers)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"{workers:>7} {elapsed:>8.2f} s {baseline / elapsed:>7.2f}x")
+            if workers >= cpus:
+                break
+            workers = min(workers * 2, cpus)
+
+
+if __name__ == "__main__":
+    main()
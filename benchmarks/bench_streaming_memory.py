@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for streaming tracking reads
+Compares the peak Python memory of streak calculations over materialized
+and streamed tracking history, for growing history lengths
+
+Usage: python benchmarks/bench_streaming_memory.py [years ...]
+"""
+
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from habit_schedule import Schedule, streaks_from_dates
+from habit_tracker import HabitTracker
+
+
+def build_history(tracker: HabitTracker, years: int) -> int:
+    """Fill habit 1 with years of daily history, one missed day in seven."""
+    today = datetime.now().date()
+    rows = [((today - timedelta(days=i)).strftime('%Y-%m-%d'), i % 7 != 3) for i in range(years * 365)]
+    conn = tracker.backend.connect()
+    with conn:
+        conn.executemany('INSERT INTO tracking (habit_id, date, done) VALUES (1, ?, ?)', rows)
+    conn.close()
+    return len(rows)
+
+
+def peak_memory(func) -> int:
+    """Return the peak traced memory in bytes while running func."""
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def materialized(tracker: HabitTracker):
+    """Streaks computed the pre-streaming way: the whole history as a list."""
+    done_dates = [datetime.strptime(date, '%Y-%m-%d').date() for date in tracker.backend.get_done_dates(1)]
+    return streaks_from_dates(done_dates, datetime.now().date(), Schedule())
+
+
+def main():
+    years_list = [int(arg) for arg in sys.argv[1:]] or [1, 10, 40]
+    print(f"{'Years':>5} {'Rows':>8} {'Materialized':>14} {'Streamed':>10}")
+    print("-" * 40)
+    with tempfile.TemporaryDirectory() as directory:
+        for years in years_list:
+            tracker = HabitTracker(os.path.join(directory, f"bench_{years}.db"))
+            tracker.backend.add_habit("Benchmark")
+            rows = build_history(tracker, years)
+
+            # Both paths must agree before their memory use is compared
+            assert tracker.calculate_streaks(1) == materialized(tracker)
+            before = peak_memory(lambda: materialized(tracker))
+            after = peak_memory(lambda: tracker.calculate_streaks(1))
+            print(f"{years:>5} {rows:>8} {before / 1024:>10.1f} KiB {after / 1024:>6.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
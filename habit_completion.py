@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Shell completion helper for the Habit Tracker
+Prefix lookups over a precomputed habit name index, without importing sqlite3
+
+Usage: habit_completion.py <index file> <word being completed>
+"""
+
+import os
+import sys
+from bisect import bisect_left
+from typing import List, Tuple
+
+# The index lives next to the database: habits.db -> habits.db.complete
+INDEX_SUFFIX = '.complete'
+
+# Upper bound on the number of suggestions printed for one Tab press
+MAX_MATCHES = 50
+
+
+def index_path(db_path: str) -> str:
+    """Return the completion index path for a database path."""
+    return db_path + INDEX_SUFFIX
+
+
+def write_index(path: str, habits: List[Tuple[int, str]]):
+    """Atomically write the index: one 'key<TAB>name<TAB>id' line per habit, sorted by key.
+
+    The key is the lower-cased name, so lookups are case-insensitive.
+    """
+    # Imported here so that lookups, which never write, stay fast to start
+    import tempfile
+
+    # Names that would break the line format cannot be completed anyway
+    lines = sorted(f"{name.lower()}\t{name}\t{habit_id}\n" for habit_id, name in habits
+                   if '\t' not in name and '\n' not in name)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.habit_complete_', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as tmp_file:
+            tmp_file.writelines(lines)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_index(path: str) -> List[Tuple[str, str, int]]:
+    """Load the index as sorted (key, name, id) tuples."""
+    entries = []
+    with open(path, encoding='utf-8') as index_file:
+        for line in index_file:
+            key, name, habit_id = line.rstrip('\n').split('\t')
+            entries.append((key, name, int(habit_id)))
+    return entries
+
+
+def match_names(entries: List[Tuple[str, str, int]], prefix: str, limit: int = MAX_MATCHES) -> List[str]:
+    """Return habit names starting with prefix (case-insensitive), in index order."""
+    key_prefix = prefix.lower()
+    matches = []
+    for key, name, _ in entries[bisect_left(entries, (key_prefix,)):]:
+        if not key.startswith(key_prefix) or len(matches) >= limit:
+            break
+        matches.append(name)
+    return matches
+
+
+def complete(path: str, word: str, limit: int = MAX_MATCHES) -> List[str]:
+    """Return completions for a command line word.
+
+    Handles the +<habit>/-<habit> short commands and comma-separated
+    lists such as 'rm Exercise,Rea'.
+    """
+    marker = word[:1] if word[:1] in ('+', '-') else ''
+    head, comma, prefix = word[len(marker):].rpartition(',')
+    lead = marker + head + comma
+    try:
+        entries = load_index(path)
+    except (OSError, ValueError):
+        return []
+    return [lead + name for name in match_names(entries, prefix, limit)]
+
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        sys.exit(2)
+    for completion in complete(sys.argv[1], sys.argv[2]):
+        print(completion)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Habit schedules for the Habit Tracker
+Schedule parsing and a period-based streak engine
+"""
+
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Iterable, List, Optional, Tuple
+
+WEEKDAYS = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+WEEKDAY_NAMES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+# Schedule of habits that never had one set
+DAILY = 'daily'
+
+# Upper bound of N in 'N/week' and 'N/month' schedules
+MAX_TARGETS = {'week': 7, 'month': 31}
+
+
+class Schedule:
+    """A parsed habit schedule.
+
+    Specs are 'daily', a list of weekdays such as 'mon,wed,fri', or a
+    target such as '3/week' or '10/month'. Streaks are counted in periods:
+    days for daily habits, scheduled days for weekday lists, and weeks or
+    months for targets. Every period is numbered so that consecutive
+    periods have consecutive numbers.
+    """
+
+    def __init__(self, spec: str = DAILY):
+        """Parse a schedule spec, raising ValueError if it is invalid."""
+        spec = spec.strip().lower().replace(' ', '')
+        self.weekdays = None    # scheduled weekday numbers (Monday is 0)
+        self.unit = 'day'
+        self.target = 1
+        if spec in ('', DAILY):
+            self.spec = DAILY
+        elif '/' in spec:
+            count, _, unit = spec.partition('/')
+            if unit not in MAX_TARGETS or not count.isdigit() or not 1 <= int(count) <= MAX_TARGETS[unit]:
+                raise ValueError(f"Invalid schedule '{spec}'. Use N/week (1-7) or N/month (1-31).")
+            self.unit = unit
+            self.target = int(count)
+            self.spec = f"{self.target}/{unit}"
+        else:
+            weekdays = set()
+            for name in spec.split(','):
+                # Accept abbreviations of at least three letters ('wed', 'wednes')
+                if len(name) < 3 or not any(full_name.startswith(name) for full_name in WEEKDAY_NAMES):
+                    raise ValueError(f"Invalid weekday '{name}' in schedule. Use names such as mon,wed,fri.")
+                weekdays.add(WEEKDAYS.index(name[:3]))
+            self.weekdays = sorted(weekdays)
+            self.spec = ','.join(WEEKDAYS[day] for day in self.weekdays)
+            # Number of scheduled weekdays before each weekday
+            self._rank = [sum(1 for day in self.weekdays if day < weekday) for weekday in range(7)]
+
+    def __str__(self) -> str:
+        return self.spec
+
+    @property
+    def is_daily(self) -> bool:
+        return self.spec == DAILY
+
+    def is_scheduled(self, day: date) -> bool:
+        """Return whether done marks on this day count towards the schedule."""
+        return self.weekdays is None or day.weekday() in self.weekdays
+
+    def period(self, day: date) -> int:
+        """Return the number of the period a day belongs to.
+
+        For weekday lists, unscheduled days map to the next scheduled day.
+        """
+        if self.unit == 'month':
+            return day.year * 12 + day.month - 1
+        ordinal = day.toordinal() - 1  # Day 0 (0001-01-01) is a Monday
+        if self.unit == 'week':
+            return ordinal // 7
+        if self.weekdays is not None:
+            return ordinal // 7 * len(self.weekdays) + self._rank[ordinal % 7]
+        return ordinal
+
+    def period_bounds(self, day: date) -> Tuple[date, date]:
+        """Return the first and last day of the week or month containing a day."""
+        if self.unit == 'month':
+            start = day.replace(day=1)
+            end = (start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+            return start, end
+        if self.unit == 'week':
+            start = day - timedelta(days=day.weekday())
+            return start, start + timedelta(days=6)
+        return day, day
+
+    def completion_rate(self, done_dates: Iterable[date], window: List[date]) -> float:
+        """Return the share of the expected done days achieved within a window of days."""
+        done = sum(1 for day in done_dates if window[0] <= day <= window[-1] and self.is_scheduled(day))
+        if self.is_daily:
+            return done / len(window)
+        if self.weekdays is not None:
+            expected = sum(1 for day in window if self.is_scheduled(day))
+        elif self.unit == 'week':
+            expected = self.target * len(window) / 7
+        else:
+            expected = self.target * len(window) * 12 / 365.25
+        return min(1.0, done / expected) if expected else 0.0
+
+
+def streaks_from_dates(done_dates: Iterable[date], today: Optional[date],
+                       schedule: Schedule) -> Tuple[int, int]:
+    """Return (current streak, longest streak) in periods from sorted done dates.
+
+    One pass buckets the done dates by period; a period is met once it has
+    as many done days as the schedule's target. The current streak is the
+    run of met periods ending at today's period. Daily habits must be done
+    today to have a current streak; for other schedules the period in
+    progress does not break the streak until it is over.
+    """
+    today_period = schedule.period(today) if today else None
+    grace = not schedule.is_daily
+    current = longest = run = 0
+    previous = None
+    scheduled = (day for day in done_dates if schedule.is_scheduled(day))
+    for period, days in groupby(scheduled, key=schedule.period):
+        if sum(1 for _ in days) < schedule.target:
+            continue
+        run = run + 1 if previous is not None and period == previous + 1 else 1
+        previous = period
+        longest = max(longest, run)
+        if period == today_period or (grace and today_period is not None and period == today_period - 1):
+            current = run
+    return current, longest
+
+
+def streak_runs(done_dates: Iterable[date], schedule: Schedule) -> Tuple[int, Optional[int], int]:
+    """Return (longest streak, last met period, length of the run ending at it).
+
+    These do not depend on the current date, so they can be stored and the
+    current streak derived later with current_streak_from_run.
+    """
+    longest = run = 0
+    previous = None
+    scheduled = (day for day in done_dates if schedule.is_scheduled(day))
+    for period, days in groupby(scheduled, key=schedule.period):
+        if sum(1 for _ in days) < schedule.target:
+            continue
+        run = run + 1 if previous is not None and period == previous + 1 else 1
+        previous = period
+        longest = max(longest, run)
+    return longest, previous, run
+
+
+def current_streak_from_run(schedule: Schedule, today: date, last_period: Optional[int], last_run: int) -> int:
+    """Derive the current streak from the last met period and its run length.
+
+    Gives the same result as streaks_from_dates as long as no period after
+    today's has been met.
+    """
+    if last_period is None:
+        return 0
+    today_period = schedule.period(today)
+    if last_period == today_period or (not schedule.is_daily and last_period == today_period - 1):
+        return last_run
+    return 0
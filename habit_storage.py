@@ -0,0 +1,1541 @@
+#!/usr/bin/env python3
+"""
+Storage backends for the Habit Tracker
+Habit and tracking persistence behind a small common interface
+"""
+
+import heapq
+import os
+import sqlite3
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import groupby
+from typing import Dict, Iterator, List, Optional, Protocol, Set, Tuple
+from urllib.parse import quote
+
+
+class StorageError(Exception):
+    """Raised when a storage backend cannot complete an operation."""
+
+
+class DuplicateHabitError(StorageError):
+    """Raised when adding a habit whose name already exists."""
+
+
+def _mask_to_days(mask: int):
+    """Yield the day numbers (1-31) whose bits are set in a monthly bitmask."""
+    day = 1
+    while mask:
+        if mask & 1:
+            yield day
+        mask >>= 1
+        day += 1
+
+
+def _merge_done_dates(rollups, raw_rows) -> List[str]:
+    """Merge rolled-up (month, done_mask) rows and raw (date, done) rows into sorted done dates.
+
+    Raw rows take precedence, since they were written after the rollup.
+    """
+    if not rollups:
+        return [date for date, done in raw_rows if done]
+
+    statuses = {}
+    for month, done_mask in rollups:
+        for day in _mask_to_days(done_mask):
+            statuses[f"{month}-{day:02d}"] = 1
+    for date, done in raw_rows:
+        statuses[date] = done
+    return sorted(date for date, done in statuses.items() if done)
+
+
+def _iter_chunks(cursor: sqlite3.Cursor, chunk_size: int) -> Iterator[tuple]:
+    """Yield a cursor's rows, fetching chunk_size rows at a time."""
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _iter_rollup_days(rollups) -> Iterator[Tuple[str, int]]:
+    """Expand (month, done_mask, tracked_mask) rows into (date, status) pairs in date order."""
+    for month, done_mask, tracked_mask in rollups:
+        for day in _mask_to_days(tracked_mask):
+            yield f"{month}-{day:02d}", 1 if done_mask & (1 << (day - 1)) else 0
+
+
+def _rollup_status_sql(row: str, column: str) -> str:
+    """SQL for the rolled-up status (1/0, or NULL if not rolled up) of a tracking row's day."""
+    bit = f"(CAST(substr({row}.date, 9, 2) AS INTEGER) - 1)"
+    return f'''(SELECT ({column} >> {bit}) & 1 FROM tracking_rollup
+              WHERE habit_id = {row}.habit_id AND month = substr({row}.date, 1, 7)
+                AND (tracked_mask >> {bit}) & 1)'''
+
+
+def _daily_totals_triggers() -> List[str]:
+    """SQL creating the triggers that keep daily_totals in step with the tracking table.
+
+    A raw row overrides a rolled-up day of the same habit, so writing one
+    swaps the rolled-up status for the raw one, and deleting one brings
+    the rolled-up status back.
+    """
+    def add(row, sign):
+        status = _rollup_status_sql(row, 'done_mask')
+        return f'''
+            INSERT INTO daily_totals (date, done, tracked)
+            VALUES ({row}.date,
+                    {sign}({row}.done - IFNULL({status}, 0)),
+                    {sign}(1 - ({status} IS NOT NULL)))
+            ON CONFLICT(date) DO UPDATE SET
+                done = done + excluded.done,
+                tracked = tracked + excluded.tracked;'''
+
+    prune = "DELETE FROM daily_totals WHERE date = OLD.date AND tracked = 0;"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS daily_totals_insert AFTER INSERT ON tracking BEGIN {add('NEW', '+')} END",
+        f"CREATE TRIGGER IF NOT EXISTS daily_totals_delete AFTER DELETE ON tracking BEGIN {add('OLD', '-')} {prune} END",
+        f"CREATE TRIGGER IF NOT EXISTS daily_totals_update AFTER UPDATE ON tracking BEGIN "
+        f"{add('OLD', '-')} {add('NEW', '+')} {prune} END",
+    ]
+
+
+# Triggers dropping a habit's precomputed streak statistics whenever its data changes
+_HABIT_STATS_TRIGGERS = [
+    f"CREATE TRIGGER IF NOT EXISTS habit_stats_{name} AFTER {event} ON {table} "
+    f"BEGIN DELETE FROM habit_stats WHERE {condition}; END"
+    for name, event, table, condition in [
+        ('tracking_insert', 'INSERT', 'tracking', 'habit_id = NEW.habit_id'),
+        ('tracking_delete', 'DELETE', 'tracking', 'habit_id = OLD.habit_id'),
+        ('tracking_update', 'UPDATE', 'tracking', 'habit_id IN (OLD.habit_id, NEW.habit_id)'),
+        ('schedule_update', 'UPDATE OF schedule', 'habits', 'habit_id = NEW.id'),
+        ('habit_delete', 'DELETE', 'habits', 'habit_id = OLD.id'),
+    ]
+]
+
+
+# Modulus of the per-month content digests kept in tracking_digest
+DIGEST_MODULUS = 2147483647
+
+
+def _row_digest_sql(row: str) -> str:
+    """SQL for a tracking row's contribution to its month's digest.
+
+    The digest of a month is the sum of its rows' contributions, so it is
+    kept up to date by adding and subtracting rows. Squaring mixes the
+    day, status and update time of each row.
+    """
+    mixed = (f"((CAST(substr({row}.date, 9, 2) AS INTEGER) * 1000003 + {row}.done * 7919 + {row}.updated_at)"
+             f" % {DIGEST_MODULUS})")
+    return f"({mixed} * {mixed} % {DIGEST_MODULUS})"
+
+
+def _tracking_digest_triggers() -> List[str]:
+    """SQL creating the triggers that keep tracking_digest in step with the tracking table."""
+    def add(row, sign):
+        digest = _row_digest_sql(row) if sign == '+' else f"({DIGEST_MODULUS} - {_row_digest_sql(row)})"
+        return f'''
+            INSERT INTO tracking_digest (habit_id, month, digest, rows)
+            VALUES ({row}.habit_id, substr({row}.date, 1, 7), {digest}, {sign}1)
+            ON CONFLICT(habit_id, month) DO UPDATE SET
+                digest = (digest + excluded.digest) % {DIGEST_MODULUS},
+                rows = rows + excluded.rows;'''
+
+    prune = "DELETE FROM tracking_digest WHERE habit_id = OLD.habit_id AND month = substr(OLD.date, 1, 7) AND rows = 0;"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS tracking_digest_insert AFTER INSERT ON tracking BEGIN {add('NEW', '+')} END",
+        f"CREATE TRIGGER IF NOT EXISTS tracking_digest_delete AFTER DELETE ON tracking BEGIN {add('OLD', '-')} {prune} END",
+        f"CREATE TRIGGER IF NOT EXISTS tracking_digest_update AFTER UPDATE ON tracking BEGIN "
+        f"{add('OLD', '-')} {add('NEW', '+')} {prune} END",
+    ]
+
+
+# Grouping of daily totals for the summary view: SQL over daily_totals.date, and the Python equivalent
+TOTALS_PERIODS = {
+    'day': ("date", lambda date: date),
+    'week': ("strftime('%Y-W%W', date)", lambda date: datetime.strptime(date, '%Y-%m-%d').strftime('%Y-W%W')),
+    'month': ("substr(date, 1, 7)", lambda date: date[:7]),
+    'year': ("substr(date, 1, 4)", lambda date: date[:4]),
+}
+
+
+class StorageBackend(Protocol):
+    """Operations the HabitTracker needs from a storage backend.
+
+    Dates are ISO 'YYYY-MM-DD' strings and tracking statuses are 1 (done)
+    or 0 (not done); dates that were never tracked are simply absent.
+    """
+
+    def add_habit(self, name: str) -> int:
+        """Add a habit and return its ID; raise DuplicateHabitError if the name exists."""
+
+    def remove_habit(self, habit_id: int) -> bool:
+        """Remove a habit and its tracking history; return False if it does not exist."""
+
+    def get_habit_name(self, habit_id: int) -> Optional[str]:
+        """Return the name of a habit, or None if it does not exist."""
+
+    def find_habit_id(self, name: str) -> Optional[int]:
+        """Return the ID of the habit with this exact name, or None."""
+
+    def list_habits(self, tag: str = None) -> List[Tuple[int, str]]:
+        """Return all habits (or those with the tag) as (id, name) pairs ordered by ID."""
+
+    def get_schedule(self, habit_id: int) -> Optional[str]:
+        """Return the schedule spec of a habit."""
+
+    def get_schedules(self) -> Dict[int, str]:
+        """Return {habit_id: schedule spec} for all habits."""
+
+    def set_schedule(self, habit_id: int, schedule: str) -> bool:
+        """Set the schedule spec of a habit; return False if it does not exist."""
+
+    def get_reminders(self) -> Dict[int, str]:
+        """Return {habit_id: 'HH:MM' reminder time} for habits that have a reminder."""
+
+    def get_tags(self) -> Dict[int, List[str]]:
+        """Return {habit_id: sorted tags} for habits that have tags."""
+
+    def tag_habits(self, habit_ids: List[int], tag: str) -> int:
+        """Add a tag to habits; return the number of habits newly tagged."""
+
+    def untag_habits(self, habit_ids: List[int], tag: str) -> int:
+        """Remove a tag from habits; return the number of habits untagged."""
+
+    def upsert_tracking_for_tag(self, tag: str, date: str, done: bool) -> List[int]:
+        """Set the tracking status of every habit with the tag for a date in one
+        transaction; return the IDs of the habits marked."""
+
+    def set_reminder(self, habit_id: int, remind_at: Optional[str]) -> bool:
+        """Set (or clear, with None) the reminder time of a habit; return False if it does not exist."""
+
+    def get_setting(self, key: str) -> Optional[str]:
+        """Return a stored setting, or None if it was never set."""
+
+    def set_setting(self, key: str, value: str):
+        """Store a setting."""
+
+    def upsert_tracking(self, habit_id: int, date: str, done: bool):
+        """Insert or replace the tracking status of a habit for a date."""
+
+    def get_tracking(self, habit_id: int, dates: List[str]) -> Dict[str, int]:
+        """Return {date: status} for the tracked dates among the given ones."""
+
+    def get_tracking_range(self, habit_id: int, start: str, end: str) -> List[Tuple[str, int]]:
+        """Return (date, status) pairs between start and end inclusive, sorted by date."""
+
+    def get_done_dates(self, habit_id: int) -> List[str]:
+        """Return the full history of done dates for a habit, sorted."""
+
+    def iter_tracking(self, habit_id: int, start: str = None, end: str = None,
+                      chunk_size: int = None) -> Iterator[Tuple[str, int]]:
+        """Yield (date, status) pairs in date order, optionally between start and end inclusive.
+
+        Rows are streamed in chunks of chunk_size, so memory use does not
+        grow with the length of the history.
+        """
+
+    def iter_done_dates(self, habit_id: int, chunk_size: int = None) -> Iterator[str]:
+        """Yield all done dates for a habit in order, streamed like iter_tracking."""
+
+    def iter_done_dates_by_habit(self, tag: str = None,
+                                 id_range: Tuple[int, int] = None) -> Iterator[Tuple[int, List[str]]]:
+        """Yield (habit_id, sorted done dates) for every habit (or every habit with
+        the tag, or with an ID in the inclusive id_range) with tracking history."""
+
+    def get_tracking_for_date(self, date: str) -> Dict[int, int]:
+        """Return {habit_id: status} for every habit tracked on a date."""
+
+    def tracking_changes_since(self, marker: Optional[int]) -> Tuple[int, Set[int]]:
+        """Return a new change marker and the IDs of habits whose tracking rows
+        were written after the given marker (None returns no changes)."""
+
+    def get_done_dates_since(self, start: str) -> Dict[int, List[str]]:
+        """Return {habit_id: sorted done dates on or after start} for habits done since then."""
+
+    def get_habit_stats(self) -> Dict[int, Tuple[int, Optional[int], int]]:
+        """Return {habit_id: (longest, last met period, last run length)} for up-to-date habits."""
+
+    def put_habit_stats(self, rows: List[Tuple[int, str, int, Optional[int], int]], marker: int):
+        """Store (habit_id, schedule, longest, last met period, last run length) rows in one batch.
+
+        marker is the tracking_changes_since marker taken before the rows
+        were computed. Rows of habits written to since then, removed, or
+        rescheduled away from the given schedule are dropped as stale.
+        """
+
+    def top_longest(self, limit: int = None, ascending: bool = False) -> List[Tuple[int, int]]:
+        """Return (habit_id, longest streak) ranked by stored longest streak, ties by ID."""
+
+    def get_completion_totals(self, period: str = 'month') -> List[Tuple[str, int, int]]:
+        """Return (period, done count, tracked count) across all habits, oldest first.
+
+        period is one of TOTALS_PERIODS ('day', 'week', 'month' or 'year').
+        """
+
+    def rebuild_daily_totals(self) -> int:
+        """Recompute the per-day totals from the tracking data; return the number of days."""
+
+    def data_version(self) -> int:
+        """Return a value that changes whenever the stored data changes."""
+
+
+class SQLiteBackend:
+    """Storage backend keeping habits in a SQLite database file."""
+
+    # Rows fetched per round trip by the streaming iter_* reads
+    FETCH_CHUNK_SIZE = 256
+
+    # Pages copied per step of an online backup, and the pause between steps
+    BACKUP_PAGES = 64
+    BACKUP_SLEEP = 0.01
+
+    def __init__(self, db_path: str = "habits.db", read_only: bool = False):
+        """Initialize the backend and create the database schema if needed.
+
+        A read-only backend opens the file with mode=ro and leaves the
+        schema alone, for readers such as recompute workers.
+        """
+        self.db_path = db_path
+        self.read_only = read_only
+        self._monitor = None
+        if not read_only:
+            self.init_db()
+
+    def connect(self) -> sqlite3.Connection:
+        """Create and return a new database connection."""
+        if self.read_only:
+            conn = sqlite3.connect(f'file:{quote(os.path.abspath(self.db_path))}?mode=ro', uri=True)
+        else:
+            conn = sqlite3.connect(self.db_path)
+        # INSERT OR REPLACE only fires the delete trigger that keeps
+        # daily_totals in step when recursive triggers are on
+        conn.execute('PRAGMA recursive_triggers = ON')
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        """Yield a connection wrapped in a transaction, then close it."""
+        conn = self.connect()
+        try:
+            with conn:
+                yield conn
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+        finally:
+            conn.close()
+
+    def init_db(self):
+        """Initialize the database with required tables."""
+        with self._transaction() as conn:
+            # Only takes effect on a new database; existing ones are
+            # switched over by 'maintain --vacuum full'. Setting it on an
+            # existing file would still count as a write, so it is only
+            # issued while the file is empty.
+            if conn.execute('PRAGMA page_count').fetchone()[0] == 0:
+                conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+
+            # Create habits table
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS habits (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    schedule TEXT NOT NULL DEFAULT 'daily',
+                    remind_at TEXT
+                )
+            ''')
+
+            # Databases created before schedules and reminders existed get the columns added
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(habits)')}
+            if 'schedule' not in columns:
+                conn.execute("ALTER TABLE habits ADD COLUMN schedule TEXT NOT NULL DEFAULT 'daily'")
+            if 'remind_at' not in columns:
+                conn.execute("ALTER TABLE habits ADD COLUMN remind_at TEXT")
+
+            # Create habit tags, looked up by tag for filters and by habit on removal
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS habit_tags (
+                    tag TEXT NOT NULL,
+                    habit_id INTEGER NOT NULL,
+                    FOREIGN KEY (habit_id) REFERENCES habits (id),
+                    PRIMARY KEY (tag, habit_id)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_habit_tags_habit ON habit_tags (habit_id)')
+
+            # Create tracking table
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS tracking (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    habit_id INTEGER,
+                    date TEXT NOT NULL,
+                    done BOOLEAN NOT NULL,
+                    updated_at INTEGER NOT NULL DEFAULT 0,
+                    FOREIGN KEY (habit_id) REFERENCES habits (id),
+                    UNIQUE(habit_id, date)
+                )
+            ''')
+
+            # Databases created before sync existed get the write time column
+            # (milliseconds since the epoch, 0 for rows written before then)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(tracking)')}
+            if 'updated_at' not in columns:
+                conn.execute("ALTER TABLE tracking ADD COLUMN updated_at INTEGER NOT NULL DEFAULT 0")
+
+            # Index for reads across all habits on one date
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_tracking_date ON tracking (date)')
+
+            # Create monthly rollup table for old tracking rows. Bit (day - 1)
+            # of tracked_mask is set when the day was tracked at all, and of
+            # done_mask when it was tracked as done.
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS tracking_rollup (
+                    habit_id INTEGER NOT NULL,
+                    month TEXT NOT NULL,
+                    done_mask INTEGER NOT NULL,
+                    tracked_mask INTEGER NOT NULL,
+                    FOREIGN KEY (habit_id) REFERENCES habits (id),
+                    PRIMARY KEY (habit_id, month)
+                )
+            ''')
+
+            # Create per-day totals across all habits, kept up to date by
+            # triggers on tracking and backfilled when the table is new
+            is_new = not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_totals'").fetchone()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS daily_totals (
+                    date TEXT PRIMARY KEY,
+                    done INTEGER NOT NULL,
+                    tracked INTEGER NOT NULL
+                ) WITHOUT ROWID
+            ''')
+            for trigger in _daily_totals_triggers():
+                conn.execute(trigger)
+            if is_new:
+                self._rebuild_daily_totals(conn)
+
+            # Create precomputed streak statistics, dropped by triggers when
+            # a habit's data changes and recomputed on demand. last_period is
+            # the habit's last period (in its schedule) that met the target
+            # and last_run the length of the run ending there.
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS habit_stats (
+                    habit_id INTEGER PRIMARY KEY,
+                    longest INTEGER NOT NULL,
+                    last_period INTEGER,
+                    last_run INTEGER NOT NULL,
+                    FOREIGN KEY (habit_id) REFERENCES habits (id)
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_habit_stats_longest ON habit_stats (longest, habit_id)')
+            for trigger in _HABIT_STATS_TRIGGERS:
+                conn.execute(trigger)
+
+            # Create per-habit, per-month content digests of the raw tracking
+            # rows, kept up to date by triggers and compared by sync
+            is_new = not conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tracking_digest'").fetchone()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS tracking_digest (
+                    habit_id INTEGER NOT NULL,
+                    month TEXT NOT NULL,
+                    digest INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    PRIMARY KEY (habit_id, month)
+                ) WITHOUT ROWID
+            ''')
+            for trigger in _tracking_digest_triggers():
+                conn.execute(trigger)
+            if is_new:
+                conn.execute(f'''
+                    INSERT INTO tracking_digest (habit_id, month, digest, rows)
+                    SELECT habit_id, substr(date, 1, 7), SUM({_row_digest_sql('tracking')}) % {DIGEST_MODULUS}, COUNT(*)
+                    FROM tracking GROUP BY habit_id, substr(date, 1, 7)
+                ''')
+
+            # Create meta table (key/value bookkeeping such as write counters)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+
+    def add_habit(self, name: str) -> int:
+        """Add a habit and return its ID."""
+        with self._transaction() as conn:
+            try:
+                cursor = conn.execute('INSERT INTO habits (name) VALUES (?)', (name,))
+            except sqlite3.IntegrityError:
+                raise DuplicateHabitError(f"Habit '{name}' already exists") from None
+            self._record_write(conn)
+            return cursor.lastrowid
+
+    def remove_habit(self, habit_id: int) -> bool:
+        """Remove a habit and its tracking history."""
+        with self._transaction() as conn:
+            if not conn.execute('SELECT 1 FROM habits WHERE id = ?', (habit_id,)).fetchone():
+                return False
+
+            # Delete tracking records, then the habit. Deleting raw rows
+            # brings rolled-up days back into daily_totals, so the rolled-up
+            # days are taken out of the totals before the summaries go.
+            conn.execute('DELETE FROM tracking WHERE habit_id = ?', (habit_id,))
+            totals = {}
+            for date, done in _iter_rollup_days(conn.execute(
+                    'SELECT month, done_mask, tracked_mask FROM tracking_rollup WHERE habit_id = ?', (habit_id,))):
+                day_totals = totals.setdefault(date, [0, 0])
+                day_totals[0] += done
+                day_totals[1] += 1
+            conn.executemany('UPDATE daily_totals SET done = done - ?, tracked = tracked - ? WHERE date = ?',
+                             [(done, tracked, date) for date, (done, tracked) in totals.items()])
+            conn.execute('DELETE FROM daily_totals WHERE tracked = 0')
+            conn.execute('DELETE FROM tracking_rollup WHERE habit_id = ?', (habit_id,))
+            conn.execute('DELETE FROM habit_tags WHERE habit_id = ?', (habit_id,))
+            conn.execute('DELETE FROM habits WHERE id = ?', (habit_id,))
+            self._record_write(conn)
+            return True
+
+    def get_habit_name(self, habit_id: int) -> Optional[str]:
+        """Return the name of a habit."""
+        with self._transaction() as conn:
+            result = conn.execute('SELECT name FROM habits WHERE id = ?', (habit_id,)).fetchone()
+            return result[0] if result else None
+
+    def find_habit_id(self, name: str) -> Optional[int]:
+        """Return the ID of a habit by name, using the unique name index."""
+        with self._transaction() as conn:
+            result = conn.execute('SELECT id FROM habits WHERE name = ?', (name,)).fetchone()
+            return result[0] if result else None
+
+    def list_habits(self, tag: str = None) -> List[Tuple[int, str]]:
+        """Return all habits, or those with the tag, ordered by ID."""
+        with self._transaction() as conn:
+            if tag is None:
+                return conn.execute('SELECT id, name FROM habits ORDER BY id').fetchall()
+            return conn.execute('''
+                SELECT habits.id, habits.name FROM habit_tags
+                JOIN habits ON habits.id = habit_tags.habit_id
+                WHERE habit_tags.tag = ?
+                ORDER BY habits.id
+            ''', (tag,)).fetchall()
+
+    def get_schedule(self, habit_id: int) -> Optional[str]:
+        """Return the schedule spec of a habit."""
+        with self._transaction() as conn:
+            result = conn.execute('SELECT schedule FROM habits WHERE id = ?', (habit_id,)).fetchone()
+            return result[0] if result else None
+
+    def get_schedules(self) -> Dict[int, str]:
+        """Return the schedule specs of all habits."""
+        with self._transaction() as conn:
+            return dict(conn.execute('SELECT id, schedule FROM habits'))
+
+    def set_schedule(self, habit_id: int, schedule: str) -> bool:
+        """Set the schedule spec of a habit."""
+        with self._transaction() as conn:
+            cursor = conn.execute('UPDATE habits SET schedule = ? WHERE id = ?', (schedule, habit_id))
+            if not cursor.rowcount:
+                return False
+            self._record_write(conn)
+            return True
+
+    def get_reminders(self) -> Dict[int, str]:
+        """Return the reminder times of all habits that have one."""
+        with self._transaction() as conn:
+            return dict(conn.execute('SELECT id, remind_at FROM habits WHERE remind_at IS NOT NULL'))
+
+    def set_reminder(self, habit_id: int, remind_at: Optional[str]) -> bool:
+        """Set or clear the reminder time of a habit."""
+        with self._transaction() as conn:
+            cursor = conn.execute('UPDATE habits SET remind_at = ? WHERE id = ?', (remind_at, habit_id))
+            if not cursor.rowcount:
+                return False
+            self._record_write(conn)
+            return True
+
+    def get_setting(self, key: str) -> Optional[str]:
+        """Return a setting from the meta table."""
+        with self._transaction() as conn:
+            row = conn.execute('SELECT value FROM meta WHERE key = ?', ('setting.' + key,)).fetchone()
+            return row[0] if row else None
+
+    def set_setting(self, key: str, value: str):
+        """Store a setting in the meta table."""
+        with self._transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', ('setting.' + key, value))
+
+    def get_tags(self) -> Dict[int, List[str]]:
+        """Return the tags of all habits that have any."""
+        with self._transaction() as conn:
+            tags = {}
+            for habit_id, tag in conn.execute('SELECT habit_id, tag FROM habit_tags ORDER BY habit_id, tag'):
+                tags.setdefault(habit_id, []).append(tag)
+            return tags
+
+    def tag_habits(self, habit_ids: List[int], tag: str) -> int:
+        """Add a tag to existing habits."""
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany('''
+                INSERT OR IGNORE INTO habit_tags (tag, habit_id)
+                SELECT ?, id FROM habits WHERE id = ?
+            ''', [(tag, habit_id) for habit_id in habit_ids])
+            changed = conn.total_changes - before
+            self._record_write(conn)
+            return changed
+
+    def untag_habits(self, habit_ids: List[int], tag: str) -> int:
+        """Remove a tag from habits."""
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany('DELETE FROM habit_tags WHERE tag = ? AND habit_id = ?',
+                             [(tag, habit_id) for habit_id in habit_ids])
+            changed = conn.total_changes - before
+            self._record_write(conn)
+            return changed
+
+    def upsert_tracking_for_tag(self, tag: str, date: str, done: bool) -> List[int]:
+        """Insert or replace the tracking records of all habits with the tag in one statement."""
+        with self._transaction() as conn:
+            habit_ids = [habit_id for habit_id, in conn.execute(
+                'SELECT habit_id FROM habit_tags WHERE tag = ? ORDER BY habit_id', (tag,))]
+            conn.execute('''
+                INSERT OR REPLACE INTO tracking (habit_id, date, done, updated_at)
+                SELECT habit_id, ?, ?, ? FROM habit_tags WHERE tag = ?
+            ''', (date, done, int(time.time() * 1000), tag))
+            self._record_write(conn)
+            return habit_ids
+
+    def upsert_tracking(self, habit_id: int, date: str, done: bool):
+        """Insert or replace a tracking record."""
+        with self._transaction() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO tracking (habit_id, date, done, updated_at)
+                VALUES (?, ?, ?, ?)
+            ''', (habit_id, date, done, int(time.time() * 1000)))
+            self._record_write(conn)
+
+    def get_tracking(self, habit_id: int, dates: List[str]) -> Dict[str, int]:
+        """Return tracking statuses for specific dates, reading both tiers."""
+        with self._transaction() as conn:
+            # Create placeholders for the dates
+            placeholders = ','.join('?' * len(dates))
+            query = f'''
+                SELECT date, done FROM tracking
+                WHERE habit_id = ? AND date IN ({placeholders})
+            '''
+
+            # Convert to dictionary for easy lookup
+            tracking = {date: done for date, done in conn.execute(query, [habit_id] + dates)}
+
+            # Dates without a raw row may have been rolled up
+            missing = [date for date in dates if date not in tracking]
+            if missing:
+                months = sorted({date[:7] for date in missing})
+                placeholders = ','.join('?' * len(months))
+                rollups = {month: (done_mask, tracked_mask) for month, done_mask, tracked_mask in conn.execute(f'''
+                    SELECT month, done_mask, tracked_mask FROM tracking_rollup
+                    WHERE habit_id = ? AND month IN ({placeholders})
+                ''', [habit_id] + months)}
+                for date in missing:
+                    if date[:7] in rollups:
+                        done_mask, tracked_mask = rollups[date[:7]]
+                        bit = 1 << (int(date[8:10]) - 1)
+                        if tracked_mask & bit:
+                            tracking[date] = 1 if done_mask & bit else 0
+            return tracking
+
+    def get_tracking_range(self, habit_id: int, start: str, end: str) -> List[Tuple[str, int]]:
+        """Return tracking statuses between two dates, reading both tiers."""
+        with self._transaction() as conn:
+            statuses = {}
+            for month, done_mask, tracked_mask in conn.execute('''
+                SELECT month, done_mask, tracked_mask FROM tracking_rollup
+                WHERE habit_id = ? AND month BETWEEN ? AND ?
+            ''', (habit_id, start[:7], end[:7])):
+                for day in _mask_to_days(tracked_mask):
+                    date = f"{month}-{day:02d}"
+                    if start <= date <= end:
+                        statuses[date] = 1 if done_mask & (1 << (day - 1)) else 0
+            statuses.update(conn.execute('''
+                SELECT date, done FROM tracking
+                WHERE habit_id = ? AND date BETWEEN ? AND ?
+            ''', (habit_id, start, end)))
+            return sorted(statuses.items())
+
+    def get_done_dates(self, habit_id: int) -> List[str]:
+        """Return all done dates for a habit, reading both tiers."""
+        with self._transaction() as conn:
+            rollups = conn.execute('''
+                SELECT month, done_mask FROM tracking_rollup
+                WHERE habit_id = ?
+                ORDER BY month
+            ''', (habit_id,)).fetchall()
+
+            if not rollups:
+                query = '''
+                    SELECT date FROM tracking
+                    WHERE habit_id = ? AND done = 1
+                    ORDER BY date
+                '''
+                return [date for date, in conn.execute(query, (habit_id,))]
+
+            raw_rows = conn.execute('SELECT date, done FROM tracking WHERE habit_id = ?', (habit_id,))
+            return _merge_done_dates(rollups, raw_rows)
+
+    def iter_tracking(self, habit_id: int, start: str = None, end: str = None,
+                      chunk_size: int = None) -> Iterator[Tuple[str, int]]:
+        """Stream tracking statuses in date order, reading both tiers.
+
+        Both tiers are read in index order with fetchmany and merged
+        lazily; raw rows take precedence over rolled-up days on the same
+        date. The connection stays open until the iterator is exhausted or
+        closed.
+        """
+        chunk_size = chunk_size or self.FETCH_CHUNK_SIZE
+        start = start or '0000-00-00'
+        end = end or '9999-99-99'
+        with self._transaction() as conn:
+            rollups = conn.execute('''
+                SELECT month, done_mask, tracked_mask FROM tracking_rollup
+                WHERE habit_id = ? AND month BETWEEN ? AND ?
+                ORDER BY month
+            ''', (habit_id, start[:7], end[:7]))
+            raw_rows = conn.execute('''
+                SELECT date, done FROM tracking
+                WHERE habit_id = ? AND date BETWEEN ? AND ?
+                ORDER BY date
+            ''', (habit_id, start, end))
+
+            # Tier 0 (raw) sorts before tier 1 (rollup) on equal dates
+            merged = heapq.merge(((date, 0, done) for date, done in _iter_chunks(raw_rows, chunk_size)),
+                                 ((date, 1, done) for date, done in _iter_rollup_days(_iter_chunks(rollups, chunk_size))
+                                  if start <= date <= end))
+            previous = None
+            for date, _, done in merged:
+                if date != previous:
+                    previous = date
+                    yield date, done
+
+    def iter_done_dates(self, habit_id: int, chunk_size: int = None) -> Iterator[str]:
+        """Stream all done dates for a habit in order, reading both tiers."""
+        return (date for date, done in self.iter_tracking(habit_id, chunk_size=chunk_size) if done)
+
+    def get_tracking_for_date(self, date: str) -> Dict[int, int]:
+        """Return tracking statuses of all habits for one date, reading both tiers."""
+        with self._transaction() as conn:
+            bit = 1 << (int(date[8:10]) - 1)
+            statuses = {habit_id: 1 if done_mask & bit else 0
+                        for habit_id, done_mask in conn.execute('''
+                            SELECT habit_id, done_mask FROM tracking_rollup
+                            WHERE month = ? AND tracked_mask & ?
+                        ''', (date[:7], bit))}
+            statuses.update(conn.execute('SELECT habit_id, done FROM tracking WHERE date = ?', (date,)))
+            return statuses
+
+    def tracking_changes_since(self, marker: Optional[int]) -> Tuple[int, Set[int]]:
+        """Find habits with tracking rows written since the marker.
+
+        The marker is the highest tracking row ID seen. Every insert or
+        replace allocates a new AUTOINCREMENT ID, so rows written since the
+        marker are found with a primary key range scan.
+        """
+        with self._transaction() as conn:
+            latest = conn.execute('SELECT MAX(id) FROM tracking').fetchone()[0] or 0
+            if marker is None or latest <= marker:
+                return latest, set()
+            changed = {habit_id for habit_id, in conn.execute(
+                'SELECT DISTINCT habit_id FROM tracking WHERE id > ?', (marker,))}
+            return latest, changed
+
+    def iter_done_dates_by_habit(self, tag: str = None,
+                                 id_range: Tuple[int, int] = None) -> Iterator[Tuple[int, List[str]]]:
+        """Yield done dates habit by habit from one ordered scan of each tier.
+
+        With a tag or an ID range, both scans are limited in SQL; a range
+        is a primary key range scan of each tier.
+        """
+        conditions, params = [], ()
+        if tag:
+            conditions.append('habit_id IN (SELECT habit_id FROM habit_tags WHERE tag = ?)')
+            params += (tag,)
+        if id_range:
+            conditions.append('habit_id BETWEEN ? AND ?')
+            params += tuple(id_range)
+        where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+        with self._transaction() as conn:
+            rollups = {}
+            for habit_id, month, done_mask in conn.execute(
+                    f'SELECT habit_id, month, done_mask FROM tracking_rollup {where} ORDER BY habit_id, month', params):
+                rollups.setdefault(habit_id, []).append((month, done_mask))
+
+            # Stream the raw rows habit by habit in index order
+            raw_rows = conn.execute(f'SELECT habit_id, date, done FROM tracking {where} ORDER BY habit_id, date', params)
+            for habit_id, rows in groupby(raw_rows, key=lambda row: row[0]):
+                yield habit_id, _merge_done_dates(rollups.pop(habit_id, []),
+                                                  ((date, done) for _, date, done in rows))
+
+            # Habits that only have rolled-up history
+            for habit_id, habit_rollups in rollups.items():
+                yield habit_id, _merge_done_dates(habit_rollups, [])
+
+    def data_version(self) -> int:
+        """Return PRAGMA data_version as seen by a long-lived monitor connection.
+
+        The value changes whenever another connection (in this or any other
+        process) commits a change to the database.
+        """
+        if self._monitor is None:
+            self._monitor = self.connect()
+        return self._monitor.execute('PRAGMA data_version').fetchone()[0]
+
+    def file_change_counter(self) -> int:
+        """Read the file change counter from the database header.
+
+        Unlike PRAGMA data_version, which is only meaningful within a single
+        connection, this counter persists across processes, so one-shot runs
+        can tell whether anything was committed since the last run.
+        """
+        try:
+            with open(self.db_path, 'rb') as db_file:
+                header = db_file.read(28)
+        except OSError:
+            return 0
+        return int.from_bytes(header[24:28], 'big') if len(header) == 28 else 0
+
+    def rollup(self, cutoff: str) -> Tuple[int, int]:
+        """Fold tracking rows dated before cutoff into monthly summaries.
+
+        Returns the number of rows folded and the number of monthly buckets.
+        """
+        with self._transaction() as conn:
+            buckets = {}
+            row_count = 0
+            for habit_id, date, done in conn.execute('''
+                SELECT habit_id, date, done FROM tracking
+                WHERE date < ?
+            ''', (cutoff,)):
+                bit = 1 << (int(date[8:10]) - 1)
+                masks = buckets.setdefault((habit_id, date[:7]), [0, 0])
+                if done:
+                    masks[0] |= bit
+                masks[1] |= bit
+                row_count += 1
+
+            if not row_count:
+                return 0, 0
+
+            # Merge into existing summaries; the newly folded rows win
+            conn.executemany('''
+                INSERT INTO tracking_rollup (habit_id, month, done_mask, tracked_mask)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(habit_id, month) DO UPDATE SET
+                    done_mask = (done_mask & ~excluded.tracked_mask) | excluded.done_mask,
+                    tracked_mask = tracked_mask | excluded.tracked_mask
+            ''', [(habit_id, month, done_mask, tracked_mask)
+                  for (habit_id, month), (done_mask, tracked_mask) in buckets.items()])
+            conn.execute('DELETE FROM tracking WHERE date < ?', (cutoff,))
+            self._record_write(conn)
+            return row_count, len(buckets)
+
+    def get_done_dates_since(self, start: str) -> Dict[int, List[str]]:
+        """Return recent done dates of all habits, reading both tiers.
+
+        Uses the index on tracking(date), so only rows on or after start are read.
+        """
+        with self._transaction() as conn:
+            dates = {}
+            for habit_id, date in conn.execute('''
+                SELECT habit_id, date FROM tracking
+                WHERE date >= ? AND done = 1
+            ''', (start,)):
+                dates.setdefault(habit_id, []).append(date)
+            raw = set(conn.execute('SELECT habit_id, date FROM tracking WHERE date >= ?', (start,)))
+            for habit_id, month, done_mask, tracked_mask in conn.execute('''
+                SELECT habit_id, month, done_mask, tracked_mask FROM tracking_rollup
+                WHERE month >= ?
+            ''', (start[:7],)):
+                for date, done in _iter_rollup_days([(month, done_mask, tracked_mask)]):
+                    if done and date >= start and (habit_id, date) not in raw:
+                        dates.setdefault(habit_id, []).append(date)
+            for habit_dates in dates.values():
+                habit_dates.sort()
+            return dates
+
+    def get_habit_stats(self) -> Dict[int, Tuple[int, Optional[int], int]]:
+        """Return the stored streak statistics of all habits that have them."""
+        with self._transaction() as conn:
+            return {habit_id: (longest, last_period, last_run) for habit_id, longest, last_period, last_run
+                    in conn.execute('SELECT habit_id, longest, last_period, last_run FROM habit_stats')}
+
+    def put_habit_stats(self, rows: List[Tuple[int, str, int, Optional[int], int]], marker: int):
+        """Store streak statistics in a single transaction, skipping stale rows."""
+        with self._transaction() as conn:
+            changed = {habit_id for habit_id, in conn.execute(
+                'SELECT DISTINCT habit_id FROM tracking WHERE id > ?', (marker,))}
+            conn.executemany('''
+                INSERT OR REPLACE INTO habit_stats (habit_id, longest, last_period, last_run)
+                SELECT ?1, ?3, ?4, ?5 WHERE EXISTS (SELECT 1 FROM habits WHERE id = ?1 AND schedule = ?2)
+            ''', [row for row in rows if row[0] not in changed])
+
+    def top_longest(self, limit: int = None, ascending: bool = False) -> List[Tuple[int, int]]:
+        """Rank habits by stored longest streak, walking the index on habit_stats(longest)."""
+        order = 'longest ASC, habit_id ASC' if ascending else 'longest DESC, habit_id ASC'
+        with self._transaction() as conn:
+            return conn.execute(f'''
+                SELECT habit_id, longest FROM habit_stats
+                ORDER BY {order} LIMIT ?
+            ''', (-1 if limit is None else limit,)).fetchall()
+
+    def get_completion_totals(self, period: str = 'month') -> List[Tuple[str, int, int]]:
+        """Return completion totals per period, read from daily_totals only.
+
+        The cost depends on the number of days covered, not on the number
+        of habits or tracking rows.
+        """
+        key = TOTALS_PERIODS[period][0]
+        with self._transaction() as conn:
+            return conn.execute(f'''
+                SELECT {key} AS period, SUM(done), SUM(tracked) FROM daily_totals
+                GROUP BY period ORDER BY period
+            ''').fetchall()
+
+    def rebuild_daily_totals(self) -> int:
+        """Recompute daily_totals from both tracking tiers."""
+        with self._transaction() as conn:
+            days = self._rebuild_daily_totals(conn)
+            self._record_write(conn)
+            return days
+
+    def _rebuild_daily_totals(self, conn) -> int:
+        """Recompute daily_totals on an open connection."""
+        conn.execute('DELETE FROM daily_totals')
+        conn.execute('''
+            INSERT INTO daily_totals (date, done, tracked)
+            SELECT date, SUM(done), COUNT(*) FROM tracking GROUP BY date
+        ''')
+
+        # Rolled-up days count unless a raw row for the same habit overrides them
+        overridden = set(conn.execute('''
+            SELECT habit_id, date FROM tracking
+            WHERE EXISTS (SELECT 1 FROM tracking_rollup
+                          WHERE tracking_rollup.habit_id = tracking.habit_id
+                            AND tracking_rollup.month = substr(tracking.date, 1, 7))
+        '''))
+        totals = {}
+        for habit_id, month, done_mask, tracked_mask in conn.execute(
+                'SELECT habit_id, month, done_mask, tracked_mask FROM tracking_rollup'):
+            for date, done in _iter_rollup_days([(month, done_mask, tracked_mask)]):
+                if (habit_id, date) not in overridden:
+                    day_totals = totals.setdefault(date, [0, 0])
+                    day_totals[0] += done
+                    day_totals[1] += 1
+        conn.executemany('''
+            INSERT INTO daily_totals (date, done, tracked) VALUES (?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET done = done + excluded.done, tracked = tracked + excluded.tracked
+        ''', [(date, done, tracked) for date, (done, tracked) in totals.items()])
+        return conn.execute('SELECT COUNT(*) FROM daily_totals').fetchone()[0]
+
+    def table_row_counts(self, tables=('habits', 'tracking', 'tracking_rollup', 'daily_totals', 'habit_stats', 'tracking_digest', 'habit_tags')) -> Dict[str, int]:
+        """Return the number of rows in each of the given tables."""
+        with self._transaction() as conn:
+            return {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+                    for table in tables}
+
+    def _record_write(self, conn):
+        """Count a write towards the automatic maintenance threshold."""
+        conn.execute('''
+            INSERT INTO meta (key, value) VALUES ('writes_since_maintenance', 1)
+            ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        ''')
+
+    def _reset_write_counter(self, conn):
+        """Reset the automatic maintenance write counter."""
+        conn.execute('''
+            INSERT OR REPLACE INTO meta (key, value)
+            VALUES ('writes_since_maintenance', 0)
+        ''')
+
+    def auto_maintain(self, max_writes: int, max_free_ratio: float, vacuum_pages: int) -> bool:
+        """Run a short, bounded maintenance pass if a threshold has been passed."""
+        try:
+            conn = self.connect()
+            try:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'writes_since_maintenance'").fetchone()
+                writes = int(row[0]) if row else 0
+                page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+                free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                incremental = conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+
+                free_ratio = free_pages / page_count if page_count else 0.0
+                too_fragmented = incremental and free_ratio >= max_free_ratio
+                if writes < max_writes and not too_fragmented:
+                    return False
+
+                # Keep this cheap: sampled statistics and a capped number of
+                # reclaimed pages, so the triggering command returns promptly
+                conn.isolation_level = None
+                conn.execute('PRAGMA analysis_limit = 400')
+                conn.execute('PRAGMA optimize')
+                if incremental:
+                    # execute() would only step the pragma once, freeing a
+                    # single page; executescript() runs it to completion
+                    conn.executescript(f'PRAGMA incremental_vacuum({int(vacuum_pages)})')
+                self._reset_write_counter(conn)
+                return True
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            # Maintenance is best-effort and must never fail the user's command
+            return False
+
+    def get_db_stats(self) -> dict:
+        """Collect page, table and index size statistics for the database."""
+        with self._transaction() as conn:
+            page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+            stats = {
+                'file_size': os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0,
+                'page_size': page_size,
+                'page_count': conn.execute('PRAGMA page_count').fetchone()[0],
+                'free_pages': conn.execute('PRAGMA freelist_count').fetchone()[0],
+                'auto_vacuum': {0: 'none', 1: 'full', 2: 'incremental'}.get(
+                    conn.execute('PRAGMA auto_vacuum').fetchone()[0], 'unknown'),
+                'tables': {},
+                'indexes': {},
+            }
+
+            objects = conn.execute('''
+                SELECT type, name FROM sqlite_master
+                WHERE type IN ('table', 'index') AND name NOT LIKE 'sqlite_sequence'
+                ORDER BY type DESC, name
+            ''').fetchall()
+
+            # Per-object sizes need the dbstat virtual table, which is an
+            # optional SQLite build feature
+            try:
+                sizes = dict(conn.execute(
+                    'SELECT name, SUM(pgsize) FROM dbstat GROUP BY name').fetchall())
+            except sqlite3.Error:
+                sizes = {}
+
+            for obj_type, name in objects:
+                if obj_type == 'table':
+                    rows = conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+                    stats['tables'][name] = (rows, sizes.get(name))
+                else:
+                    stats['indexes'][name] = sizes.get(name)
+            return stats
+
+    @contextmanager
+    def maintenance_connection(self, reset_write_counter: bool = True):
+        """Yield an autocommit connection, as VACUUM refuses to run in a transaction.
+
+        Unless reset_write_counter is False, the automatic maintenance write
+        counter starts over once the block completes.
+        """
+        conn = self.connect()
+        conn.isolation_level = None
+        try:
+            yield conn
+            if reset_write_counter:
+                self._reset_write_counter(conn)
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+        finally:
+            conn.close()
+
+    def backup_to(self, path: str, pages: int = None, sleep: float = None):
+        """Copy the database to path with the online backup API.
+
+        Pages are copied in batches with a pause in between, so writers on
+        other connections are only held up for one batch at a time. The copy
+        is a consistent snapshot: if the database changes during the backup,
+        SQLite restarts it.
+        """
+        source = self.connect()
+        try:
+            target = sqlite3.connect(path)
+            try:
+                source.backup(target, pages=pages or self.BACKUP_PAGES,
+                              sleep=self.BACKUP_SLEEP if sleep is None else sleep)
+            finally:
+                target.close()
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+        finally:
+            source.close()
+
+    def restore_from(self, path: str):
+        """Replace the database contents with a snapshot file after verifying it.
+
+        The snapshot must pass PRAGMA integrity_check and contain the habits
+        and tracking tables. Its pages are then copied over the live
+        database in one step of the backup API, so other connections switch
+        from the old contents to the new ones atomically.
+        """
+        snapshot = sqlite3.connect(path)
+        try:
+            problems = [row[0] for row in snapshot.execute('PRAGMA integrity_check')]
+            if problems != ['ok']:
+                raise StorageError(f"integrity check failed: {'; '.join(problems[:5])}")
+            tables = {name for name, in snapshot.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            missing = {'habits', 'tracking'} - tables
+            if missing:
+                raise StorageError(f"not a habit tracker database (missing {', '.join(sorted(missing))})")
+            target = self.connect()
+            try:
+                snapshot.backup(target)
+            finally:
+                target.close()
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+        finally:
+            snapshot.close()
+
+        # Snapshots from older versions get the current schema
+        self.init_db()
+
+    def sync_with(self, other_path: str) -> Dict[str, int]:
+        """Merge the tracking data of another habit tracker database both ways.
+
+        Habits are matched by name; habits missing on either side are added
+        there. The other database is attached, and only the habit-months
+        whose digests differ are read. For each day the row written last
+        (by updated_at, then done over not done) wins on both sides.
+        Differing months rolled up on either side are skipped and counted.
+        Everything is written in one transaction across both files.
+
+        Returns counts of the differing and skipped months and of the habits
+        and rows received from and sent to the other database.
+        """
+        try:
+            other = sqlite3.connect(other_path)
+            try:
+                tables = {name for name, in other.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            finally:
+                other.close()
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+        missing = {'habits', 'tracking'} - tables
+        if missing:
+            raise StorageError(f"not a habit tracker database (missing {', '.join(sorted(missing))})")
+        # Databases from older versions get the current schema, digests included
+        SQLiteBackend(other_path)
+
+        conn = self.connect()
+        try:
+            conn.execute('ATTACH DATABASE ? AS other', (other_path,))
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                counts = {
+                    'habits_received': conn.execute('''
+                        INSERT INTO main.habits (name, schedule, remind_at)
+                        SELECT name, schedule, remind_at FROM other.habits
+                        WHERE name NOT IN (SELECT name FROM main.habits) ORDER BY id
+                    ''').rowcount,
+                    'habits_sent': conn.execute('''
+                        INSERT INTO other.habits (name, schedule, remind_at)
+                        SELECT name, schedule, remind_at FROM main.habits
+                        WHERE name NOT IN (SELECT name FROM other.habits) ORDER BY id
+                    ''').rowcount,
+                }
+
+                def digests(schema):
+                    return f'''SELECT h.name, d.month, d.digest, d.rows FROM {schema}.tracking_digest d
+                              JOIN {schema}.habits h ON h.id = d.habit_id'''
+
+                def rolled_up(schema):
+                    return f'''EXISTS (SELECT 1 FROM {schema}.tracking_rollup r JOIN {schema}.habits h ON h.id = r.habit_id
+                                       WHERE h.name = changed.name AND r.month = changed.month)'''
+
+                changed = conn.execute(f'''
+                    SELECT name, month, {rolled_up('main')} OR {rolled_up('other')} FROM (
+                        SELECT name, month FROM ({digests('main')} EXCEPT {digests('other')})
+                        UNION
+                        SELECT name, month FROM ({digests('other')} EXCEPT {digests('main')})
+                    ) AS changed
+                ''').fetchall()
+                buckets = [(name, month) for name, month, skipped in changed if not skipped]
+
+                main_ids = dict(conn.execute('SELECT name, id FROM main.habits'))
+                other_ids = dict(conn.execute('SELECT name, id FROM other.habits'))
+                received, sent = [], []
+                for name, month in buckets:
+                    bounds = (f"{month}-01", f"{month}-31")
+                    ours = {date: (updated_at, done) for date, done, updated_at in conn.execute(
+                        'SELECT date, done, updated_at FROM main.tracking WHERE habit_id = ? AND date BETWEEN ? AND ?',
+                        (main_ids[name], *bounds))}
+                    theirs = {date: (updated_at, done) for date, done, updated_at in conn.execute(
+                        'SELECT date, done, updated_at FROM other.tracking WHERE habit_id = ? AND date BETWEEN ? AND ?',
+                        (other_ids[name], *bounds))}
+                    for date in ours.keys() | theirs.keys():
+                        winner = max(ours.get(date, (-1, 0)), theirs.get(date, (-1, 0)))
+                        if ours.get(date) != winner:
+                            received.append((main_ids[name], date, winner[1], winner[0]))
+                        if theirs.get(date) != winner:
+                            sent.append((other_ids[name], date, winner[1], winner[0]))
+
+                for schema, rows in (('main', received), ('other', sent)):
+                    conn.executemany(f'''
+                        INSERT OR REPLACE INTO {schema}.tracking (habit_id, date, done, updated_at)
+                        VALUES (?, ?, ?, ?)
+                    ''', rows)
+                self._record_write(conn)
+            conn.execute('DETACH DATABASE other')
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+        finally:
+            conn.close()
+
+        counts.update(months=len(buckets), months_skipped=len(changed) - len(buckets),
+                      rows_received=len(received), rows_sent=len(sent))
+        return counts
+
+
+class MemoryBackend:
+    """Storage backend keeping everything in process memory.
+
+    Habits are indexed by ID and by name. Each habit's tracking data is a
+    date -> status dict for point lookups plus a sorted list of its dates
+    for range and full-history reads.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self._names = {}        # habit_id -> name
+        self._ids = {}          # name -> habit_id
+        self._schedules = {}    # habit_id -> schedule spec
+        self._reminders = {}    # habit_id -> 'HH:MM' reminder time
+        self._tags = {}         # tag -> set of habit IDs
+        self._statuses = {}     # habit_id -> {date: status}
+        self._dates = {}        # habit_id -> sorted list of tracked dates
+        self._next_id = 1       # IDs are never reused, like AUTOINCREMENT
+        self._version = 0
+        self._written = {}      # habit_id -> version of its last tracking write
+        self._totals = {}       # date -> [done count, tracked count] across habits
+        self._stats = {}        # habit_id -> (longest, last met period, last run length)
+        self._settings = {}     # key -> value
+
+    def add_habit(self, name: str) -> int:
+        """Add a habit and return its ID."""
+        if name in self._ids:
+            raise DuplicateHabitError(f"Habit '{name}' already exists")
+        habit_id = self._next_id
+        self._next_id += 1
+        self._names[habit_id] = name
+        self._ids[name] = habit_id
+        self._schedules[habit_id] = 'daily'
+        self._statuses[habit_id] = {}
+        self._dates[habit_id] = []
+        self._version += 1
+        return habit_id
+
+    def remove_habit(self, habit_id: int) -> bool:
+        """Remove a habit and its tracking history."""
+        if habit_id not in self._names:
+            return False
+        del self._ids[self._names.pop(habit_id)]
+        del self._schedules[habit_id]
+        self._reminders.pop(habit_id, None)
+        for tagged in self._tags.values():
+            tagged.discard(habit_id)
+        self._stats.pop(habit_id, None)
+        for date, done in self._statuses[habit_id].items():
+            self._add_to_totals(date, -done, -1)
+        del self._statuses[habit_id]
+        del self._dates[habit_id]
+        self._written.pop(habit_id, None)
+        self._version += 1
+        return True
+
+    def get_habit_name(self, habit_id: int) -> Optional[str]:
+        """Return the name of a habit."""
+        return self._names.get(habit_id)
+
+    def find_habit_id(self, name: str) -> Optional[int]:
+        """Return the ID of a habit by name."""
+        return self._ids.get(name)
+
+    def list_habits(self, tag: str = None) -> List[Tuple[int, str]]:
+        """Return all habits, or those with the tag, ordered by ID."""
+        if tag is None:
+            return sorted(self._names.items())
+        return [(habit_id, self._names[habit_id]) for habit_id in sorted(self._tags.get(tag, ()))]
+
+    def get_schedule(self, habit_id: int) -> Optional[str]:
+        """Return the schedule spec of a habit."""
+        return self._schedules.get(habit_id)
+
+    def get_schedules(self) -> Dict[int, str]:
+        """Return the schedule specs of all habits."""
+        return dict(self._schedules)
+
+    def set_schedule(self, habit_id: int, schedule: str) -> bool:
+        """Set the schedule spec of a habit."""
+        if habit_id not in self._schedules:
+            return False
+        self._schedules[habit_id] = schedule
+        self._stats.pop(habit_id, None)
+        self._version += 1
+        return True
+
+    def get_reminders(self) -> Dict[int, str]:
+        """Return the reminder times of all habits that have one."""
+        return dict(self._reminders)
+
+    def set_reminder(self, habit_id: int, remind_at: Optional[str]) -> bool:
+        """Set or clear the reminder time of a habit."""
+        if habit_id not in self._schedules:
+            return False
+        if remind_at is None:
+            self._reminders.pop(habit_id, None)
+        else:
+            self._reminders[habit_id] = remind_at
+        self._version += 1
+        return True
+
+    def get_setting(self, key: str) -> Optional[str]:
+        """Return a stored setting."""
+        return self._settings.get(key)
+
+    def set_setting(self, key: str, value: str):
+        """Store a setting."""
+        self._settings[key] = value
+        self._version += 1
+
+    def get_tags(self) -> Dict[int, List[str]]:
+        """Return the tags of all habits that have any."""
+        tags = {}
+        for tag in sorted(self._tags):
+            for habit_id in self._tags[tag]:
+                tags.setdefault(habit_id, []).append(tag)
+        return dict(sorted(tags.items()))
+
+    def tag_habits(self, habit_ids: List[int], tag: str) -> int:
+        """Add a tag to existing habits."""
+        tagged = self._tags.setdefault(tag, set())
+        added = {habit_id for habit_id in habit_ids if habit_id in self._names} - tagged
+        tagged.update(added)
+        self._version += 1
+        return len(added)
+
+    def untag_habits(self, habit_ids: List[int], tag: str) -> int:
+        """Remove a tag from habits."""
+        tagged = self._tags.get(tag, set())
+        removed = tagged & set(habit_ids)
+        tagged -= removed
+        self._version += 1
+        return len(removed)
+
+    def upsert_tracking_for_tag(self, tag: str, date: str, done: bool) -> List[int]:
+        """Set the tracking status of all habits with the tag."""
+        habit_ids = sorted(self._tags.get(tag, ()))
+        for habit_id in habit_ids:
+            self.upsert_tracking(habit_id, date, done)
+        return habit_ids
+
+    def upsert_tracking(self, habit_id: int, date: str, done: bool):
+        """Insert or replace a tracking record."""
+        statuses = self._statuses[habit_id]
+        if date not in statuses:
+            insort(self._dates[habit_id], date)
+        else:
+            self._add_to_totals(date, -statuses[date], -1)
+        statuses[date] = 1 if done else 0
+        self._add_to_totals(date, statuses[date], 1)
+        self._stats.pop(habit_id, None)
+        self._version += 1
+        self._written[habit_id] = self._version
+
+    def get_tracking(self, habit_id: int, dates: List[str]) -> Dict[str, int]:
+        """Return tracking statuses for specific dates."""
+        statuses = self._statuses.get(habit_id, {})
+        return {date: statuses[date] for date in dates if date in statuses}
+
+    def get_tracking_range(self, habit_id: int, start: str, end: str) -> List[Tuple[str, int]]:
+        """Return tracking statuses between two dates."""
+        dates = self._dates.get(habit_id, [])
+        statuses = self._statuses.get(habit_id, {})
+        return [(date, statuses[date])
+                for date in dates[bisect_left(dates, start):bisect_right(dates, end)]]
+
+    def get_done_dates(self, habit_id: int) -> List[str]:
+        """Return all done dates for a habit."""
+        statuses = self._statuses.get(habit_id, {})
+        return [date for date in self._dates.get(habit_id, []) if statuses[date]]
+
+    def iter_tracking(self, habit_id: int, start: str = None, end: str = None,
+                      chunk_size: int = None) -> Iterator[Tuple[str, int]]:
+        """Yield tracking statuses in date order (chunk_size is ignored)."""
+        dates = self._dates.get(habit_id, [])
+        statuses = self._statuses.get(habit_id, {})
+        first = bisect_left(dates, start) if start else 0
+        last = bisect_right(dates, end) if end else len(dates)
+        for index in range(first, last):
+            yield dates[index], statuses[dates[index]]
+
+    def iter_done_dates(self, habit_id: int, chunk_size: int = None) -> Iterator[str]:
+        """Yield all done dates for a habit in order."""
+        return (date for date, done in self.iter_tracking(habit_id) if done)
+
+    def get_tracking_for_date(self, date: str) -> Dict[int, int]:
+        """Return tracking statuses of all habits for one date."""
+        return {habit_id: statuses[date] for habit_id, statuses in self._statuses.items() if date in statuses}
+
+    def tracking_changes_since(self, marker: Optional[int]) -> Tuple[int, Set[int]]:
+        """Find habits with tracking writes since the marker (a data version)."""
+        if marker is None:
+            return self._version, set()
+        return self._version, {habit_id for habit_id, version in self._written.items() if version > marker}
+
+    def iter_done_dates_by_habit(self, tag: str = None,
+                                 id_range: Tuple[int, int] = None) -> Iterator[Tuple[int, List[str]]]:
+        """Yield done dates habit by habit."""
+        for habit_id in sorted(self._names if tag is None else self._tags.get(tag, ())):
+            if id_range and not id_range[0] <= habit_id <= id_range[1]:
+                continue
+            done_dates = self.get_done_dates(habit_id)
+            if done_dates:
+                yield habit_id, done_dates
+
+    def get_done_dates_since(self, start: str) -> Dict[int, List[str]]:
+        """Return recent done dates of all habits."""
+        dates = {}
+        for habit_id, habit_dates in self._dates.items():
+            statuses = self._statuses[habit_id]
+            recent = [date for date in habit_dates[bisect_left(habit_dates, start):] if statuses[date]]
+            if recent:
+                dates[habit_id] = recent
+        return dates
+
+    def get_habit_stats(self) -> Dict[int, Tuple[int, Optional[int], int]]:
+        """Return the stored streak statistics of all habits that have them."""
+        return dict(self._stats)
+
+    def put_habit_stats(self, rows: List[Tuple[int, str, int, Optional[int], int]], marker: int):
+        """Store streak statistics, skipping stale rows."""
+        for habit_id, schedule, longest, last_period, last_run in rows:
+            if self._schedules.get(habit_id) == schedule and self._written.get(habit_id, 0) <= marker:
+                self._stats[habit_id] = (longest, last_period, last_run)
+
+    def top_longest(self, limit: int = None, ascending: bool = False) -> List[Tuple[int, int]]:
+        """Rank habits by stored longest streak."""
+        ranked = sorted(((habit_id, stats[0]) for habit_id, stats in self._stats.items()),
+                        key=lambda item: (item[1] if ascending else -item[1], item[0]))
+        return ranked if limit is None else ranked[:limit]
+
+    def _add_to_totals(self, date: str, done: int, tracked: int):
+        """Adjust the totals of one day, dropping days with nothing tracked."""
+        day_totals = self._totals.setdefault(date, [0, 0])
+        day_totals[0] += done
+        day_totals[1] += tracked
+        if not day_totals[1]:
+            del self._totals[date]
+
+    def get_completion_totals(self, period: str = 'month') -> List[Tuple[str, int, int]]:
+        """Return completion totals per period from the per-day totals."""
+        key = TOTALS_PERIODS[period][1]
+        grouped = {}
+        for date, (done, tracked) in sorted(self._totals.items()):
+            period_totals = grouped.setdefault(key(date), [0, 0])
+            period_totals[0] += done
+            period_totals[1] += tracked
+        return [(period_key, done, tracked) for period_key, (done, tracked) in grouped.items()]
+
+    def rebuild_daily_totals(self) -> int:
+        """Recompute the per-day totals from the tracking data."""
+        self._totals = {}
+        for statuses in self._statuses.values():
+            for date, done in statuses.items():
+                self._add_to_totals(date, done, 1)
+        self._version += 1
+        return len(self._totals)
+
+    def data_version(self) -> int:
+        """Return a counter incremented on every write."""
+        return self._version
+
+
+class CachedBackend:
+    """LRU cache in front of another storage backend.
+
+    Caches the habit list, name and ID lookups, schedules and tracking
+    windows. Before every cached read the wrapped backend's data_version()
+    is compared with the one the entries were loaded at, and the whole
+    cache is dropped when it changed, so writes from this or any other
+    process are seen on the next read. All other operations pass through.
+    """
+
+    def __init__(self, backend, maxsize: int = 256):
+        """Wrap a backend with a cache of at most maxsize entries."""
+        self.backend = backend
+        self.maxsize = maxsize
+        self._entries = OrderedDict()   # (method, *args) -> result, least recently used first
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __getattr__(self, name):
+        """Pass uncached operations through to the wrapped backend."""
+        return getattr(self.backend, name)
+
+    def _cached(self, key: tuple, load):
+        """Return the cached result for key, loading and storing it on a miss."""
+        version = self.backend.data_version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+                self._entries.clear()
+            self._version = version
+
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        result = self._entries[key] = load()
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return result
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return the hit, miss and invalidation counters and the cache size."""
+        return {'hits': self.hits, 'misses': self.misses, 'invalidations': self.invalidations,
+                'size': len(self._entries), 'maxsize': self.maxsize}
+
+    def list_habits(self, tag: str = None) -> List[Tuple[int, str]]:
+        """Return all habits, or those with the tag, ordered by ID."""
+        return list(self._cached(('list_habits', tag), lambda: self.backend.list_habits(tag)))
+
+    def get_habit_name(self, habit_id: int) -> Optional[str]:
+        """Return the name of a habit."""
+        return self._cached(('get_habit_name', habit_id), lambda: self.backend.get_habit_name(habit_id))
+
+    def find_habit_id(self, name: str) -> Optional[int]:
+        """Return the ID of a habit by name."""
+        return self._cached(('find_habit_id', name), lambda: self.backend.find_habit_id(name))
+
+    def get_schedules(self) -> Dict[int, str]:
+        """Return the schedule specs of all habits."""
+        return dict(self._cached(('get_schedules',), self.backend.get_schedules))
+
+    def get_tracking(self, habit_id: int, dates: List[str]) -> Dict[str, int]:
+        """Return the tracking status of a habit for the given dates."""
+        return dict(self._cached(('get_tracking', habit_id, tuple(dates)),
+                                 lambda: self.backend.get_tracking(habit_id, dates)))
+
+
+def create_backend(name: str, db_path: str = "habits.db"):
+    """Create a storage backend by name ('sqlite' or 'memory')."""
+    if name == 'sqlite':
+        return SQLiteBackend(db_path)
+    if name == 'memory':
+        return MemoryBackend()
+    raise ValueError(f"Unknown storage backend '{name}'")
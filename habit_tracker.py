@@ -5,11 +5,34 @@ Track your daily habits from the command line
 """
 
 import argparse
+import asyncio
+import calendar
+import csv
+import gzip
+import heapq
+import json
+import re
+import shlex
+import shutil
 import sqlite3
 import sys
 import os
-from datetime import datetime, timedelta
-from typing import List, Tuple
+import tempfile
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import habit_completion
+from habit_schedule import (WEEKDAY_NAMES, WEEKDAYS, Schedule, current_streak_from_run, streak_runs,
+                            streaks_from_dates)
+from habit_storage import (TOTALS_PERIODS, CachedBackend, DuplicateHabitError, SQLiteBackend,
+                           StorageError, create_backend)
 
 # Color codes for terminal output
 class Colors:
@@ -19,42 +42,121 @@ class Colors:
     RESET = '\033[0m'
 
 
+# Output formats understood by the list, streak and calendar views
+OUTPUT_FORMATS = ['text', 'json', 'jsonl', 'csv']
+
+
+def write_records(records, fields: List[str], fmt: str, out=None):
+    """Stream dict records as a JSON array, JSON lines or CSV, one row at a time."""
+    out = out or sys.stdout
+    if fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=fields, extrasaction='ignore', lineterminator='\n')
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+    elif fmt == 'jsonl':
+        for record in records:
+            out.write(json.dumps(record) + '\n')
+    elif fmt == 'json':
+        out.write('[')
+        separator = '\n'
+        for record in records:
+            out.write(separator + json.dumps(record))
+            separator = ',\n'
+        out.write('\n]\n')
+    else:
+        raise ValueError(f"Unknown output format '{fmt}'")
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _is_full_date(value: str) -> bool:
+    """Tell a YYYY-MM-DD date apart from day numbers and relative days such as -3."""
+    return '-' in value.lstrip('-')
+
+
+def _valid_tag(tag: str) -> Optional[str]:
+    """Return a tag name without its optional leading @, or None if it is not a single word."""
+    tag = tag.strip().lstrip('@')
+    if not tag or any(char.isspace() or char in ',@' for char in tag):
+        return None
+    return tag
+
+
+# Weekday names and abbreviations accepted as relative days, by weekday number
+_WEEKDAY_NUMBERS = {**{name: day for day, name in enumerate(WEEKDAY_NAMES)},
+                    **{name: day for day, name in enumerate(WEEKDAYS)}}
+
+
+def _partition_streak_rows(backend, id_range: Tuple[int, int],
+                           specs: Dict[int, str]) -> List[Tuple[int, str, int, Optional[int], int]]:
+    """Compute habit_stats rows for the habits in specs, whose IDs lie in the inclusive id_range,
+    from one streamed scan of the range."""
+    rows = []
+    for habit_id, done_dates in backend.iter_done_dates_by_habit(id_range=id_range):
+        spec = specs.get(habit_id)
+        if spec is not None:
+            rows.append((habit_id, spec, *streak_runs(map(date.fromisoformat, done_dates), Schedule(spec))))
+    # Habits without any history
+    seen = {row[0] for row in rows}
+    rows.extend((habit_id, spec, *streak_runs([], Schedule(spec)))
+                for habit_id, spec in specs.items() if habit_id not in seen)
+    return rows
+
+
+def _recompute_partition(db_path: str, id_range: Tuple[int, int],
+                         specs: Dict[int, str]) -> List[Tuple[int, str, int, Optional[int], int]]:
+    """Process pool worker for recompute: one partition over a read-only connection."""
+    return _partition_streak_rows(SQLiteBackend(db_path, read_only=True), id_range, specs)
+
+
+# Storage backend used when none is passed to HabitTracker ('sqlite' or 'memory')
+DEFAULT_BACKEND = 'sqlite'
+
+
 class HabitTracker:
-    def __init__(self, db_path: str = "habits.db"):
-        """Initialize the HabitTracker with a database connection."""
+    # Automatic maintenance thresholds (see maintain())
+    AUTO_MAINTAIN_WRITES = 1000      # run after this many writes
+    AUTO_MAINTAIN_FREE_RATIO = 0.25  # or when this share of pages is free
+    AUTO_VACUUM_PAGES = 256          # pages reclaimed per automatic run
+
+    # Tracking rows older than this are folded into monthly summaries by rollup_tracking()
+    RETENTION_DAYS = 365
+
+    # Keys habits can be ranked by in the top and calendar views
+    RANK_KEYS = ('current', 'longest', 'rate')
+
+    # Days covered by the calendar, check-in and day numbers (see set_window())
+    DEFAULT_WINDOW_DAYS = 30
+    MIN_WINDOW_DAYS = 7
+    MAX_WINDOW_DAYS = 366
+
+    def __init__(self, db_path: str = "habits.db", backend=None, cache_size: int = None):
+        """Initialize the HabitTracker with a storage backend.
+
+        backend may be a backend instance or a backend name ('sqlite' or
+        'memory'); by default a SQLite database at db_path is used.
+        cache_size optionally puts an LRU cache of that many entries in front
+        of the backend, for processes that keep the tracker around.
+        """
         self.db_path = db_path
-        self.init_db()
+        if backend is None or isinstance(backend, str):
+            backend = create_backend(backend or DEFAULT_BACKEND, db_path)
+        # The backend itself, for features that need a particular backend type
+        self._storage = backend
+        self.backend = CachedBackend(backend, cache_size) if cache_size else backend
+        self._window_days = None  # (data stamp, window days)
+        self._window = None  # (today, window days, dates, date strings)
 
-    def _get_db_connection(self):
-        """Create and return a database connection with a context manager."""
-        return sqlite3.connect(self.db_path)
-        
-    def init_db(self):
-        """Initialize the database with required tables."""
-        try:
-            with self._get_db_connection() as conn:
-                # Create habits table
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS habits (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT UNIQUE NOT NULL
-                    )
-                ''')
-                
-                # Create tracking table
-                conn.execute('''
-                    CREATE TABLE IF NOT EXISTS tracking (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        habit_id INTEGER,
-                        date TEXT NOT NULL,
-                        done BOOLEAN NOT NULL,
-                        FOREIGN KEY (habit_id) REFERENCES habits (id),
-                        UNIQUE(habit_id, date)
-                    )
-                ''')
-        except sqlite3.Error as e:
-            print(f"Database initialization error: {e}")
-            raise
+    def _sqlite_backend(self, feature: str):
+        """Return the SQLite backend, or print an error if another backend is in use."""
+        if isinstance(self._storage, SQLiteBackend):
+            return self._storage
+        print(f"Error: {feature} requires the SQLite storage backend.")
+        return None
 
     def add_habits(self, names: str) -> bool:
         """Add new habits to track from a comma-separated string."""
@@ -63,8 +165,10 @@ class HabitTracker:
         
         success_count = 0
         for name in habit_names:
-            if self.add_habit(name):
+            if self.add_habit(name, update_index=False):
                 success_count += 1
+        if success_count:
+            self.refresh_completion_index()
                 
         total_count = len(habit_names)
         if success_count == total_count:
@@ -74,14 +178,16 @@ class HabitTracker:
             print(f"Added {success_count} out of {total_count} habits.")
             return False
 
-    def add_habit(self, name: str) -> bool:
+    def add_habit(self, name: str, update_index: bool = True) -> bool:
         """Add a new habit to track."""
         try:
-            with self._get_db_connection() as conn:
-                conn.execute('INSERT INTO habits (name) VALUES (?)', (name,))
-                print(f"Habit '{name}' added successfully!")
-                return True
-        except sqlite3.IntegrityError:
+            self.backend.add_habit(name)
+            print(f"Habit '{name}' added successfully!")
+            if update_index:
+                self.refresh_completion_index()
+            self._maybe_auto_maintain()
+            return True
+        except DuplicateHabitError:
             print(f"Error: Habit '{name}' already exists!")
             return False
         except Exception as e:
@@ -89,18 +195,17 @@ class HabitTracker:
             return False
 
     def remove_habits(self, ids_str: str) -> bool:
-        """Remove habits and their tracking history by comma-separated IDs."""
-        # Split the IDs by comma and convert to integers
-        try:
-            habit_ids = [int(id_str.strip()) for id_str in ids_str.split(',')]
-        except ValueError:
-            print("Error: Invalid habit ID format. Please provide comma-separated numbers.")
+        """Remove habits and their tracking history by comma-separated IDs or names."""
+        habit_ids = self.resolve_habits(ids_str)
+        if habit_ids is None:
             return False
         
         success_count = 0
         for habit_id in habit_ids:
-            if self.remove_habit(habit_id):
+            if self.remove_habit(habit_id, update_index=False):
                 success_count += 1
+        if success_count:
+            self.refresh_completion_index()
                 
         total_count = len(habit_ids)
         if success_count == total_count:
@@ -110,213 +215,879 @@ class HabitTracker:
             print(f"Removed {success_count} out of {total_count} habits.")
             return False
 
-    def remove_habit(self, habit_id: int) -> bool:
+    def remove_habit(self, habit_id: int, update_index: bool = True) -> bool:
         """Remove a habit and its tracking history by ID."""
         try:
-            with self._get_db_connection() as conn:
-                # First get the habit name
-                result = conn.execute('SELECT name FROM habits WHERE id = ?', (habit_id,)).fetchone()
-                
-                if not result:
-                    print(f"Error: Habit with ID {habit_id} not found!")
-                    return False
-                    
-                habit_name = result[0]
-                
-                # Delete tracking records
-                conn.execute('DELETE FROM tracking WHERE habit_id = ?', (habit_id,))
-                
-                # Delete the habit
-                conn.execute('DELETE FROM habits WHERE id = ?', (habit_id,))
+            # First get the habit name
+            habit_name = self.backend.get_habit_name(habit_id)
+            
+            if habit_name is None or not self.backend.remove_habit(habit_id):
+                print(f"Error: Habit with ID {habit_id} not found!")
+                return False
                 
-                print(f"Habit '{habit_name}' (ID: {habit_id}) and its tracking history removed successfully!")
-                return True
+            print(f"Habit '{habit_name}' (ID: {habit_id}) and its tracking history removed successfully!")
+            if update_index:
+                self.refresh_completion_index()
+            self._maybe_auto_maintain()
+            return True
         except Exception as e:
             print(f"Error removing habit: {e}")
             return False
 
+    def resolve_habit(self, token: str):
+        """Resolve a habit ID or exact habit name to an ID, or None if there is no such habit.
+
+        Tokens made only of digits are always treated as IDs.
+        """
+        token = token.strip()
+        if token.isdigit():
+            return int(token)
+        try:
+            habit_id = self.backend.find_habit_id(token)
+        except StorageError as e:
+            print(f"Error looking up habit: {e}")
+            return None
+        if habit_id is None:
+            print(f"Error: Habit '{token}' not found!")
+        return habit_id
+
+    def resolve_habits(self, tokens_str: str):
+        """Resolve comma-separated habit IDs or names to a list of IDs, or None on error."""
+        tokens = [token.strip() for token in tokens_str.split(',')]
+        if not all(tokens):
+            print("Error: Invalid habit list. Please provide comma-separated IDs or names.")
+            return None
+        habit_ids = [self.resolve_habit(token) for token in tokens]
+        if None in habit_ids:
+            return None
+        return habit_ids
+
+    def refresh_completion_index(self) -> bool:
+        """Regenerate the habit name/ID index used for shell completion."""
+        if not isinstance(self._storage, SQLiteBackend):
+            return False
+        try:
+            habit_completion.write_index(habit_completion.index_path(self.db_path), self.backend.list_habits())
+            return True
+        except (OSError, StorageError):
+            # Completion is a convenience and must never fail the user's command
+            return False
+
+    def show_completions(self, word: str) -> bool:
+        """Print shell completions for a partially typed habit name."""
+        if self._sqlite_backend("Shell completion") is None:
+            return False
+        path = habit_completion.index_path(self.db_path)
+        if not os.path.exists(path):
+            self.refresh_completion_index()
+        for completion in habit_completion.complete(path, word):
+            print(completion)
+        return True
+
+    def show_completion_script(self):
+        """Print a bash completion script (also usable from zsh via bashcompinit)."""
+        helper = os.path.abspath(habit_completion.__file__)
+        index = os.path.abspath(habit_completion.index_path(self.db_path))
+        print(f'''# Habit Tracker completion: eval "$(python habit_tracker.py completions --script)"
+_habit_tracker_complete() {{
+    local cur=${{COMP_WORDS[COMP_CWORD]}} prev=${{COMP_WORDS[COMP_CWORD-1]}}
+    local IFS=$'\\n'
+    if [[ $COMP_CWORD -eq 1 && $cur != [+-]* ]]; then
+        COMPREPLY=($(compgen -W "{' '.join(build_parser()[1].choices)}" -- "$cur"))
+    elif [[ $cur == [+-]* || $prev == remove || $prev == rm || $prev == checkin ]]; then
+        COMPREPLY=($(python3 -S "{helper}" "{index}" "$cur"))
+        COMPREPLY=("${{COMPREPLY[@]// /\\ }}")
+    fi
+}}
+complete -F _habit_tracker_complete habit_tracker.py habit-tracker''')
+
     def track_habit(self, habit_id: int, done: bool, date_str: str = None) -> bool:
         """Track a habit as done or not done for a specific date by ID."""
         try:
-            with self._get_db_connection() as conn:
-                # Get habit name
-                result = conn.execute('SELECT name FROM habits WHERE id = ?', (habit_id,)).fetchone()
-                
-                if not result:
-                    print(f"Error: Habit with ID {habit_id} not found!")
-                    return False
-                    
-                habit_name = result[0]
+            # Get habit name
+            habit_name = self.backend.get_habit_name(habit_id)
+            
+            if habit_name is None:
+                print(f"Error: Habit with ID {habit_id} not found!")
+                return False
                 
-                # Determine the date to use
-                if date_str:
-                    # Check if it's a full date string (YYYY-MM-DD) or a day number
-                    if '-' in date_str:
-                        # It's a full date string
-                        try:
-                            datetime.strptime(date_str, '%Y-%m-%d')
-                            target_date = date_str
-                        except ValueError:
-                            print(f"Error: Invalid date format '{date_str}'. Use YYYY-MM-DD.")
-                            return False
-                    else:
-                        # It's a day number, validate and convert it
-                        target_date = self._convert_day_to_date(date_str)
-                        if not target_date:
-                            return False
+            # Determine the date to use
+            if date_str:
+                # Check if it's a full date string (YYYY-MM-DD) or a day
+                if _is_full_date(date_str):
+                    # It's a full date string
+                    try:
+                        datetime.strptime(date_str, '%Y-%m-%d')
+                        target_date = date_str
+                    except ValueError:
+                        print(f"Error: Invalid date format '{date_str}'. Use YYYY-MM-DD.")
+                        return False
                 else:
-                    # Use today's date
-                    target_date = datetime.now().strftime('%Y-%m-%d')
-                
-                # Insert or update tracking record
-                conn.execute('''
-                    INSERT OR REPLACE INTO tracking (habit_id, date, done)
-                    VALUES (?, ?, ?)
-                ''', (habit_id, target_date, done))
+                    # It's a day number or relative day, validate and convert it
+                    target_date = self._convert_day_to_date(date_str)
+                    if not target_date:
+                        return False
+            else:
+                # Use today's date
+                target_date = datetime.now().strftime('%Y-%m-%d')
+            
+            # Insert or update tracking record
+            self.backend.upsert_tracking(habit_id, target_date, done)
                 
-                status = "done" if done else "not done"
-                date_display = datetime.strptime(target_date, '%Y-%m-%d').strftime('%Y-%m-%d')
-                print(f"Habit '{habit_name}' (ID: {habit_id}) tracked as {status} for {date_display}!")
-                return True
+            status = "done" if done else "not done"
+            date_display = datetime.strptime(target_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+            print(f"Habit '{habit_name}' (ID: {habit_id}) tracked as {status} for {date_display}!")
+            self._maybe_auto_maintain()
+            return True
         except Exception as e:
             print(f"Error tracking habit: {e}")
             return False
 
-    def _convert_day_to_date(self, day_str: str) -> str:
-        """Convert a day number (within last 30 days) to a full date string."""
+    def _maybe_auto_maintain(self) -> bool:
+        """Run a short, bounded maintenance pass if a threshold has been passed."""
+        if not isinstance(self._storage, SQLiteBackend):
+            return False
+        return self._storage.auto_maintain(self.AUTO_MAINTAIN_WRITES, self.AUTO_MAINTAIN_FREE_RATIO,
+                                          self.AUTO_VACUUM_PAGES)
+
+    def get_db_stats(self) -> dict:
+        """Collect page, table and index size statistics for the database."""
+        return self.backend.get_db_stats()
+
+    def print_db_stats(self, stats: dict):
+        """Print a database statistics report."""
+        def fmt_size(size):
+            return "n/a" if size is None else f"{size / 1024:.1f} KiB"
+
+        free_share = stats['free_pages'] / stats['page_count'] * 100 if stats['page_count'] else 0.0
+        print(f"Database: {self.db_path} ({fmt_size(stats['file_size'])})")
+        print(f"Pages: {stats['page_count']} x {stats['page_size']} bytes, "
+              f"{stats['free_pages']} free ({free_share:.1f}%), auto_vacuum={stats['auto_vacuum']}")
+        print(f"\n{'Table':<24} {'Rows':>10} {'Size':>12}")
+        print("-" * 48)
+        for name, (rows, size) in stats['tables'].items():
+            print(f"{name:<24} {rows:>10} {fmt_size(size):>12}")
+        print(f"\n{'Index':<35} {'Size':>12}")
+        print("-" * 48)
+        for name, size in stats['indexes'].items():
+            print(f"{name:<35} {fmt_size(size):>12}")
+
+    def maintain(self, check: bool = False, analyze: bool = False, vacuum: str = None) -> bool:
+        """Report database statistics and optionally check, analyze and vacuum it."""
+        backend = self._sqlite_backend("Database maintenance")
+        if backend is None:
+            return False
+
         try:
-            day = int(day_str)
-        except ValueError:
-            print(f"Error: Invalid day '{day_str}'. Please provide a number.")
+            stats = backend.get_db_stats()
+            self.print_db_stats(stats)
+
+            healthy = True
+            # Only analyzing or vacuuming stands in for an automatic pass
+            with backend.maintenance_connection(reset_write_counter=bool(analyze or vacuum)) as conn:
+                if check:
+                    print("\nRunning checks...")
+                    for pragma in ('quick_check', 'integrity_check'):
+                        results = [row[0] for row in conn.execute(f'PRAGMA {pragma}').fetchall()]
+                        if results == ['ok']:
+                            print(f"  {pragma}: ok")
+                        else:
+                            healthy = False
+                            print(f"  {pragma}: {len(results)} problem(s) found")
+                            for problem in results[:10]:
+                                print(f"    {problem}")
+
+                if analyze:
+                    print("\nAnalyzing...")
+                    conn.execute('ANALYZE')
+                    conn.execute('PRAGMA optimize')
+
+                if vacuum == 'incremental':
+                    print("\nRunning incremental vacuum...")
+                    # executescript() runs the pragma to completion; execute()
+                    # would stop after freeing a single page
+                    conn.executescript('PRAGMA incremental_vacuum')
+                elif vacuum == 'full':
+                    print("\nRunning full vacuum...")
+                    # Switch to incremental auto-vacuum so later runs can be cheap
+                    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+                    conn.execute('VACUUM')
+
+            if vacuum:
+                after = backend.get_db_stats()
+                print(f"File size: {stats['file_size'] / 1024:.1f} KiB -> {after['file_size'] / 1024:.1f} KiB "
+                      f"({after['free_pages']} free pages remaining)")
+
+            if healthy:
+                print("\nMaintenance completed!")
+            else:
+                print("\nMaintenance completed with integrity problems!")
+            return healthy
+        except (StorageError, sqlite3.Error) as e:
+            print(f"Error during maintenance: {e}")
+            return False
+
+    def backup(self, output: str = None, compress: bool = False, keep: int = None) -> bool:
+        """Write an online snapshot of the database, optionally gzipped.
+
+        Without output, or when output is a directory, the snapshot gets a
+        timestamped name (in a 'backups' directory next to the database by
+        default) and keep limits how many such snapshots are retained.
+        """
+        backend = self._sqlite_backend("backup")
+        if backend is None:
+            return False
+        if keep is not None and keep < 1:
+            print("Error: At least 1 backup must be kept.")
+            return False
+
+        stem = os.path.splitext(os.path.basename(self.db_path))[0]
+        rotate = output is None or os.path.isdir(output)
+        if rotate:
+            directory = output or os.path.join(os.path.dirname(os.path.abspath(self.db_path)), 'backups')
+            os.makedirs(directory, exist_ok=True)
+            output = os.path.join(directory, f"{stem}-{datetime.now():%Y%m%d-%H%M%S-%f}.db" + ('.gz' if compress else ''))
+        else:
+            directory = os.path.dirname(os.path.abspath(output))
+            compress = compress or output.endswith('.gz')
+
+        # Build the snapshot next to its destination, then rename it into place
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix='.habit_backup_', suffix='.db', dir=directory)
+            os.close(fd)
+            backend.backup_to(tmp_path)
+            if compress:
+                with open(tmp_path, 'rb') as src, gzip.open(tmp_path + '.gz', 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                os.replace(tmp_path + '.gz', tmp_path)
+            with open(tmp_path, 'rb') as snapshot_file:
+                os.fsync(snapshot_file.fileno())
+            os.replace(tmp_path, output)
+        except (StorageError, OSError) as e:
+            print(f"Error writing backup: {e}")
+            for path in (tmp_path, tmp_path + '.gz') if tmp_path else ():
+                if os.path.exists(path):
+                    os.remove(path)
+            return False
+
+        print(f"Backup written to {output} ({os.path.getsize(output) / 1024:.1f} KiB)")
+        if rotate and keep:
+            self._rotate_backups(directory, stem, keep)
+        return True
+
+    def _rotate_backups(self, directory: str, stem: str, keep: int):
+        """Delete all but the newest keep timestamped snapshots of a database."""
+        pattern = re.compile(re.escape(stem) + r'-\d{8}-\d{6}-\d{6}\.db(\.gz)?')
+        # Timestamped names sort in chronological order
+        snapshots = sorted(name for name in os.listdir(directory) if pattern.fullmatch(name))
+        for name in snapshots[:-keep]:
+            os.remove(os.path.join(directory, name))
+            print(f"Removed old backup {os.path.join(directory, name)}")
+
+    def restore(self, snapshot_path: str) -> bool:
+        """Replace the database with a snapshot, after verifying the snapshot's integrity."""
+        backend = self._sqlite_backend("restore")
+        if backend is None:
+            return False
+        if not os.path.isfile(snapshot_path):
+            print(f"Error: Backup file '{snapshot_path}' not found!")
+            return False
+
+        # Verify and restore from a private copy, leaving the snapshot untouched
+        fd, tmp_path = tempfile.mkstemp(prefix='.habit_restore_', suffix='.db',
+                                        dir=os.path.dirname(os.path.abspath(self.db_path)))
+        try:
+            with os.fdopen(fd, 'wb') as tmp_file:
+                opener = gzip.open if snapshot_path.endswith('.gz') else open
+                with opener(snapshot_path, 'rb') as src:
+                    shutil.copyfileobj(src, tmp_file)
+            backend.restore_from(tmp_path)
+        except (StorageError, OSError) as e:
+            print(f"Error: Cannot restore from '{snapshot_path}': {e}")
+            return False
+        finally:
+            os.remove(tmp_path)
+
+        self.refresh_completion_index()
+        print(f"Database restored from {snapshot_path}")
+        return True
+
+    def sync(self, other_path: str) -> bool:
+        """Merge tracking data both ways with another habit tracker database.
+
+        Only the habit-months whose content digests differ are compared, and
+        conflicting days are settled by the most recent write.
+        """
+        backend = self._sqlite_backend("sync")
+        if backend is None:
+            return False
+        if not os.path.isfile(other_path):
+            print(f"Error: Database file '{other_path}' not found!")
+            return False
+        if os.path.exists(self.db_path) and os.path.samefile(other_path, self.db_path):
+            print("Error: Cannot sync a database with itself!")
+            return False
+
+        try:
+            counts = backend.sync_with(other_path)
+        except StorageError as e:
+            print(f"Error: Cannot sync with '{other_path}': {e}")
+            return False
+
+        self.refresh_completion_index()
+        print(f"Synced with {other_path}: {counts['months']} habit-months differed")
+        print(f"  received {counts['habits_received']} habits and {counts['rows_received']} tracking rows")
+        print(f"  sent {counts['habits_sent']} habits and {counts['rows_sent']} tracking rows")
+        if counts['months_skipped']:
+            print(f"  skipped {counts['months_skipped']} differing habit-months that are rolled up "
+                  f"on either side; their changes were not synced")
+        return True
+
+    def data_stamp(self) -> int:
+        """Return a value that changes whenever anything is committed, cheap to read from any thread.
+
+        For SQLite this is the file change counter from the database header,
+        so no query runs and no connection is shared between threads.
+        """
+        if isinstance(self._storage, SQLiteBackend):
+            return self._storage.file_change_counter()
+        return self._storage.data_version()
+
+    @property
+    def window_days(self) -> int:
+        """Number of days in the tracking window, read again whenever the data changed."""
+        stamp = self.data_stamp()
+        cached = self._window_days
+        if cached is None or cached[0] != stamp:
+            try:
+                value = self.backend.get_setting('window_days')
+            except StorageError:
+                value = None
+            cached = (stamp, int(value) if value else self.DEFAULT_WINDOW_DAYS)
+            self._window_days = cached
+        return cached[1]
+
+    def set_window(self, days: int) -> bool:
+        """Set the number of days covered by the calendar, check-in and day numbers."""
+        if not self.MIN_WINDOW_DAYS <= days <= self.MAX_WINDOW_DAYS:
+            print(f"Error: The window must be between {self.MIN_WINDOW_DAYS} and {self.MAX_WINDOW_DAYS} days.")
+            return False
+        try:
+            self.backend.set_setting('window_days', str(days))
+        except StorageError as e:
+            print(f"Error setting window: {e}")
+            return False
+        self._window_days = (self.data_stamp(), days)
+        print(f"Tracking window set to {days} days.")
+        return True
+
+    def _convert_day_to_date(self, day_str: str, today: date = None) -> str:
+        """Convert a day within the tracking window to a full date string, or print an error."""
+        try:
+            return self.resolve_day(day_str, today)
+        except ValueError as e:
+            print(f"Error: {e}")
             return None
-            
-        # Generate the last 30 days
-        dates = []
-        date_objects = []
-        for i in range(29, -1, -1):  # From 29 days ago to today
-            date_obj = datetime.now() - timedelta(days=i)
-            dates.append(date_obj.strftime('%Y-%m-%d'))
-            date_objects.append(date_obj)
-            
-        # Find the date that matches the day number
-        for date_obj, date_str_result in zip(date_objects, dates):
-            if date_obj.day == day:
-                return date_str_result
-                
-        print(f"Error: Day {day} is not within the last 30 days.")
-        return None
 
-    def get_habits(self) -> List[Tuple[int, str]]:
-        """Get all habits."""
+    def resolve_day(self, day_str: str, today: date = None) -> str:
+        """Convert a day within the tracking window to a full date string.
+
+        Accepts a day of the month, 'today', 'yesterday', -N for N days ago,
+        or a weekday name; day numbers and weekdays mean the most recent such
+        day, today included. Raises ValueError for anything else.
+        """
+        today = today or datetime.now().date()
+        token = day_str.strip().lower()
+        if token in ('today', 'yesterday'):
+            days_ago = 0 if token == 'today' else 1
+        elif token in _WEEKDAY_NUMBERS:
+            days_ago = (today.weekday() - _WEEKDAY_NUMBERS[token]) % 7
+        elif token.startswith('-') and token[1:].isdigit():
+            days_ago = int(token[1:])
+        elif token.isdigit() and 1 <= int(token) <= 31:
+            day = int(token)
+            year, month = today.year, today.month
+            if day > today.day:
+                year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+            # At most two months in a row are too short for a day
+            while day > calendar.monthrange(year, month)[1]:
+                year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+            days_ago = (today - date(year, month, day)).days
+        else:
+            raise ValueError(f"Invalid day '{day_str}'. Use a day number, today, yesterday, -N or a weekday name.")
+
+        if days_ago >= self.window_days:
+            raise ValueError(f"Day {day_str} is not within the last {self.window_days} days.")
+        return (today - timedelta(days=days_ago)).isoformat()
+
+    def get_habits(self, tag: str = None) -> List[Tuple[int, str]]:
+        """Get all habits, or only those with the tag."""
         try:
-            with self._get_db_connection() as conn:
-                return conn.execute('SELECT id, name FROM habits ORDER BY id').fetchall()
-        except sqlite3.Error as e:
+            return self.backend.list_habits(tag)
+        except StorageError as e:
             print(f"Error retrieving habits: {e}")
             return []
 
     def get_tracking_data(self, habit_id: int, dates: List[str]) -> dict:
         """Get tracking data for a habit for specific dates."""
         try:
-            with self._get_db_connection() as conn:
-                # Create placeholders for the dates
-                placeholders = ','.join('?' * len(dates))
-                query = f'''
-                    SELECT date, done FROM tracking 
-                    WHERE habit_id = ? AND date IN ({placeholders})
-                '''
-                
-                results = conn.execute(query, [habit_id] + dates).fetchall()
-                
-                # Convert to dictionary for easy lookup
-                return {date: done for date, done in results}
-        except sqlite3.Error as e:
+            return self.backend.get_tracking(habit_id, dates)
+        except StorageError as e:
+            print(f"Error retrieving tracking data: {e}")
+            return {}
+
+    def get_all_tracking_data(self, habit_id: int) -> List[Tuple[str, bool]]:
+        """Get all tracking data for a habit, sorted by date."""
+        try:
+            return [(date, 1) for date in self.backend.get_done_dates(habit_id)]
+        except StorageError as e:
+            print(f"Error retrieving tracking data: {e}")
+            return []
+
+    def iter_tracking_data(self, habit_id: int, start: str = None, end: str = None) -> Iterator[Tuple[str, int]]:
+        """Stream (date, status) pairs for a habit in date order, optionally between two dates."""
+        try:
+            yield from self.backend.iter_tracking(habit_id, start, end)
+        except StorageError as e:
+            print(f"Error retrieving tracking data: {e}")
+
+    def iter_all_tracking_data(self, habit_id: int) -> Iterator[Tuple[str, bool]]:
+        """Stream all done dates for a habit as (date, 1) pairs, sorted by date.
+
+        Unlike get_all_tracking_data, memory use does not grow with the
+        length of the history.
+        """
+        try:
+            for date in self.backend.iter_done_dates(habit_id):
+                yield date, 1
+        except StorageError as e:
             print(f"Error retrieving tracking data: {e}")
+
+    def rollup_tracking(self, keep_days: int = None) -> bool:
+        """Fold tracking rows older than the retention horizon into monthly summaries."""
+        if keep_days is None:
+            keep_days = self.RETENTION_DAYS
+        if keep_days < 0:
+            print("Error: Retention must be zero or more days.")
+            return False
+
+        # Only whole months are rolled up
+        horizon = datetime.now().date() - timedelta(days=keep_days)
+        cutoff = horizon.replace(day=1).strftime('%Y-%m-%d')
+
+        backend = self._sqlite_backend("Rollups")
+        if backend is None:
+            return False
+
+        try:
+            row_count, bucket_count = backend.rollup(cutoff)
+            if not row_count:
+                print(f"No tracking data older than {cutoff} to roll up.")
+                return True
+
+            print(f"Rolled up {row_count} tracking rows older than {cutoff} into {bucket_count} monthly summaries!")
+            self._maybe_auto_maintain()
+            return True
+        except StorageError as e:
+            print(f"Error rolling up tracking data: {e}")
+            return False
+
+    def get_schedule(self, habit_id: int) -> Schedule:
+        """Get the schedule of a habit (daily if it cannot be read)."""
+        try:
+            return Schedule(self.backend.get_schedule(habit_id) or 'daily')
+        except (StorageError, ValueError) as e:
+            print(f"Error retrieving schedule: {e}")
+            return Schedule()
+
+    def get_schedules(self) -> Dict[int, Schedule]:
+        """Get the schedules of all habits."""
+        try:
+            return {habit_id: Schedule(spec) for habit_id, spec in self.backend.get_schedules().items()}
+        except (StorageError, ValueError) as e:
+            print(f"Error retrieving schedules: {e}")
+            return {}
+
+    def set_schedules(self, habits_str: str, spec: str) -> bool:
+        """Set the schedule of comma-separated habits (IDs or names)."""
+        try:
+            schedule = Schedule(spec)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return False
+
+        habit_ids = self.resolve_habits(habits_str)
+        if habit_ids is None:
+            return False
+
+        success = True
+        for habit_id in habit_ids:
+            try:
+                if self.backend.set_schedule(habit_id, schedule.spec):
+                    print(f"Habit {habit_id} is now scheduled {schedule}.")
+                else:
+                    print(f"Error: Habit with ID {habit_id} not found!")
+                    success = False
+            except StorageError as e:
+                print(f"Error setting schedule: {e}")
+                success = False
+        self._maybe_auto_maintain()
+        return success
+
+    def _parse_tag(self, tag: str):
+        """Validate a tag name (an optional leading @ is dropped); return it, or None on error."""
+        valid_tag = _valid_tag(tag)
+        if valid_tag is None:
+            print(f"Error: Invalid tag '{tag.strip().lstrip('@')}'. Tags are single words without commas or @.")
+        return valid_tag
+
+    def tag_habits(self, habits_str: str, tag: str, remove: bool = False) -> bool:
+        """Add a tag to (or remove it from) comma-separated habits (IDs or names)."""
+        tag = self._parse_tag(tag)
+        if tag is None:
+            return False
+        habit_ids = self.resolve_habits(habits_str)
+        if habit_ids is None:
+            return False
+
+        try:
+            if remove:
+                count = self.backend.untag_habits(habit_ids, tag)
+                print(f"Removed tag '{tag}' from {count} habit(s).")
+            else:
+                count = self.backend.tag_habits(habit_ids, tag)
+                print(f"Tagged {count} habit(s) with '{tag}'.")
+        except StorageError as e:
+            print(f"Error updating tags: {e}")
+            return False
+        self._maybe_auto_maintain()
+        return True
+
+    def show_tags(self):
+        """Display the tags of every habit."""
+        habits = self.get_habits()
+        if not habits:
+            print("No habits found. Add some habits to start tracking!")
+            return
+
+        try:
+            tags = self.backend.get_tags()
+        except StorageError as e:
+            print(f"Error retrieving tags: {e}")
+            return
+        print(f"{'ID':<3} {'Habit':<16} {'Tags'}")
+        print("-" * 40)
+        for habit_id, habit_name in habits:
+            print(f"{habit_id:<3} {habit_name:<16} {', '.join(tags.get(habit_id, []))}")
+
+    def track_tag(self, tag: str, done: bool, date_str: str = None) -> bool:
+        """Mark every habit with the tag as done or not done for a date, in one transaction."""
+        tag = self._parse_tag(tag)
+        if tag is None:
+            return False
+        if date_str and _is_full_date(date_str):
+            try:
+                datetime.strptime(date_str, '%Y-%m-%d')
+                target_date = date_str
+            except ValueError:
+                print(f"Error: Invalid date format '{date_str}'. Use YYYY-MM-DD.")
+                return False
+        else:
+            target_date = self._parse_date(date_str)
+            if not target_date:
+                return False
+
+        try:
+            habit_ids = self.backend.upsert_tracking_for_tag(tag, target_date, done)
+        except StorageError as e:
+            print(f"Error tracking habits: {e}")
+            return False
+        if not habit_ids:
+            print(f"Error: No habits tagged '{tag}'!")
+            return False
+
+        status = "done" if done else "not done"
+        print(f"{len(habit_ids)} habit(s) tagged '{tag}' tracked as {status} for {target_date}!")
+        self._maybe_auto_maintain()
+        return True
+
+    def set_reminders(self, habits_str: str, time_str: str) -> bool:
+        """Set the daily reminder time (HH:MM, or 'off') of comma-separated habits (IDs or names)."""
+        remind_at = None
+        if time_str.strip().lower() != 'off':
+            try:
+                remind_at = datetime.strptime(time_str.strip(), '%H:%M').strftime('%H:%M')
+            except ValueError:
+                print(f"Error: Invalid reminder time '{time_str}'. Use HH:MM (24-hour) or 'off'.")
+                return False
+
+        habit_ids = self.resolve_habits(habits_str)
+        if habit_ids is None:
+            return False
+
+        success = True
+        for habit_id in habit_ids:
+            try:
+                if self.backend.set_reminder(habit_id, remind_at):
+                    print(f"Habit {habit_id} reminder " + (f"set for {remind_at}." if remind_at else "turned off."))
+                else:
+                    print(f"Error: Habit with ID {habit_id} not found!")
+                    success = False
+            except StorageError as e:
+                print(f"Error setting reminder: {e}")
+                success = False
+        self._maybe_auto_maintain()
+        return success
+
+    def show_reminders(self):
+        """Display the reminder time of every habit."""
+        habits = self.get_habits()
+        if not habits:
+            print("No habits found. Add some habits to start tracking!")
+            return
+
+        try:
+            reminders = self.backend.get_reminders()
+        except StorageError as e:
+            print(f"Error retrieving reminders: {e}")
+            return
+        print(f"{'ID':<3} {'Habit':<16} {'Reminder'}")
+        print("-" * 40)
+        for habit_id, habit_name in habits:
+            print(f"{habit_id:<3} {habit_name:<16} {reminders.get(habit_id, 'off')}")
+
+    def remind(self, hook: str = None, poll: float = 5.0):
+        """Run the reminder daemon until interrupted."""
+        if poll <= 0:
+            print("Error: The poll interval must be greater than 0 seconds.")
+            return False
+        try:
+            asyncio.run(ReminderScheduler(self, hook, poll).run())
+        except KeyboardInterrupt:
+            pass
+
+    def show_schedules(self):
+        """Display the schedule of every habit."""
+        habits = self.get_habits()
+        if not habits:
+            print("No habits found. Add some habits to start tracking!")
+            return
+
+        schedules = self.get_schedules()
+        print(f"{'ID':<3} {'Habit':<16} {'Schedule'}")
+        print("-" * 40)
+        for habit_id, habit_name in habits:
+            print(f"{habit_id:<3} {habit_name:<16} {schedules.get(habit_id, Schedule())}")
+
+    def calculate_streaks(self, habit_id: int, schedule: Schedule = None) -> Tuple[int, int]:
+        """Calculate (current streak, longest streak) for a habit in one pass."""
+        schedule = schedule or self.get_schedule(habit_id)
+        # Stream the done dates for this habit, sorted by date
+        done_dates = (datetime.strptime(date, '%Y-%m-%d').date() for date, done in self.iter_all_tracking_data(habit_id))
+        return streaks_from_dates(done_dates, datetime.now().date(), schedule)
+
+    def refresh_habit_stats(self, tag: str = None) -> Dict[int, Tuple[int, Optional[int], int]]:
+        """Return {habit_id: (longest, last met period, last run length)} for all habits (or those with the tag).
+
+        Only habits whose data changed since their statistics were stored
+        have their history read again; the new values are stored in one batch.
+        """
+        try:
+            marker, _ = self.backend.tracking_changes_since(None)
+            stats = self.backend.get_habit_stats()
+            specs = self.backend.get_schedules()
+            rows = []
+            for habit_id, _ in self.get_habits(tag):
+                if habit_id in stats:
+                    continue
+                spec = specs.get(habit_id, 'daily')
+                done_dates = (datetime.strptime(date, '%Y-%m-%d').date() for date in self.backend.iter_done_dates(habit_id))
+                stats[habit_id] = streak_runs(done_dates, Schedule(spec))
+                rows.append((habit_id, spec, *stats[habit_id]))
+            if rows:
+                self.backend.put_habit_stats(rows, marker)
+            return stats
+        except (StorageError, ValueError) as e:
+            print(f"Error refreshing streak statistics: {e}")
             return {}
 
-    def get_all_tracking_data(self, habit_id: int) -> List[Tuple[str, bool]]:
-        """Get all tracking data for a habit, sorted by date."""
-        try:
-            with self._get_db_connection() as conn:
-                query = '''
-                    SELECT date, done FROM tracking 
-                    WHERE habit_id = ? AND done = 1
-                    ORDER BY date
-                '''
-                return conn.execute(query, (habit_id,)).fetchall()
-        except sqlite3.Error as e:
-            print(f"Error retrieving tracking data: {e}")
-            return []
+    def recompute_streaks(self, workers: int = None) -> bool:
+        """Recompute the stored streak statistics of every habit from scratch.
+
+        Habits are split into contiguous ID ranges worked through by a
+        process pool, each worker streaming its ranges' done dates over a
+        read-only connection; the results are stored in one batch. Other
+        backends, or a single worker, compute the ranges in this process.
+        """
+        if workers is not None and workers < 1:
+            print("Error: The number of workers must be at least 1.")
+            return False
+        workers = workers or os.cpu_count() or 1
+        try:
+            marker, _ = self.backend.tracking_changes_since(None)
+            specs = self.backend.get_schedules()
+        except StorageError as e:
+            print(f"Error reading habits: {e}")
+            return False
+        habit_ids = sorted(specs)
+        if not habit_ids:
+            print("No habits found. Add some habits to start tracking!")
+            return False
+
+        # A few partitions per worker keep every worker busy until the end
+        size = -(-len(habit_ids) // min(len(habit_ids), workers * 4))
+        tasks = [((ids[0], ids[-1]), {habit_id: specs[habit_id] for habit_id in ids})
+                 for ids in (habit_ids[i:i + size] for i in range(0, len(habit_ids), size))]
+        workers = min(workers, len(tasks)) if isinstance(self._storage, SQLiteBackend) else 1
+        started = time.perf_counter()
+        rows = []
+
+        def collect(results):
+            for partition_rows in results:
+                rows.extend(partition_rows)
+                print(f"\rRecomputing streaks: {len(rows)}/{len(habit_ids)} habits", end='', flush=True)
+
+        try:
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_recompute_partition, self._storage.db_path, *task) for task in tasks]
+                    collect(future.result() for future in as_completed(futures))
+            else:
+                collect(_partition_streak_rows(self.backend, *task) for task in tasks)
+            print()
+            self.backend.put_habit_stats(rows, marker)
+        except (StorageError, ValueError, OSError, BrokenProcessPool) as e:
+            print(f"\nError recomputing streaks: {e}")
+            return False
+        print(f"Recomputed streaks of {len(rows)} habits in {time.perf_counter() - started:.2f}s "
+              f"({len(tasks)} partitions, {workers} worker(s))")
+        return True
+
+    def rank_habits(self, by: str = 'current', n: int = None, bottom: bool = False,
+                    tag: str = None) -> List[Tuple[int, str, float]]:
+        """Return the n best (or worst) habits, optionally only those with the tag, as (id, name, value), ties by ID.
+
+        by is one of RANK_KEYS. Streaks come from the stored statistics and
+        the completion rate from the calendar window only, so no habit's full
+        history is read unless it changed since the last ranking.
+        """
+        habits = self.get_habits(tag)
+        schedules = self.get_schedules()
+        today = datetime.now().date()
+        if by == 'rate':
+            window = self._window_dates(today)[0]
+            try:
+                recent = self.backend.get_done_dates_since(window[0].strftime('%Y-%m-%d'))
+            except StorageError as e:
+                print(f"Error retrieving tracking data: {e}")
+                return []
+            values = {habit_id: round(schedules.get(habit_id, Schedule()).completion_rate(
+                          (datetime.strptime(date, '%Y-%m-%d').date() for date in recent.get(habit_id, [])), window), 4)
+                      for habit_id, _ in habits}
+        else:
+            stats = self.refresh_habit_stats(tag)
+            if by == 'longest' and tag is None and len(stats) == len(habits):
+                # Every habit has stored statistics: read the ranking off the index
+                names = dict(habits)
+                try:
+                    return [(habit_id, names[habit_id], longest)
+                            for habit_id, longest in self.backend.top_longest(n, ascending=bottom)
+                            if habit_id in names]
+                except StorageError as e:
+                    print(f"Error ranking habits: {e}")
+                    return []
+            values = {}
+            for habit_id, _ in habits:
+                longest, last_period, last_run = stats.get(habit_id, (0, None, 0))
+                if by == 'longest':
+                    values[habit_id] = longest
+                    continue
+                schedule = schedules.get(habit_id, Schedule())
+                if last_period is not None and last_period > schedule.period(today):
+                    # Tracked ahead of today: the stored run does not end at today's period
+                    values[habit_id] = self.calculate_streaks(habit_id, schedule)[0]
+                else:
+                    values[habit_id] = current_streak_from_run(schedule, today, last_period, last_run)
+
+        # Partial selection keeps only n rows in the heap
+        ranked = ((habit_id, habit_name, values[habit_id]) for habit_id, habit_name in habits)
+        key = (lambda row: (row[2], row[0])) if bottom else (lambda row: (-row[2], row[0]))
+        return heapq.nsmallest(n, ranked, key=key) if n is not None else sorted(ranked, key=key)
+
+    def show_top(self, by: str = 'current', n: int = 10, bottom: bool = False, fmt: str = 'text', tag: str = None):
+        """Display the n best (or worst) habits by current streak, longest streak or completion rate."""
+        rows = self.rank_habits(by, n, bottom, tag)
+        if fmt != 'text':
+            write_records(({'rank': rank, 'id': habit_id, 'name': habit_name, by: value}
+                           for rank, (habit_id, habit_name, value) in enumerate(rows, 1)),
+                          ['rank', 'id', 'name', by], fmt)
+            return
+
+        if not rows:
+            print("No habits found. Add some habits to start tracking!")
+            return
+
+        titles = {'current': 'Current Streak', 'longest': 'Longest Streak', 'rate': f'Rate ({self.window_days}d)'}
+        print(f"{'#':<4} {'ID':<3} {'Habit':<16} {titles[by]:>14}")
+        print("-" * 40)
+        for rank, (habit_id, habit_name, value) in enumerate(rows, 1):
+            value_display = f"{value:.0%}" if by == 'rate' else value
+            print(f"{rank:<4} {habit_id:<3} {habit_name:<16} {value_display:>14}")
 
     def calculate_current_streak(self, habit_id: int) -> int:
         """Calculate the current streak for a habit."""
-        # Get all done dates for this habit, sorted by date
-        tracking_data = self.get_all_tracking_data(habit_id)
-        done_dates = [datetime.strptime(date, '%Y-%m-%d').date() for date, done in tracking_data]
-        
-        if not done_dates:
-            return 0
-            
-        # Start with today's date
-        current_date = datetime.now().date()
-        streak = 0
-        
-        # Check if the habit was done today or yesterday (to account for end of day)
-        # If not, the streak is broken
-        if current_date not in done_dates and (current_date - timedelta(days=1)) not in done_dates:
-            return 0
-            
-        # Count backwards from today
-        while current_date in done_dates:
-            streak += 1
-            current_date -= timedelta(days=1)
-            
-        return streak
+        return self.calculate_streaks(habit_id)[0]
 
     def calculate_longest_streak(self, habit_id: int) -> int:
         """Calculate the longest streak for a habit."""
-        # Get all done dates for this habit, sorted by date
-        tracking_data = self.get_all_tracking_data(habit_id)
-        done_dates = [datetime.strptime(date, '%Y-%m-%d').date() for date, done in tracking_data]
-        
-        if not done_dates:
-            return 0
-            
-        # Calculate longest consecutive streak
-        longest_streak = 0
-        current_streak = 1
-        
-        for i in range(1, len(done_dates)):
-            # Check if this date is consecutive to the previous one
-            if (done_dates[i] - done_dates[i-1]).days == 1:
-                current_streak += 1
-            else:
-                # Streak is broken, update longest if needed
-                longest_streak = max(longest_streak, current_streak)
-                current_streak = 1
-                
-        # Don't forget to check the final streak
-        longest_streak = max(longest_streak, current_streak)
-        
-        return longest_streak
+        return self.calculate_streaks(habit_id)[1]
 
-    def checkin(self, date_str: str = None) -> bool:
-        """Cycle through all habits and ask user if each one is done for a specific date."""
-        habits = self.get_habits()
+    def checkin(self, date_str: str = None, habits_str: str = None, tag: str = None) -> bool:
+        """Cycle through all habits and ask user if each one is done for a specific date.
+
+        habits_str optionally limits the check-in to comma-separated habit IDs or
+        names, and tag to the habits with that tag.
+        """
+        habits = self.get_habits(tag)
         
         if not habits:
-            print("No habits found. Add some habits to start tracking!")
+            if tag:
+                print(f"No habits tagged '{tag}'.")
+            else:
+                print("No habits found. Add some habits to start tracking!")
             return False
 
+        if habits_str:
+            habit_ids = self.resolve_habits(habits_str)
+            if habit_ids is None:
+                return False
+            known_ids = {habit_id for habit_id, _ in habits}
+            for habit_id in habit_ids:
+                if habit_id not in known_ids:
+                    print(f"Error: Habit with ID {habit_id} not found!")
+                    return False
+            selected = set(habit_ids)
+            habits = [(habit_id, habit_name) for habit_id, habit_name in habits if habit_id in selected]
+
         target_date = self._parse_date(date_str)
         if not target_date:
             return False
             
-        date_display = datetime.strptime(target_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+        target_day = datetime.strptime(target_date, '%Y-%m-%d').date()
+        date_display = target_day.strftime('%Y-%m-%d')
         print(f"Habit Check-in for {date_display}")
         print("=" * 30)
         
+        schedules = self.get_schedules()
         for habit_id, habit_name in habits:
+            schedule = schedules.get(habit_id, Schedule())
+
+            # Habits not due on this weekday are only asked about when named explicitly
+            if not habits_str and not schedule.is_scheduled(target_day):
+                print(f"\nHabit {habit_id}: {habit_name} is not scheduled on {target_day.strftime('%A')}s, skipping.")
+                continue
+
             # Get current status for the target date
             tracking_data = self.get_tracking_data(habit_id, [target_date])
             current_status = tracking_data.get(target_date, None)
@@ -331,6 +1102,12 @@ class HabitTracker:
                 
             print(f"\nHabit {habit_id}: {habit_name}")
             print(f"Current status for {date_display}: {status_display}")
+            if schedule.unit != 'day':
+                # Show progress towards the target of the week or month
+                start, end = schedule.period_bounds(target_day)
+                done_count = sum(1 for _, done in self.iter_tracking_data(
+                    habit_id, start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d')) if done)
+                print(f"Progress this {schedule.unit}: {done_count}/{schedule.target}")
             
             # Ask user for the specified date's status
             while True:
@@ -359,68 +1136,374 @@ class HabitTracker:
             # Use today's date
             return datetime.now().strftime('%Y-%m-%d')
         
-        # For checkin command, only allow day numbers, not full dates
-        # Check if it's a full date string (YYYY-MM-DD) or a day number
-        if '-' in date_str:
+        # For checkin command, only allow days, not full dates
+        # Check if it's a full date string (YYYY-MM-DD) or a day
+        if _is_full_date(date_str):
             # It's a full date string - for checkin, we want to disallow this
             print(f"Error: Use day number (e.g., 15) instead of full date (e.g., 2023-09-15) for checkin command")
             return None
         else:
-            # It's a day number, validate and convert it
+            # It's a day number or relative day, validate and convert it
             return self._convert_day_to_date(date_str)
 
-    def show_calendar(self):
-        """Display a calendar view of habit tracking for the last 30 days."""
-        habits = self.get_habits()
-        
-        if not habits:
+    def _window_dates(self, today: date = None, size: int = None) -> Tuple[List[date], List[str]]:
+        """Return the days of the tracking window, oldest first, as dates and as strings.
+
+        size optionally overrides the window size. Built once per day and
+        window size and shared by every view.
+        """
+        today = today or datetime.now().date()
+        size = size or self.window_days
+        window = self._window
+        if window is None or window[:2] != (today, size):
+            days = [today - timedelta(days=i) for i in range(size - 1, -1, -1)]
+            window = (today, size, days, [day.isoformat() for day in days])
+            self._window = window
+        return window[2], window[3]
+
+    def _calendar_dates(self, today: date = None) -> List[str]:
+        """Return the dates covered by the calendar view, oldest first."""
+        return self._window_dates(today)[1]
+
+    def iter_calendar_rows(self, dates: List[str], habits: List[Tuple[int, str]] = None):
+        """Yield (id, name, statuses, current streak, longest streak) per habit.
+
+        statuses holds True/False/None (not tracked) for each date in dates.
+        habits optionally gives the (id, name) pairs to show, in order.
+        This is the single data path shared by all calendar output formats.
+        """
+        schedules = self.get_schedules()
+        for habit_id, habit_name in (self.get_habits() if habits is None else habits):
+            tracking_data = self.get_tracking_data(habit_id, dates)
+            statuses = [bool(tracking_data[date]) if date in tracking_data else None for date in dates]
+            yield (habit_id, habit_name, statuses,
+                   *self.calculate_streaks(habit_id, schedules.get(habit_id, Schedule())))
+
+    def iter_streak_rows(self, tag: str = None):
+        """Yield (id, name, current streak, longest streak) per habit, or per habit with the tag."""
+        schedules = self.get_schedules()
+        for habit_id, habit_name in self.get_habits(tag):
+            yield (habit_id, habit_name,
+                   *self.calculate_streaks(habit_id, schedules.get(habit_id, Schedule())))
+
+    def show_calendar(self, fmt: str = 'text', sort_by: str = None, limit: int = None, tag: str = None):
+        """Display a calendar view of habit tracking for the tracking window.
+
+        sort_by optionally orders habits best first by one of RANK_KEYS,
+        limit shows only the first that many habits, and tag only the
+        habits with that tag.
+        """
+        days, dates = self._window_dates()
+        habits = None
+        if sort_by is not None:
+            habits = [(habit_id, habit_name) for habit_id, habit_name, _ in self.rank_habits(sort_by, limit, tag=tag)]
+        elif limit is not None or tag is not None:
+            habits = self.get_habits(tag)[:limit]
+        rows = self.iter_calendar_rows(dates, habits)
+
+        if fmt == 'csv':
+            # One column per date: 1 done, 0 not done, empty when not tracked
+            status_values = {True: 1, False: 0, None: ''}
+            write_records(({'id': habit_id, 'name': habit_name,
+                            **{date: status_values[status] for date, status in zip(dates, statuses)},
+                            'current_streak': current_streak, 'longest_streak': longest_streak}
+                           for habit_id, habit_name, statuses, current_streak, longest_streak in rows),
+                          ['id', 'name'] + dates + ['current_streak', 'longest_streak'], fmt)
+            return
+        if fmt != 'text':
+            write_records(({'id': habit_id, 'name': habit_name,
+                            'days': dict(zip(dates, statuses)),
+                            'current_streak': current_streak, 'longest_streak': longest_streak}
+                           for habit_id, habit_name, statuses, current_streak, longest_streak in rows),
+                          ['id', 'name', 'days', 'current_streak', 'longest_streak'], fmt)
+            return
+
+        first_row = next(rows, None)
+        if first_row is None:
             print("No habits found. Add some habits to start tracking!")
             return
         
-        # Generate last 30 days
-        dates = []
-        for i in range(29, -1, -1):  # From 29 days ago to today
-            date = datetime.now() - timedelta(days=i)
-            dates.append(date.strftime('%Y-%m-%d'))
+        # Print header
+        for line in self._format_calendar_header(dates):
+            print(line)
         
+        # Print each habit's tracking data, marking days it is not scheduled on
+        schedules = self.get_schedules()
+        for row_data in chain([first_row], rows):
+            schedule = schedules.get(row_data[0], Schedule())
+            print(self._format_calendar_row(*row_data, [schedule.is_scheduled(day) for day in days]))
+
+    def _format_calendar_header(self, dates: List[str]) -> List[str]:
+        """Format the calendar header and separator lines."""
         # Get date headers (just the day numbers)
-        date_headers = [datetime.strptime(date, '%Y-%m-%d').strftime('%d') for date in dates]
+        date_headers = [date[8:10] for date in dates]
+        return [f"{'ID':<3} {'Habit':<16} " + " ".join(f"{day:>2}" for day in date_headers) + f" {'Current Streak':>13} {'Longest Streak':>13}",
+                "-" * (20 + len(dates) * 3 + 15 + 15)]
+
+    def _format_calendar_row(self, habit_id: int, habit_name: str, statuses: List[bool],
+                             current_streak: int, longest_streak: int, scheduled: List[bool] = None) -> str:
+        """Format one habit's calendar row with color codes.
+
+        scheduled optionally flags, per date, whether the habit is due that day.
+        """
+        # Build row data
+        row = f"{habit_id:<3} {habit_name:<16} "
+        for status, due in zip(statuses, scheduled or [True] * len(statuses)):
+            if status:  # Done
+                row += f" {Colors.GREEN}D{Colors.RESET} "
+            elif not due:  # Not scheduled on this day (show as .)
+                row += " . "
+            else:  # Not done or no data (show as -)
+                row += " - "
         
-        # Print header
-        print(f"{'ID':<3} {'Habit':<16} " + " ".join(f"{day:>2}" for day in date_headers) + f" {'Current Streak':>13} {'Longest Streak':>13}")
-        print("-" * (20 + 30 * 3 + 15 + 15))
+        # Add streak data with colors
+        if current_streak < longest_streak:
+            current_streak_display = f"{Colors.RED}{current_streak:>13}{Colors.RESET}"
+        else:
+            current_streak_display = f"{Colors.GREEN}{current_streak:>13}{Colors.RESET}"
+        
+        # For longest streak, we can use a different color or keep it neutral
+        longest_streak_display = f"{Colors.YELLOW}{longest_streak:>13}{Colors.RESET}"
         
-        # Print each habit's tracking data
+        row += f" {current_streak_display} {longest_streak_display}"
+        return row
+
+    def show_streaks(self, fmt: str = 'text', tag: str = None):
+        """Display current and longest streaks for all habits, or those with the tag."""
+        rows = self.iter_streak_rows(tag)
+        if fmt != 'text':
+            write_records(({'id': habit_id, 'name': habit_name,
+                            'current_streak': current_streak, 'longest_streak': longest_streak}
+                           for habit_id, habit_name, current_streak, longest_streak in rows),
+                          ['id', 'name', 'current_streak', 'longest_streak'], fmt)
+            return
+
+        first_row = next(rows, None)
+        if first_row is None:
+            print("No habits found. Add some habits to start tracking!")
+            return
+
+        print(f"{'ID':<3} {'Habit':<16} {'Current Streak':>14} {'Longest Streak':>14}")
+        print("-" * 50)
+        for habit_id, habit_name, current_streak, longest_streak in chain([first_row], rows):
+            print(f"{habit_id:<3} {habit_name:<16} {current_streak:>14} {longest_streak:>14}")
+
+    def list_habits(self, fmt: str = 'text', tag: str = None):
+        """Display all habits, or those with the tag, with their IDs."""
+        habits = self.get_habits(tag)
+        if fmt != 'text':
+            write_records(({'id': habit_id, 'name': habit_name} for habit_id, habit_name in habits),
+                          ['id', 'name'], fmt)
+            return
+
+        if not habits:
+            print("No habits found. Add some habits to start tracking!")
+            return
+
+        print(f"{'ID':<3} {'Habit'}")
+        print("-" * 20)
         for habit_id, habit_name in habits:
-            tracking_data = self.get_tracking_data(habit_id, dates)
-            
-            # Calculate streaks
-            current_streak = self.calculate_current_streak(habit_id)
-            longest_streak = self.calculate_longest_streak(habit_id)
-            
-            # Build row data
-            row = f"{habit_id:<3} {habit_name:<16} "
-            for date in dates:
-                if date in tracking_data:
-                    if tracking_data[date]:  # Done
-                        row += f" {Colors.GREEN}D{Colors.RESET} "
-                    else:  # Not done (show as -)
-                        row += " - "
-                else:  # No data
-                    row += " - "
-            
-            # Add streak data with colors
-            if current_streak < longest_streak:
-                current_streak_display = f"{Colors.RED}{current_streak:>13}{Colors.RESET}"
-            else:
-                current_streak_display = f"{Colors.GREEN}{current_streak:>13}{Colors.RESET}"
-            
-            # For longest streak, we can use a different color or keep it neutral
-            longest_streak_display = f"{Colors.YELLOW}{longest_streak:>13}{Colors.RESET}"
-            
-            row += f" {current_streak_display} {longest_streak_display}"
-            
-            print(row)
+            print(f"{habit_id:<3} {habit_name}")
+
+    def show_summary(self, by: str = 'month', fmt: str = 'text'):
+        """Display completion totals across all habits per day, week, month or year.
+
+        Reads only the per-day totals, so the cost does not depend on the
+        number of habits.
+        """
+        try:
+            totals = self.backend.get_completion_totals(by)
+        except StorageError as e:
+            print(f"Error retrieving totals: {e}")
+            return
+
+        if fmt != 'text':
+            write_records(({'period': period, 'done': done, 'tracked': tracked,
+                            'rate': round(done / tracked, 4) if tracked else 0}
+                           for period, done, tracked in totals),
+                          ['period', 'done', 'tracked', 'rate'], fmt)
+            return
+
+        if not totals:
+            print("No tracking data yet. Track some habits to see a summary!")
+            return
+
+        print(f"{by.capitalize():<10} {'Done':>7} {'Tracked':>8} {'Rate':>7}")
+        print("-" * 66)
+        for period, done, tracked in totals:
+            rate = done / tracked if tracked else 0
+            bar = f"{Colors.GREEN}{'#' * round(rate * 30)}{Colors.RESET}"
+            print(f"{period:<10} {done:>7} {tracked:>8} {rate:>7.1%}  {bar}")
+
+    def rebuild_totals(self) -> bool:
+        """Recompute the per-day totals behind the summary view from the tracking data."""
+        try:
+            days = self.backend.rebuild_daily_totals()
+        except StorageError as e:
+            print(f"Error rebuilding totals: {e}")
+            return False
+        print(f"Rebuilt totals for {days} days.")
+        return True
+
+    def collect_metrics(self, tag: str = None) -> List[str]:
+        """Build Prometheus text exposition lines for all habits (or those with the tag) and the database.
+
+        Uses a fixed number of queries regardless of the number of habits:
+        one for the habits, one for their schedules, one ordered scan of each
+        tracking tier, and one row count per table. Each habit's history is
+        reduced to its samples as the scan reaches it, so only one habit's
+        done dates are held in memory at a time.
+        """
+        started = time.perf_counter()
+        today = datetime.now().date()
+        window = [today - timedelta(days=i) for i in range(29, -1, -1)]
+        lines = []
+
+        def gauge(name, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape_label(str(val))}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        habits = self.backend.list_habits(tag)
+        schedules = self.get_schedules()
+
+        def habit_values(habit_id, done_dates):
+            # (current streak, longest streak, done today, 30-day rate)
+            schedule = schedules.get(habit_id, Schedule())
+            recent = done_dates[bisect_left(done_dates, window[0]):]
+            current_streak, longest_streak = streaks_from_dates(done_dates, today, schedule)
+            return (current_streak, longest_streak, 1 if done_dates and done_dates[-1] == today else 0,
+                    round(schedule.completion_rate(recent, window), 4))
+
+        values = {habit_id: habit_values(habit_id, [datetime.strptime(date_str, '%Y-%m-%d').date()
+                                                    for date_str in done_dates])
+                  for habit_id, done_dates in self.backend.iter_done_dates_by_habit(tag)}
+        table_rows = self.backend.table_row_counts()
+
+        samples = {'current': [], 'longest': [], 'today': [], 'rate': [], 'schedule': []}
+        for habit_id, habit_name in habits:
+            # Habits without any history are not in the scan
+            current_streak, longest_streak, done_today, rate = values.get(habit_id) or habit_values(habit_id, [])
+            labels = {'habit_id': habit_id, 'habit': habit_name}
+            samples['current'].append((labels, current_streak))
+            samples['longest'].append((labels, longest_streak))
+            samples['today'].append((labels, done_today))
+            samples['rate'].append((labels, rate))
+            samples['schedule'].append(({**labels, 'schedule': schedules.get(habit_id, Schedule())}, 1))
+
+        gauge('habit_tracker_current_streak_days',
+              'Current streak of the habit in schedule periods (days for daily habits).', samples['current'])
+        gauge('habit_tracker_longest_streak_days',
+              'Longest streak of the habit in schedule periods (days for daily habits).', samples['longest'])
+        gauge('habit_tracker_done_today', 'Whether the habit has been done today.', samples['today'])
+        gauge('habit_tracker_completion_rate_30d',
+              'Share of the scheduled done days over the last 30 days that the habit was done.', samples['rate'])
+        gauge('habit_tracker_habit_schedule_info', 'Schedule of the habit.', samples['schedule'])
+        gauge('habit_tracker_habits', 'Number of tracked habits.', [({}, len(habits))])
+        gauge('habit_tracker_db_size_bytes', 'Size of the habits database file.',
+              [({}, os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0)])
+        gauge('habit_tracker_table_rows', 'Number of rows per database table.',
+              [({'table': table}, rows) for table, rows in table_rows.items()])
+        gauge('habit_tracker_export_duration_seconds', 'Time taken to compute these metrics.',
+              [({}, round(time.perf_counter() - started, 6))])
+        return lines
+
+    def export_metrics(self, output_path: str = "habits.prom", force: bool = False, tag: str = None) -> bool:
+        """Atomically write Prometheus metrics to a textfile collector file.
+
+        The rewrite is skipped when nothing was committed to the database
+        (and the day has not changed) since the file was last written.
+        tag limits the per-habit metrics to the habits with that tag.
+        """
+        backend = self._sqlite_backend("Metrics export")
+        if backend is None:
+            return False
+
+        stamp = f"# habit_tracker_data_version {backend.file_change_counter()} {datetime.now().strftime('%Y-%m-%d')}"
+        if tag:
+            stamp += f" tag={tag}"
+        if not force and os.path.exists(output_path):
+            with open(output_path) as existing:
+                if existing.readline().rstrip('\n') == stamp:
+                    return True
+
+        try:
+            lines = [stamp] + self.collect_metrics(tag)
+        except StorageError as e:
+            print(f"Error collecting metrics: {e}")
+            return False
+
+        # Write to a temporary file in the same directory and rename it into
+        # place, so the collector never reads a partially written file
+        directory = os.path.dirname(os.path.abspath(output_path))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix='.habit_metrics_', suffix='.tmp', dir=directory)
+            with os.fdopen(fd, 'w') as tmp_file:
+                tmp_file.write('\n'.join(lines) + '\n')
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, output_path)
+        except OSError as e:
+            print(f"Error writing metrics file: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        return True
+
+    def export_metrics_loop(self, output_path: str, interval: float, tag: str = None):
+        """Keep exporting metrics, re-checking the backend's data version every interval."""
+        last_version = None
+        try:
+            while True:
+                version = (self.backend.data_version(), datetime.now().date())
+                if version != last_version:
+                    self.export_metrics(output_path, force=True, tag=tag)
+                    last_version = version
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+    def watch(self, interval: float = 1.0):
+        """Keep the calendar on screen, redrawing only the lines that change."""
+        watcher = CalendarWatcher(self)
+        out = sys.stdout
+        # Clear the screen and hide the cursor while redrawing in place
+        out.write('\033[2J\033[?25l')
+        try:
+            while True:
+                height = len(watcher.lines)
+                for line_no, text in watcher.poll():
+                    out.write(f'\033[{line_no + 1};1H{text}\033[K')
+                if len(watcher.lines) < height:
+                    # Clear rows of habits that were removed
+                    out.write(f'\033[{len(watcher.lines) + 1};1H\033[J')
+                out.flush()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            out.write(f'\033[{len(watcher.lines) + 1};1H\033[?25h')
+            out.flush()
+
+    def serve_http(self, host: str = '127.0.0.1', port: int = 8765, quiet: bool = False):
+        """Serve habit data as a JSON API until interrupted (see HabitAPI)."""
+        try:
+            server = make_http_server(self, host, port, quiet)
+        except OSError as e:
+            print(f"Error starting HTTP server: {e}")
+            return False
+        print(f"Serving habit data on http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return True
 
     def show_help(self):
         """Display detailed help information."""
@@ -433,20 +1516,77 @@ Commands:
   remove <id1,id2,...>     Remove habits and their tracking history by IDs (comma-separated)
   rm <id1,id2,...>         Alias for remove command
   checkin                  Cycle through all habits and track today's progress
-  checkin on <day>         Cycle through all habits and track for a specific day (by day number)
+  checkin on <day>         Cycle through all habits and track for a specific day: a day number,
+                           today, yesterday, -N (N days ago) or a weekday name
+  checkin <id1,id2,...>    Check in only the given habits (optionally followed by on <day>)
   +<id>                    Mark a habit as done for today (by ID)
   +<id> on <day>           Mark a habit as done for a specific day (by ID)
   -<id>                    Mark a habit as not done for today (by ID)
   -<id> on <day>           Mark a habit as not done for a specific day (by ID)
+  +@<tag> / -@<tag>        Mark every habit with the tag as done / not done for today
+                           (optionally followed by on <day>), in one transaction
+  tag                      Show the tags of every habit
+  tag <ids> <tag>          Tag habits
+  untag <ids> <tag>        Remove a tag from habits
+  --tag <tag>              Limit calendar, list, streaks, top, checkin and export-metrics
+                           to the habits with the tag
+  schedule                 Show the schedule of every habit
+  schedule <ids> <spec>    Set the schedule of habits: daily, weekdays (mon,wed,fri),
+                           N/week or N/month. Streaks count scheduled days, weeks or months
+  remind                   Show the reminder time of every habit
+  remind <ids> <HH:MM|off> Set or turn off the daily reminder of habits
+  remind --daemon          Run the reminder daemon: at each habit's reminder time, run the
+                           --hook command (or print a line) if the habit is not done yet
+  completions <prefix>     List habit names starting with prefix
+  completions --script     Print a bash completion script
+
+  Anywhere a habit ID is accepted, the exact habit name can be used instead.
+  rollup                   Fold tracking data older than a year into monthly summaries
+  rollup --keep-days <n>   Fold tracking data older than n days into monthly summaries
+  list                     List all habits with their IDs
+  streaks                  Show current and longest streaks for all habits
+  calendar                 Display calendar view of habit tracking
+  calendar --sort <key> --limit <n>
+                           Show habits best first by current, longest or rate, only n of them
+  top                      Show the 10 habits with the longest current streaks
+  top --by <key> -n <n>    Rank n habits by current or longest streak, or rate over the window
+  top --bottom             Show the worst performers instead
+  --format <fmt>           Output format for list, streaks, calendar, top and summary:
+                           text (default), json, jsonl or csv
+  summary                  Show monthly completion totals across all habits
+  summary --by <period>    Group totals by day, week, month or year
+  rebuild-totals           Recompute the totals behind the summary view
+  recompute                Recompute the stored streaks of every habit, in parallel
+  recompute --workers <n>  Use n worker processes (default: one per CPU)
+  window                   Show the number of days in the tracking window
+  window <days>            Set the window (7-366 days, default 30) used by the calendar,
+                           check-in and day numbers
+  watch                    Keep the calendar on screen and update it live
+  watch --interval <s>     Check for changes every s seconds (default: 1)
+  serve-http               Serve habits, calendar, streaks, top and summary as JSON on
+                           http://127.0.0.1:8765/, and accept POST /track
+  serve-http --host <h> --port <p>  Listen on another address
+  export-metrics [<file>]  Write Prometheus metrics (default: habits.prom)
+  export-metrics --interval <s>  Keep exporting whenever the data changes
+  backup [<file|dir>]      Write an online snapshot of the database (default: backups/)
+  backup --gzip --keep <n> Compress the snapshot and keep only the newest n snapshots
+  restore <file>           Replace the database with a snapshot after verifying it
+  sync <file>              Merge habits and tracking data both ways with another database;
+                           the most recent write of a day wins
+  maintain                 Show database size, page and row statistics
+  maintain --check         Also run quick and full integrity checks
+  maintain --analyze       Also refresh query planner statistics
+  maintain --vacuum <mode> Also reclaim free space (incremental or full)
   help                     Show this help message
   (no arguments)           Display calendar view of habit tracking
 
 Calendar View:
   - Habit IDs and names are listed in the first columns
-  - Following columns represent the last 30 days
+  - Following columns represent the days of the tracking window (last 30 days by default)
   - Each cell shows the tracking status:
     D  Green D: Habit was done
     -  Dash: Habit was not done or no data for that day
+    .  Dot: Habit is not scheduled on that day
 
 Examples:
   python habit_tracker.py add "Drink Water,Exercise,Reading"
@@ -456,8 +1596,36 @@ Examples:
   python habit_tracker.py checkin on 15
   python habit_tracker.py +1
   python habit_tracker.py +1 on 15
+  python habit_tracker.py +1 on yesterday
+  python habit_tracker.py -1 on -3
+  python habit_tracker.py checkin on friday
+  python habit_tracker.py window 90
   python habit_tracker.py -1
   python habit_tracker.py -1 on 15
+  python habit_tracker.py +Exercise
+  python habit_tracker.py tag "Exercise,Meditation" morning
+  python habit_tracker.py +@morning
+  python habit_tracker.py checkin --tag morning
+  python habit_tracker.py rm "Drink Water,Reading"
+  python habit_tracker.py schedule Gym 3/week
+  python habit_tracker.py schedule 2 mon,wed,fri
+  python habit_tracker.py remind Exercise 18:30
+  python habit_tracker.py remind --daemon --hook "notify-send 'Habit reminder'"
+  eval "$(python habit_tracker.py completions --script)"
+  python habit_tracker.py calendar --format json
+  python habit_tracker.py streaks --format csv
+  python habit_tracker.py top --by rate -n 5 --bottom
+  python habit_tracker.py calendar --sort longest --limit 20
+  python habit_tracker.py watch --interval 5
+  python habit_tracker.py serve-http --port 8080
+  python habit_tracker.py summary --by year
+  python habit_tracker.py recompute --workers 8
+  python habit_tracker.py export-metrics /var/lib/node_exporter/textfile/habits.prom
+  python habit_tracker.py rollup --keep-days 180
+  python habit_tracker.py maintain --check --analyze --vacuum full
+  python habit_tracker.py backup --gzip --keep 7
+  python habit_tracker.py restore backups/habits-20240115-020000-000000.db.gz
+  python habit_tracker.py sync /mnt/laptop/habits.db
   python habit_tracker.py
         """
         print(help_text)
@@ -478,52 +1646,476 @@ Examples:
                 print("Invalid command format. Use +<id> [on <date>] or -<id> [on <date>]")
                 return False
         
-        if command_str.startswith('+'):
-            try:
-                habit_id = int(command_str[1:])
-                return self.track_habit(habit_id, True, date_str)
-            except ValueError:
-                print("Invalid habit ID. Use a number after +")
+        if command_str.startswith(('+@', '-@')):
+            return self.track_tag(command_str[2:], command_str.startswith('+'), date_str)
+        if command_str.startswith(('+', '-')):
+            if not command_str[1:].strip():
+                print(f"Invalid habit ID. Use a number or habit name after {command_str[0]}")
                 return False
-        elif command_str.startswith('-'):
-            try:
-                habit_id = int(command_str[1:])
-                return self.track_habit(habit_id, False, date_str)
-            except ValueError:
-                print("Invalid habit ID. Use a number after -")
+            habit_id = self.resolve_habit(command_str[1:])
+            if habit_id is None:
                 return False
+            return self.track_habit(habit_id, command_str.startswith('+'), date_str)
         else:
             print("Invalid command format. Use +<id> or -<id>")
             return False
 
-def main():
-    # Check if it's a short command like +1 or -1
-    if len(sys.argv) >= 2 and sys.argv[1].startswith(('+', '-')):
-        tracker = HabitTracker()
-        tracker.parse_short_command(sys.argv[1:])
-        return
-    
-    # Check if it's a checkin command with date parameter
-    if len(sys.argv) >= 2 and sys.argv[1] == 'checkin':
-        tracker = HabitTracker()
-        # Check for "on <day>" pattern (only accept day number, not full date)
-        if len(sys.argv) >= 4 and sys.argv[2].lower() == 'on':
-            day_str = sys.argv[3]
-            # Validate that it's a day number (not a full date)
-            if '-' in day_str:
-                print("Error: Use day number (e.g., 15) instead of full date (e.g., 2023-09-15) for checkin command")
-                return
-            tracker.checkin(date_str=day_str)
+class CalendarWatcher:
+    """Calendar view kept up to date incrementally for the watch command.
+
+    Each poll costs one data version check while nothing changes. When the
+    data does change, only habits with tracking rows written since the last
+    poll (or added, removed or renamed habits) are re-read, and at midnight
+    the window is shifted by reading just the new day.
+    """
+
+    def __init__(self, tracker: HabitTracker):
+        self.tracker = tracker
+        self.backend = tracker.backend
+        self.today = None
+        self.dates = []
+        self.rows = {}      # habit_id -> [name, statuses, current streak, longest streak, scheduled]
+        self.order = []     # habit IDs in display order
+        self.schedules = {} # habit_id -> Schedule
+        self.version = None
+        self.marker = None
+        self.lines = []     # lines currently on screen
+
+    def poll(self, today: date = None) -> List[Tuple[int, str]]:
+        """Bring the view up to date and return (line number, text) for changed lines."""
+        today = today or datetime.now().date()
+        if self.today is None or not 0 <= (today - self.today).days < len(self.dates):
+            self._rebuild(today)
         else:
-            tracker.checkin()  # No date provided, use today
-        return
-    
+            if today != self.today:
+                self._roll_forward(today)
+            version = self.backend.data_version()
+            if version != self.version:
+                self.version = version
+                if self.tracker.window_days != len(self.dates):
+                    # The window was resized elsewhere: redraw every column
+                    self._rebuild(today)
+                else:
+                    self._apply_changes()
+
+        lines = self._render()
+        updates = [(line_no, line) for line_no, line in enumerate(lines)
+                   if line_no >= len(self.lines) or self.lines[line_no] != line]
+        self.lines = lines
+        return updates
+
+    def _rebuild(self, today: date):
+        """Read the whole view from scratch."""
+        # Take the change markers first so that writes racing with the
+        # rebuild are picked up again by the next poll
+        self.version = self.backend.data_version()
+        self.marker, _ = self.backend.tracking_changes_since(None)
+        self.today = today
+        self.dates = self.tracker._calendar_dates(today)
+        self.schedules = self.tracker.get_schedules()
+        self.rows = {}
+        self.order = []
+        for habit_id, habit_name in self.backend.list_habits():
+            self._load_habit(habit_id, habit_name)
+            self.order.append(habit_id)
+
+    def _load_habit(self, habit_id: int, habit_name: str):
+        """Re-read one habit's statuses and streaks."""
+        tracking_data = self.backend.get_tracking(habit_id, self.dates)
+        statuses = [bool(tracking_data[date]) if date in tracking_data else None for date in self.dates]
+        done_dates = (datetime.strptime(date, '%Y-%m-%d').date() for date in self.backend.iter_done_dates(habit_id))
+        schedule = self.schedules.get(habit_id, Schedule())
+        self.rows[habit_id] = [habit_name, statuses, *streaks_from_dates(done_dates, self.today, schedule),
+                               self._scheduled(schedule, self.dates)]
+
+    def _scheduled(self, schedule: Schedule, dates: List[str]) -> List[bool]:
+        """Flag whether a habit is due on each of the dates."""
+        return [schedule.is_scheduled(datetime.strptime(date, '%Y-%m-%d').date()) for date in dates]
+
+    def _apply_changes(self):
+        """Re-read only the habits that changed since the last poll."""
+        self.marker, changed = self.backend.tracking_changes_since(self.marker)
+        habits = self.backend.list_habits()
+        schedules = self.tracker.get_schedules()
+        changed |= {habit_id for habit_id, schedule in schedules.items()
+                    if str(schedule) != str(self.schedules.get(habit_id, ''))}
+        self.schedules = schedules
+        for habit_id in set(self.rows) - {habit_id for habit_id, _ in habits}:
+            del self.rows[habit_id]
+        for habit_id, habit_name in habits:
+            row = self.rows.get(habit_id)
+            if row is None or habit_id in changed:
+                self._load_habit(habit_id, habit_name)
+            elif row[0] != habit_name:
+                row[0] = habit_name
+        self.order = [habit_id for habit_id, _ in habits]
+
+    def _roll_forward(self, today: date):
+        """Shift the window to end on a new day, reading only the new dates."""
+        days = (today - self.today).days
+        self.today = today
+        new_dates = self.tracker._calendar_dates(today)[-days:]
+        self.dates = self.dates[days:] + new_dates
+        new_statuses = [self.backend.get_tracking_for_date(date) for date in new_dates]
+        for habit_id, row in self.rows.items():
+            statuses = [day_statuses.get(habit_id) for day_statuses in new_statuses]
+            row[1] = row[1][days:] + [None if status is None else bool(status) for status in statuses]
+            schedule = self.schedules.get(habit_id, Schedule())
+            if row[1][-1] or not schedule.is_daily:
+                # Already tracked as done for the new day, or a period may
+                # have ended: recount from the data
+                self._load_habit(habit_id, row[0])
+            else:
+                # A daily streak only counts while today is done, and the
+                # longest streak cannot change without a write
+                row[2] = 0
+                row[4] = row[4][days:] + self._scheduled(schedule, new_dates)
+
+    def _render(self) -> List[str]:
+        """Return the full list of screen lines for the current state."""
+        if not self.order:
+            return ["No habits found. Add some habits to start tracking!"]
+        return self.tracker._format_calendar_header(self.dates) + [
+            self.tracker._format_calendar_row(habit_id, *self.rows[habit_id]) for habit_id in self.order]
+
+
+class ReminderScheduler:
+    """Reminder daemon keeping each habit's next reminder in a timer heap.
+
+    The loop sleeps until the earliest deadline, waking every poll seconds
+    only to compare the backend's data version; reminders are reloaded when
+    it changes. A due reminder looks up that habit's tracking for that date
+    alone and runs the hook if the habit is scheduled and not yet done.
+    Hooks run as separate tasks, so a slow hook never holds up the loop,
+    and are stopped if they take longer than HOOK_TIMEOUT seconds.
+    """
+
+    HOOK_TIMEOUT = 60.0
+
+    def __init__(self, tracker: HabitTracker, hook: str = None, poll: float = 5.0):
+        self.tracker = tracker
+        self.backend = tracker.backend
+        self.hook = shlex.split(hook) if hook else None
+        self.poll = poll
+        self.heap = []      # (deadline, habit_id) for every habit with a reminder
+        self.habits = {}    # habit_id -> (name, 'HH:MM', Schedule)
+        self.version = None
+        self.checked = None # reminders due up to this time have been handled
+        self.running = set() # hook tasks still running
+
+    def reload(self, now: datetime):
+        """Reload the reminders if the data changed, rebuilding the heap."""
+        version = self.backend.data_version()
+        if version == self.version:
+            return
+        self.version = version
+        self.checked = self.checked or now
+        names = dict(self.tracker.get_habits())
+        schedules = self.tracker.get_schedules()
+        reminders = self.backend.get_reminders()
+        self.habits = {habit_id: (names[habit_id], remind_at, schedules.get(habit_id, Schedule()))
+                       for habit_id, remind_at in reminders.items() if habit_id in names}
+        self.heap = [(self._next_deadline(remind_at, self.checked), habit_id)
+                     for habit_id, (_, remind_at, _) in self.habits.items()]
+        heapq.heapify(self.heap)
+
+    def _next_deadline(self, remind_at: str, after: datetime) -> datetime:
+        """Return the first time of day remind_at that is later than after."""
+        hour, minute = map(int, remind_at.split(':'))
+        deadline = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return deadline if deadline > after else deadline + timedelta(days=1)
+
+    def due(self, now: datetime) -> List[Tuple[int, str, str]]:
+        """Pop the reminders due by now and return (id, name, date) of habits still to do."""
+        self.reload(now)
+        reminders = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, habit_id = heapq.heappop(self.heap)
+            name, remind_at, schedule = self.habits[habit_id]
+            heapq.heappush(self.heap, (self._next_deadline(remind_at, deadline), habit_id))
+            date_str = deadline.strftime('%Y-%m-%d')
+            if not schedule.is_scheduled(deadline.date()):
+                continue
+            try:
+                done = self.backend.get_tracking(habit_id, [date_str]).get(date_str)
+            except StorageError as e:
+                print(f"Error retrieving tracking data: {e}")
+                continue
+            if not done:
+                reminders.append((habit_id, name, date_str))
+        self.checked = max(self.checked, now)
+        return reminders
+
+    def seconds_until_next(self, now: datetime) -> float:
+        """Return how long to sleep: until the next deadline, at most poll seconds."""
+        if not self.heap:
+            return self.poll
+        return max(0.0, min(self.poll, (self.heap[0][0] - now).total_seconds()))
+
+    async def fire(self, habit_id: int, name: str, date_str: str):
+        """Run the hook for a reminder, or print it when there is no hook."""
+        if self.hook is None:
+            print(f"Reminder: {name} (ID: {habit_id}) is not done yet for {date_str}")
+            return
+        env = dict(os.environ, HABIT_ID=str(habit_id), HABIT_NAME=name, HABIT_DATE=date_str)
+        try:
+            process = await asyncio.create_subprocess_exec(*self.hook, env=env)
+        except OSError as e:
+            print(f"Error running reminder hook: {e}")
+            return
+        try:
+            await asyncio.wait_for(process.wait(), self.HOOK_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"Reminder hook for {name} did not finish within {self.HOOK_TIMEOUT:g} seconds and was stopped")
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+    async def run(self):
+        """Fire reminders as they come due, forever."""
+        while True:
+            now = datetime.now()
+            for reminder in self.due(now):
+                task = asyncio.create_task(self.fire(*reminder))
+                self.running.add(task)
+                task.add_done_callback(self.running.discard)
+            await asyncio.sleep(self.seconds_until_next(datetime.now()))
+
+
+class HabitAPI:
+    """JSON API over a tracker, answering requests for the serve-http command.
+
+    GET responses carry an ETag made of a nonce picked at startup, the
+    database file change counter (the data version for other backends) and
+    today's date. Reading the counter costs a 28-byte read of the file
+    header, so a poll whose If-None-Match still matches is answered with 304
+    Not Modified without running any query.
+    """
+
+    ROUTES = ('/habits', '/calendar', '/streaks', '/top', '/summary')
+
+    def __init__(self, tracker: HabitTracker):
+        self.tracker = tracker
+        self.backend = tracker.backend
+        self.nonce = os.urandom(4).hex()
+
+    def etag(self) -> str:
+        """Return the ETag of the data as it is now."""
+        return f'"{self.nonce}-{self.tracker.data_stamp()}-{datetime.now().strftime("%Y%m%d")}"'
+
+    def get(self, path: str, query: Dict[str, str], if_none_match: str = None) -> Tuple[int, dict, object]:
+        """Answer a GET request with (status, headers, JSON payload or None)."""
+        if path not in self.ROUTES:
+            return 404, {}, {'error': f"Unknown path '{path}'"}
+        # Taken before reading, so a write racing with the read only costs a
+        # full response on the next poll
+        etag = self.etag()
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if if_none_match and etag in (tag.strip() for tag in if_none_match.split(',')):
+            return 304, headers, None
+        try:
+            return 200, headers, getattr(self, '_get_' + path[1:])(query)
+        except ValueError as e:
+            return 400, {}, {'error': str(e)}
+        except StorageError as e:
+            return 500, {}, {'error': str(e)}
+
+    def post(self, path: str, body: bytes) -> Tuple[int, dict, object]:
+        """Answer a POST request with (status, headers, JSON payload)."""
+        if path != '/track':
+            return 404, {}, {'error': f"Unknown path '{path}'"}
+        try:
+            data = json.loads(body or b'{}')
+            if not isinstance(data, dict):
+                raise ValueError("Expected a JSON object")
+            return self._track(data)
+        except ValueError as e:
+            return 400, {}, {'error': str(e)}
+        except StorageError as e:
+            return 500, {}, {'error': str(e)}
+
+    def _tag(self, value: Optional[str]) -> Optional[str]:
+        """Validate an optional tag parameter."""
+        if value is None:
+            return None
+        tag = _valid_tag(str(value))
+        if tag is None:
+            raise ValueError(f"Invalid tag '{value}'. Tags are single words without commas or @.")
+        return tag
+
+    def _int(self, query: Dict[str, str], name: str, default: int, low: int, high: int = None) -> int:
+        """Read an integer query parameter within bounds."""
+        value = query.get(name)
+        if value is None:
+            return default
+        if not value.isdigit() or int(value) < low or (high is not None and int(value) > high):
+            raise ValueError(f"Invalid {name} '{value}'")
+        return int(value)
+
+    def _get_habits(self, query: Dict[str, str]) -> list:
+        return [{'id': habit_id, 'name': habit_name}
+                for habit_id, habit_name in self.backend.list_habits(self._tag(query.get('tag')))]
+
+    def _get_calendar(self, query: Dict[str, str]) -> list:
+        size = self._int(query, 'days', self.tracker.window_days,
+                         HabitTracker.MIN_WINDOW_DAYS, HabitTracker.MAX_WINDOW_DAYS)
+        dates = self.tracker._window_dates(size=size)[1]
+        habits = self.backend.list_habits(self._tag(query.get('tag')))
+        return [{'id': habit_id, 'name': habit_name, 'days': dict(zip(dates, statuses)),
+                 'current_streak': current_streak, 'longest_streak': longest_streak}
+                for habit_id, habit_name, statuses, current_streak, longest_streak
+                in self.tracker.iter_calendar_rows(dates, habits)]
+
+    def _get_streaks(self, query: Dict[str, str]) -> list:
+        return [{'id': habit_id, 'name': habit_name,
+                 'current_streak': current_streak, 'longest_streak': longest_streak}
+                for habit_id, habit_name, current_streak, longest_streak
+                in self.tracker.iter_streak_rows(self._tag(query.get('tag')))]
+
+    def _get_top(self, query: Dict[str, str]) -> list:
+        by = query.get('by', 'current')
+        if by not in HabitTracker.RANK_KEYS:
+            raise ValueError(f"Invalid by '{by}'")
+        rows = self.tracker.rank_habits(by, self._int(query, 'n', 10, 1),
+                                        query.get('bottom', '') in ('1', 'true', 'yes'),
+                                        self._tag(query.get('tag')))
+        return [{'rank': rank, 'id': habit_id, 'name': habit_name, by: value}
+                for rank, (habit_id, habit_name, value) in enumerate(rows, 1)]
+
+    def _get_summary(self, query: Dict[str, str]) -> list:
+        by = query.get('by', 'month')
+        if by not in TOTALS_PERIODS:
+            raise ValueError(f"Invalid by '{by}'")
+        return [{'period': period, 'done': done, 'tracked': tracked,
+                 'rate': round(done / tracked, 4) if tracked else 0}
+                for period, done, tracked in self.backend.get_completion_totals(by)]
+
+    def _track(self, data: dict) -> Tuple[int, dict, object]:
+        """Track one habit, or every habit with a tag, from a POST /track body."""
+        done = data.get('done', True)
+        if not isinstance(done, bool):
+            raise ValueError("'done' must be true or false")
+        date_str = data.get('date')
+        if date_str is None:
+            target_date = datetime.now().strftime('%Y-%m-%d')
+        elif not isinstance(date_str, (str, int)):
+            raise ValueError(f"Invalid date '{date_str}'")
+        elif _is_full_date(str(date_str)):
+            target_date = datetime.strptime(date_str, '%Y-%m-%d').strftime('%Y-%m-%d')
+        else:
+            target_date = self.tracker.resolve_day(str(date_str))
+
+        if 'tag' in data:
+            tag = self._tag(data['tag'])
+            habit_ids = self.backend.upsert_tracking_for_tag(tag, target_date, done)
+            if not habit_ids:
+                return 404, {}, {'error': f"No habits tagged '{tag}'"}
+            payload = {'tag': tag, 'ids': habit_ids, 'date': target_date, 'done': done}
+        else:
+            habit = data.get('habit')
+            if isinstance(habit, int) and not isinstance(habit, bool):
+                habit_id = habit
+            elif isinstance(habit, str) and habit.strip():
+                habit_id = int(habit) if habit.strip().isdigit() else self.backend.find_habit_id(habit.strip())
+            else:
+                raise ValueError("Give a habit ID or name in 'habit', or a tag in 'tag'")
+            # IDs outside SQLite's 64-bit integer range cannot exist and would
+            # not even bind as query parameters
+            habit_name = self.backend.get_habit_name(habit_id) if habit_id is not None and 0 < habit_id < 2 ** 63 else None
+            if habit_name is None:
+                return 404, {}, {'error': f"Habit '{habit}' not found"}
+            self.backend.upsert_tracking(habit_id, target_date, done)
+            payload = {'id': habit_id, 'name': habit_name, 'date': target_date, 'done': done}
+        self.tracker._maybe_auto_maintain()
+        return 200, {}, payload
+
+
+class _HabitRequestHandler(BaseHTTPRequestHandler):
+    """Thin HTTP layer in front of the server's HabitAPI."""
+
+    # Keep connections open between polls, and send the body without waiting
+    # for the client to acknowledge the headers
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        self._respond(*self.server.api.get(url.path, query, self.headers.get('If-None-Match')))
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length < 0:
+                raise ValueError
+        except ValueError:
+            # The body cannot be delimited, so the connection cannot be reused
+            self.close_connection = True
+            self._respond(400, {'Connection': 'close'}, {'error': "Invalid Content-Length header"})
+            return
+        self._respond(*self.server.api.post(urlsplit(self.path).path, self.rfile.read(length)))
+
+    def _respond(self, status: int, headers: dict, payload):
+        body = b'' if payload is None else (json.dumps(payload) + '\n').encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def make_http_server(tracker: HabitTracker, host: str = '127.0.0.1', port: int = 8765,
+                     quiet: bool = False) -> ThreadingHTTPServer:
+    """Create a threaded HTTP server for the tracker's JSON API; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), _HabitRequestHandler)
+    server.daemon_threads = True
+    server.api = HabitAPI(tracker)
+    server.quiet = quiet
+    return server
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"'{value}' is not a positive whole number")
+    return number
+
+
+def positive_float(value: str) -> float:
+    """argparse type for intervals that must be greater than zero."""
+    try:
+        number = float(value)
+    except ValueError:
+        number = 0.0
+    if not number > 0 or number == float('inf'):
+        raise argparse.ArgumentTypeError(f"'{value}' is not a positive number")
+    return number
+
+
+def build_parser():
+    """Build the argument parser; return it with its subcommand parsers action."""
     parser = argparse.ArgumentParser(
         description="Habit Tracker CLI - Track your daily habits",
         prog="habit_tracker.py",
         add_help=False  # We'll handle help ourselves
     )
     
+    # Output format and tag filter for the default calendar view
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='text', help='Output format')
+    parser.add_argument('--tag', default=None, help='Only show habits with this tag')
+    
     # Create subparsers for different commands
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
@@ -535,11 +2127,163 @@ def main():
     remove_parser = subparsers.add_parser('remove', aliases=['rm'], help='Remove habits by IDs (comma-separated)')
     remove_parser.add_argument('habit_ids', help='IDs of habits to remove (comma-separated)')
     
+    # List, streaks and calendar views
+    for view, view_help in [('list', 'List all habits'),
+                            ('streaks', 'Show current and longest streaks'),
+                            ('calendar', 'Display calendar view of habit tracking')]:
+        view_parser = subparsers.add_parser(view, help=view_help)
+        view_parser.add_argument('--format', choices=OUTPUT_FORMATS, default='text', help='Output format')
+        view_parser.add_argument('--tag', default=None, help='Only show habits with this tag')
+        if view == 'calendar':
+            view_parser.add_argument('--sort', choices=HabitTracker.RANK_KEYS, default=None,
+                                     help='Show habits best first by this key')
+            view_parser.add_argument('--limit', type=positive_int, default=None, help='Show only this many habits')
+    
+    # Top command
+    top_parser = subparsers.add_parser('top', help='Rank habits by streak or completion rate')
+    top_parser.add_argument('--by', choices=HabitTracker.RANK_KEYS, default='current', help='Key to rank by')
+    top_parser.add_argument('-n', type=positive_int, default=10, help='Number of habits to show (default: 10)')
+    top_parser.add_argument('--bottom', action='store_true', help='Show the worst performers instead')
+    top_parser.add_argument('--format', choices=OUTPUT_FORMATS, default='text', help='Output format')
+    top_parser.add_argument('--tag', default=None, help='Only rank habits with this tag')
+    
+    # Tag commands
+    tag_parser = subparsers.add_parser('tag', help='Show habit tags, or tag habits')
+    tag_parser.add_argument('habits', nargs='?', help='IDs or names of habits to tag (comma-separated)')
+    tag_parser.add_argument('tag_name', nargs='?', help='Tag to add')
+    untag_parser = subparsers.add_parser('untag', help='Remove a tag from habits')
+    untag_parser.add_argument('habits', help='IDs or names of habits (comma-separated)')
+    untag_parser.add_argument('tag_name', help='Tag to remove')
+    
+    # Schedule command
+    schedule_parser = subparsers.add_parser('schedule', help='Show or set habit schedules')
+    schedule_parser.add_argument('habits', nargs='?', help='IDs or names of habits to schedule (comma-separated)')
+    schedule_parser.add_argument('spec', nargs='?', help='daily, weekdays (mon,wed,fri), N/week or N/month')
+    
+    # Remind command
+    remind_parser = subparsers.add_parser('remind', help='Show or set reminders, or run the reminder daemon')
+    remind_parser.add_argument('habits', nargs='?', help='IDs or names of habits (comma-separated)')
+    remind_parser.add_argument('time', nargs='?', help="Daily reminder time as HH:MM, or 'off'")
+    remind_parser.add_argument('--daemon', action='store_true', help='Run the reminder daemon')
+    remind_parser.add_argument('--hook', default=None,
+                               help='Command run for each due reminder (gets HABIT_ID, HABIT_NAME, HABIT_DATE)')
+    remind_parser.add_argument('--poll', type=positive_float, default=5.0,
+                               help='Check for changed reminders every this many seconds (default: 5)')
+    
+    # Summary commands
+    summary_parser = subparsers.add_parser('summary', help='Show completion totals across all habits')
+    summary_parser.add_argument('--by', choices=list(TOTALS_PERIODS), default='month', help='Period to group by')
+    summary_parser.add_argument('--format', choices=OUTPUT_FORMATS, default='text', help='Output format')
+    subparsers.add_parser('rebuild-totals', help='Recompute the totals behind the summary view')
+    
+    # Window command
+    window_parser = subparsers.add_parser('window', help='Show or set the number of days in the tracking window')
+    window_parser.add_argument('days', nargs='?', type=int,
+                               help=f'Days covered by the calendar and check-in ({HabitTracker.MIN_WINDOW_DAYS}-'
+                                    f'{HabitTracker.MAX_WINDOW_DAYS}, default: {HabitTracker.DEFAULT_WINDOW_DAYS})')
+    
+    # Recompute command
+    recompute_parser = subparsers.add_parser('recompute', help='Recompute stored streak statistics in parallel')
+    recompute_parser.add_argument('--workers', type=positive_int, default=None,
+                                  help='Number of worker processes (default: one per CPU)')
+    
+    # HTTP API command
+    http_parser = subparsers.add_parser('serve-http', help='Serve habit data as a JSON API')
+    http_parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    http_parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    http_parser.add_argument('--quiet', action='store_true', help='Do not log requests')
+    
+    # Watch command
+    watch_parser = subparsers.add_parser('watch', help='Keep the calendar on screen and update it live')
+    watch_parser.add_argument('--interval', type=positive_float, default=1.0,
+                              help='Check for changes every this many seconds (default: 1)')
+    
+    # Export metrics command
+    metrics_parser = subparsers.add_parser('export-metrics', help='Write Prometheus textfile metrics')
+    metrics_parser.add_argument('output', nargs='?', default='habits.prom', help='Output .prom file')
+    metrics_parser.add_argument('--force', action='store_true', help='Rewrite even if nothing changed')
+    metrics_parser.add_argument('--interval', type=positive_float, default=None,
+                                help='Keep running, checking for changes every this many seconds')
+    metrics_parser.add_argument('--tag', default=None, help='Only export per-habit metrics for habits with this tag')
+    
+    # Completions command
+    completions_parser = subparsers.add_parser('completions', help='Complete habit names for the shell')
+    completions_parser.add_argument('word', nargs='?', default='', help='Partially typed habit name')
+    completions_parser.add_argument('--script', action='store_true', help='Print a bash completion script')
+    
+    # Rollup command
+    rollup_parser = subparsers.add_parser('rollup', help='Fold old tracking rows into monthly summaries')
+    rollup_parser.add_argument('--keep-days', type=int, default=None,
+                               help=f'Keep this many days of raw rows (default: {HabitTracker.RETENTION_DAYS})')
+    
+    # Backup and restore commands
+    backup_parser = subparsers.add_parser('backup', help='Write an online snapshot of the database')
+    backup_parser.add_argument('output', nargs='?', default=None,
+                               help='Snapshot file or directory (default: backups/ next to the database)')
+    backup_parser.add_argument('--gzip', action='store_true', help='Compress the snapshot')
+    backup_parser.add_argument('--keep', type=positive_int, default=None,
+                               help='Keep only this many timestamped snapshots')
+    restore_parser = subparsers.add_parser('restore', help='Replace the database with a verified snapshot')
+    restore_parser.add_argument('snapshot', help='Snapshot file (.db or .db.gz)')
+    
+    # Sync command
+    sync_parser = subparsers.add_parser('sync', help='Merge tracking data both ways with another database')
+    sync_parser.add_argument('other', help='Other habit tracker database file')
+    
+    # Maintain command
+    maintain_parser = subparsers.add_parser('maintain', help='Report on and maintain the database file')
+    maintain_parser.add_argument('--check', action='store_true', help='Run quick and full integrity checks')
+    maintain_parser.add_argument('--analyze', action='store_true', help='Run ANALYZE and PRAGMA optimize')
+    maintain_parser.add_argument('--vacuum', choices=['incremental', 'full'], help='Reclaim free pages')
+    
     # Help command
     subparsers.add_parser('help', help='Show this help message')
     
     # Checkin command (kept for compatibility but main logic is handled above)
     subparsers.add_parser('checkin', help='Cycle through all habits and track today\'s progress')
+    return parser, subparsers
+
+
+def main():
+    # Check if it's a short command like +1 or -1
+    if len(sys.argv) >= 2 and sys.argv[1].startswith(('+', '-')) and not sys.argv[1].startswith('--'):
+        tracker = HabitTracker()
+        tracker.parse_short_command(sys.argv[1:])
+        return
+    
+    # Check if it's a checkin command with habit and/or date parameters
+    if len(sys.argv) >= 2 and sys.argv[1] == 'checkin':
+        tracker = HabitTracker()
+        checkin_args = sys.argv[2:]
+        # Optional --tag filter
+        tag = None
+        if '--tag' in checkin_args:
+            index = checkin_args.index('--tag')
+            if index + 1 >= len(checkin_args):
+                print("Error: --tag needs a tag name")
+                return
+            tag = tracker._parse_tag(checkin_args[index + 1])
+            if tag is None:
+                return
+            del checkin_args[index:index + 2]
+        # Optional leading list of habit IDs or names
+        habits_str = None
+        if checkin_args and checkin_args[0].lower() != 'on':
+            habits_str = checkin_args.pop(0)
+        # Check for "on <day>" pattern (only accept day number, not full date)
+        if len(checkin_args) >= 2 and checkin_args[0].lower() == 'on':
+            day_str = checkin_args[1]
+            # Validate that it's a day (not a full date)
+            if _is_full_date(day_str):
+                print("Error: Use day number (e.g., 15) instead of full date (e.g., 2023-09-15) for checkin command")
+                return
+            tracker.checkin(date_str=day_str, habits_str=habits_str, tag=tag)
+        else:
+            tracker.checkin(habits_str=habits_str, tag=tag)  # No date provided, use today
+        return
+    
+    parser, subparsers = build_parser()
+    tag_parser, schedule_parser, remind_parser = (subparsers.choices[name] for name in ('tag', 'schedule', 'remind'))
     
     # Parse arguments
     args = parser.parse_args()
@@ -552,13 +2296,81 @@ def main():
         tracker.add_habits(args.habits)
     elif args.command in ['remove', 'rm']:
         tracker.remove_habits(args.habit_ids)
+    elif args.command == 'list':
+        tracker.list_habits(args.format, args.tag)
+    elif args.command == 'streaks':
+        tracker.show_streaks(args.format, args.tag)
+    elif args.command == 'calendar':
+        tracker.show_calendar(args.format, args.sort, args.limit, args.tag)
+    elif args.command == 'top':
+        tracker.show_top(args.by, args.n, args.bottom, args.format, args.tag)
+    elif args.command == 'tag':
+        if args.habits is None:
+            tracker.show_tags()
+        elif args.tag_name is None:
+            tag_parser.error('a tag is required when habits are given')
+        else:
+            tracker.tag_habits(args.habits, args.tag_name)
+    elif args.command == 'untag':
+        tracker.tag_habits(args.habits, args.tag_name, remove=True)
+    elif args.command == 'schedule':
+        if args.habits is None:
+            tracker.show_schedules()
+        elif args.spec is None:
+            schedule_parser.error('a schedule is required when habits are given')
+        else:
+            tracker.set_schedules(args.habits, args.spec)
+    elif args.command == 'remind':
+        if args.daemon:
+            tracker.remind(args.hook, args.poll)
+        elif args.habits is None:
+            tracker.show_reminders()
+        elif args.time is None:
+            remind_parser.error('a time is required when habits are given')
+        else:
+            tracker.set_reminders(args.habits, args.time)
+    elif args.command == 'summary':
+        tracker.show_summary(args.by, args.format)
+    elif args.command == 'rebuild-totals':
+        tracker.rebuild_totals()
+    elif args.command == 'window':
+        if args.days is None:
+            print(f"Tracking window: {tracker.window_days} days")
+        else:
+            tracker.set_window(args.days)
+    elif args.command == 'recompute':
+        tracker.recompute_streaks(args.workers)
+    elif args.command == 'serve-http':
+        tracker.serve_http(args.host, args.port, args.quiet)
+    elif args.command == 'watch':
+        tracker.watch(args.interval)
+    elif args.command == 'export-metrics':
+        if args.interval:
+            tracker.export_metrics_loop(args.output, args.interval, args.tag)
+        else:
+            tracker.export_metrics(args.output, force=args.force, tag=args.tag)
+    elif args.command == 'completions':
+        if args.script:
+            tracker.show_completion_script()
+        else:
+            tracker.show_completions(args.word)
+    elif args.command == 'rollup':
+        tracker.rollup_tracking(args.keep_days)
+    elif args.command == 'backup':
+        tracker.backup(args.output, compress=args.gzip, keep=args.keep)
+    elif args.command == 'restore':
+        tracker.restore(args.snapshot)
+    elif args.command == 'sync':
+        tracker.sync(args.other)
+    elif args.command == 'maintain':
+        tracker.maintain(check=args.check, analyze=args.analyze, vacuum=args.vacuum)
     elif args.command == 'help':
         tracker.show_help()
     elif args.command == 'checkin':
         tracker.checkin()
     elif args.command is None:
         # No command provided, show calendar view
-        tracker.show_calendar()
+        tracker.show_calendar(args.format, tag=args.tag)
     else:
         # Invalid command
         parser.print_help()
@@ -0,0 +1,32 @@
+"""
+Shared pytest configuration: run every test against each storage backend
+"""
+
+import glob
+import os
+
+import pytest
+import habit_completion
+import habit_tracker
+
+
+@pytest.fixture(autouse=True, params=['sqlite', 'memory'])
+def storage_backend(request, monkeypatch):
+    """Make HabitTracker() default to each storage backend in turn.
+
+    Test modules covering SQLite-only features declare BACKENDS = ['sqlite'].
+    """
+    if request.param not in getattr(request.module, 'BACKENDS', ['sqlite', 'memory']):
+        pytest.skip(f"not applicable to the {request.param} backend")
+    monkeypatch.setattr(habit_tracker, 'DEFAULT_BACKEND', request.param)
+    return request.param
+
+
+@pytest.fixture(autouse=True)
+def remove_completion_indexes():
+    """Delete the shell completion indexes that tests leave next to their databases."""
+    pattern = '*' + habit_completion.INDEX_SUFFIX
+    existing = set(glob.glob(pattern))
+    yield
+    for path in set(glob.glob(pattern)) - existing:
+        os.remove(path)
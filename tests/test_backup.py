@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test script for online backups, snapshot rotation and restore
+"""
+
+import os
+import gc
+import gzip
+import shutil
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import HabitTracker, build_parser
+
+# Exercises SQLite-only features
+BACKENDS = ['sqlite']
+
+def test_backup():
+    """Test that backups are consistent under concurrent writes and restore safely."""
+    # Use a test database and backup directory
+    test_db = "test_backup.db"
+    backup_dir = "test_backup_snapshots"
+
+    # Remove leftovers if they exist
+    if os.path.exists(test_db):
+        os.remove(test_db)
+    shutil.rmtree(backup_dir, ignore_errors=True)
+    os.makedirs(backup_dir)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    tracker.add_habits("Exercise,Reading")
+    tracker.track_habit(1, True)
+
+    # Writers keep going while a backup copies one page per step
+    print("Testing backup under concurrent writes...")
+    tracker.backend.BACKUP_PAGES = 1
+    today = datetime.now().date()
+    writer_errors = []
+
+    def writer():
+        writer_tracker = HabitTracker(test_db)
+        for i in range(1, 40):
+            if not writer_tracker.track_habit(2, True, (today - timedelta(days=i)).strftime('%Y-%m-%d')):
+                writer_errors.append(i)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    assert tracker.backup(os.path.join(backup_dir, "during_writes.db")) == True
+    thread.join()
+    assert writer_errors == []
+
+    # The snapshot is a consistent database
+    conn = sqlite3.connect(os.path.join(backup_dir, "during_writes.db"))
+    assert conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+    assert conn.execute('SELECT COUNT(*) FROM habits').fetchone()[0] == 2
+    conn.close()
+
+    # Timestamped, compressed snapshots are rotated
+    print("Testing compression and rotation...")
+    for _ in range(3):
+        assert tracker.backup(backup_dir, compress=True, keep=2) == True
+    snapshots = sorted(name for name in os.listdir(backup_dir) if name.endswith('.db.gz'))
+    assert len(snapshots) == 2
+
+    # Keeping fewer than one snapshot is refused before anything is written
+    with patch('sys.stdout', new=StringIO()):
+        assert tracker.backup(backup_dir, keep=0) == False
+        assert tracker.backup(backup_dir, keep=-1) == False
+    assert sorted(name for name in os.listdir(backup_dir) if name.endswith('.db.gz')) == snapshots
+    with patch('sys.stderr', new=StringIO()):
+        try:
+            build_parser()[0].parse_args(['backup', '--keep', '-1'])
+            assert False, "--keep -1 was accepted"
+        except SystemExit:
+            pass
+    latest = os.path.join(backup_dir, snapshots[-1])
+    with gzip.open(latest, 'rb') as snapshot_file:
+        assert snapshot_file.read(16) == b'SQLite format 3\x00'
+
+    # Restore brings back the snapshot's contents
+    print("Testing restore...")
+    tracker.remove_habit(2)
+    tracker.add_habit("Meditation")
+    assert tracker.restore(latest) == True
+    assert tracker.get_habits() == [(1, "Exercise"), (2, "Reading")]
+    assert tracker.calculate_longest_streak(2) == 39
+    assert tracker.calculate_current_streak(1) == 1
+
+    # Damaged or foreign files are rejected before anything is replaced
+    print("Testing restore verification...")
+    bad_snapshot = os.path.join(backup_dir, "bad.db")
+    with open(bad_snapshot, 'wb') as bad_file:
+        bad_file.write(b'not a database' * 100)
+    assert tracker.restore(bad_snapshot) == False
+    empty_snapshot = os.path.join(backup_dir, "empty.db")
+    sqlite3.connect(empty_snapshot).execute('CREATE TABLE other (x)').connection.close()
+    assert tracker.restore(empty_snapshot) == False
+    assert tracker.restore(os.path.join(backup_dir, "missing.db")) == False
+    assert tracker.backup(os.path.join(backup_dir, "missing", "snapshot.db")) == False
+    assert tracker.get_habits() == [(1, "Exercise"), (2, "Reading")]
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+    shutil.rmtree(backup_dir, ignore_errors=True)
+
+    print("All backup tests passed!")
+
+if __name__ == "__main__":
+    test_backup()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the in-process backend cache
+"""
+
+import os
+import gc
+from datetime import datetime
+from habit_tracker import HabitTracker
+from habit_storage import CachedBackend, SQLiteBackend
+
+def test_cache():
+    """Test cache hits, eviction and invalidation by writes from anywhere."""
+    # Use a test database
+    test_db = "test_cache.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize a tracker with a small cache
+    tracker = HabitTracker(test_db, cache_size=4)
+    cache = tracker.backend
+    assert isinstance(cache, CachedBackend)
+    tracker.add_habits("Exercise,Reading")
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    # Repeated reads are served from the cache
+    print("Testing cache hits...")
+    before = cache.cache_stats()
+    for _ in range(3):
+        assert tracker.get_habits() == [(1, "Exercise"), (2, "Reading")]
+        assert cache.get_habit_name(2) == "Reading"
+    after = cache.cache_stats()
+    assert after['hits'] - before['hits'] >= 4 and after['misses'] - before['misses'] <= 2
+
+    # Callers cannot change cached results
+    tracker.get_habits().append((3, "Bogus"))
+    assert tracker.get_habits() == [(1, "Exercise"), (2, "Reading")]
+
+    # Writes invalidate the cache
+    print("Testing invalidation...")
+    assert tracker.get_tracking_data(1, [today]) == {}
+    tracker.track_habit(1, True)
+    assert tracker.get_tracking_data(1, [today]) == {today: 1}
+    tracker.add_habit("Meditation")
+    assert [name for _, name in tracker.get_habits()] == ["Exercise", "Reading", "Meditation"]
+    assert cache.cache_stats()['invalidations'] >= 2
+
+    # Writes from another connection are picked up too
+    if isinstance(tracker._storage, SQLiteBackend):
+        HabitTracker(test_db).track_habit(2, True)
+        assert tracker.get_tracking_data(2, [today]) == {today: 1}
+        # Features that need SQLite still find it behind the cache
+        assert tracker._sqlite_backend("test") is tracker._storage
+
+    # The least recently used entries are evicted
+    print("Testing eviction...")
+    for habit_id in (1, 2, 3, 1, 2, 3):
+        cache.get_habit_name(habit_id)
+    stats = cache.cache_stats()
+    assert stats['size'] <= 4
+    misses = stats['misses']
+    cache.get_habit_name(3)
+    assert cache.cache_stats()['misses'] == misses
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, cache
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All cache tests passed!")
+
+if __name__ == "__main__":
+    test_cache()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the shell completion index
+"""
+
+import os
+import gc
+import sys
+import subprocess
+import habit_completion
+from io import StringIO
+from contextlib import redirect_stdout
+from habit_tracker import HabitTracker
+
+# The completion index is kept next to the database file
+BACKENDS = ['sqlite']
+
+def test_completion():
+    """Test index regeneration and prefix lookups."""
+    # Use a test database
+    test_db = "test_completion.db"
+    index = habit_completion.index_path(test_db)
+
+    # Remove test files if they exist
+    for path in (test_db, index):
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+
+    # The index is written on add and remove
+    print("Testing index regeneration...")
+    tracker.add_habits("Exercise,Drink Water,Evening Walk,Reading")
+    assert os.path.exists(index)
+    assert habit_completion.complete(index, "e") == ["Evening Walk", "Exercise"]
+    tracker.remove_habits("Evening Walk")
+    assert habit_completion.complete(index, "e") == ["Exercise"]
+    tracker.add_habit("Extra")
+    assert habit_completion.complete(index, "Ex") == ["Exercise", "Extra"]
+
+    # Short commands and comma-separated lists keep their prefix
+    print("Testing completion words...")
+    assert habit_completion.complete(index, "+dr") == ["+Drink Water"]
+    assert habit_completion.complete(index, "-R") == ["-Reading"]
+    assert habit_completion.complete(index, "Reading,Dr") == ["Reading,Drink Water"]
+    assert habit_completion.complete(index, "zz") == []
+    assert habit_completion.complete("missing.complete", "e") == []
+
+    # The completions command rebuilds a missing index
+    os.remove(index)
+    output = StringIO()
+    with redirect_stdout(output):
+        tracker.show_completions("+e")
+    assert output.getvalue().splitlines() == ["+Exercise", "+Extra"]
+
+    # The standalone helper answers without importing sqlite3
+    print("Testing standalone helper...")
+    helper = habit_completion.__file__
+    result = subprocess.run(
+        [sys.executable, "-S", "-c",
+         "import runpy, sys; sys.argv = sys.argv[1:]; "
+         "runpy.run_path(sys.argv[0], run_name='__main__'); "
+         "assert 'sqlite3' not in sys.modules",
+         helper, index, "rea"],
+        capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines() == ["Reading"]
+
+    # The script completes every subcommand the parser knows
+    output = StringIO()
+    with redirect_stdout(output):
+        tracker.show_completion_script()
+    words = output.getvalue().split('compgen -W "')[1].split('"')[0].split()
+    assert {"add", "rm", "checkin", "top", "window", "serve-http", "recompute", "maintain"} <= set(words)
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    for path in (test_db, index):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print("All completion tests passed!")
+
+if __name__ == "__main__":
+    test_completion()
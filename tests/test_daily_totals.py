@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-day completion totals and the summary view
+"""
+
+import os
+import gc
+import json
+import random
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import HabitTracker
+from habit_storage import SQLiteBackend
+
+def expected_totals(tracker, period_key):
+    """Compute totals the slow way, from every habit's full history."""
+    totals = {}
+    for habit_id, _ in tracker.get_habits():
+        for date, done in tracker.backend.get_tracking_range(habit_id, '0000-00-00', '9999-99-99'):
+            period_totals = totals.setdefault(period_key(date), [0, 0])
+            period_totals[0] += done
+            period_totals[1] += 1
+    return [(period, done, tracked) for period, (done, tracked) in sorted(totals.items())]
+
+def test_daily_totals():
+    """Test that totals stay in step with tracking writes, rollups and removals."""
+    # Use a test database
+    test_db = "test_daily_totals.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    backend = tracker.backend
+    tracker.add_habits("Exercise,Reading,Meditation")
+
+    # Random writes and overwrites over the last 120 days
+    print("Testing totals under writes and overwrites...")
+    rng = random.Random(36)
+    today = datetime.now().date()
+    for _ in range(300):
+        day = (today - timedelta(days=rng.randrange(120))).strftime('%Y-%m-%d')
+        tracker.track_habit(rng.randint(1, 3), rng.random() < 0.7, day)
+    by_day = lambda date: date
+    assert backend.get_completion_totals('day') == expected_totals(tracker, by_day)
+
+    # Rollups keep totals unchanged, and writes into rolled-up months adjust them
+    if isinstance(backend, SQLiteBackend):
+        print("Testing totals across rollups...")
+        tracker.rollup_tracking(keep_days=30)
+        assert backend.get_completion_totals('day') == expected_totals(tracker, by_day)
+        for _ in range(50):
+            day = (today - timedelta(days=rng.randrange(120))).strftime('%Y-%m-%d')
+            tracker.track_habit(rng.randint(1, 3), rng.random() < 0.5, day)
+        assert backend.get_completion_totals('day') == expected_totals(tracker, by_day)
+
+    # Removing a habit takes it out of the totals, in both tiers
+    print("Testing totals after removing a habit...")
+    tracker.remove_habit(2)
+    assert backend.get_completion_totals('day') == expected_totals(tracker, by_day)
+    assert backend.get_completion_totals('month') == expected_totals(tracker, lambda date: date[:7])
+
+    # A rebuild from scratch gives the same totals
+    print("Testing rebuild...")
+    before = backend.get_completion_totals('day')
+    assert tracker.rebuild_totals() == True
+    assert backend.get_completion_totals('day') == before
+
+    # Summary output
+    print("Testing summary output...")
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_summary('year', 'json')
+    summary = json.loads(output.getvalue())
+    assert sum(row['tracked'] for row in summary) == sum(tracked for _, _, tracked in before)
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_summary('week')
+    assert output.getvalue().startswith('Week')
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, backend
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All daily totals tests passed!")
+
+if __name__ == "__main__":
+    test_daily_totals()
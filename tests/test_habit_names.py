@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for using habit names wherever an ID is accepted
+"""
+
+import os
+import gc
+from unittest.mock import patch
+from habit_tracker import HabitTracker
+
+def test_habit_names():
+    """Test name resolution for tracking, removal and check-in."""
+    # Use a test database
+    test_db = "test_habit_names.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    tracker.add_habits("Exercise,Drink Water,Reading")
+
+    # Resolution
+    print("Testing name resolution...")
+    assert tracker.resolve_habit("Drink Water") == 2
+    assert tracker.resolve_habit(" 3 ") == 3
+    assert tracker.resolve_habit("Nope") is None
+    assert tracker.resolve_habits("Exercise,3") == [1, 3]
+    assert tracker.resolve_habits("Exercise,Nope") is None
+
+    # Short commands accept names
+    print("Testing short commands with names...")
+    assert tracker.parse_short_command(["+Exercise"]) == True
+    assert tracker.parse_short_command(["-Drink Water"]) == True
+    assert tracker.parse_short_command(["+Nope"]) == False
+    assert tracker.parse_short_command(["+"]) == False
+    assert tracker.calculate_current_streak(1) == 1
+    assert tracker.parse_short_command(["+2"]) == True
+
+    # Check-in can be limited to named habits
+    print("Testing check-in for selected habits...")
+    with patch('builtins.input', side_effect=['y']) as mocked_input:
+        assert tracker.checkin(habits_str="Reading") == True
+        assert mocked_input.call_count == 1
+    assert tracker.calculate_current_streak(3) == 1
+
+    # Removal accepts names
+    print("Testing removal by name...")
+    assert tracker.remove_habits("Drink Water,1") == True
+    assert tracker.get_habits() == [(3, "Reading")]
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    for path in (test_db, test_db + ".complete"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print("All habit name tests passed!")
+
+if __name__ == "__main__":
+    test_habit_names()
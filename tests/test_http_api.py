@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the serve-http JSON API
+"""
+
+import os
+import gc
+import json
+import threading
+import http.client
+from io import StringIO
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from habit_tracker import HabitTracker, make_http_server
+from habit_storage import SQLiteBackend
+
+def request(port, method, path, body=None, headers=None):
+    """Send one request and return (status, headers, decoded JSON or None)."""
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request(method, path, body=None if body is None else json.dumps(body), headers=headers or {})
+    response = conn.getresponse()
+    data = response.read()
+    conn.close()
+    return response.status, response, json.loads(data) if data else None
+
+def test_http_api():
+    """Test the JSON endpoints, ETag revalidation and tracking over POST."""
+    # Use a test database
+    test_db = "test_http_api.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker and start a server on a free port
+    tracker = HabitTracker(test_db)
+    tracker.add_habits("Exercise,Reading")
+    tracker.tag_habits("Exercise", "morning")
+    server = make_http_server(tracker, port=0, quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    port = server.server_address[1]
+    today = datetime.now().date()
+    yesterday = (today - timedelta(days=1)).strftime('%Y-%m-%d')
+
+    # Read endpoints
+    print("Testing read endpoints...")
+    status, response, habits = request(port, 'GET', '/habits')
+    assert status == 200 and habits == [{'id': 1, 'name': "Exercise"}, {'id': 2, 'name': "Reading"}]
+    assert response.getheader('Content-Type') == 'application/json'
+    assert request(port, 'GET', '/habits?tag=morning')[2] == [{'id': 1, 'name': "Exercise"}]
+    calendar = request(port, 'GET', '/calendar?days=7')[2]
+    assert len(calendar) == 2 and len(calendar[0]['days']) == 7
+    assert len(request(port, 'GET', '/calendar')[2][0]['days']) == tracker.window_days
+    streaks = request(port, 'GET', '/streaks')[2]
+    assert streaks[0] == {'id': 1, 'name': "Exercise", 'current_streak': 0, 'longest_streak': 0}
+    assert request(port, 'GET', '/top?by=longest&n=1')[2][0]['rank'] == 1
+    assert request(port, 'GET', '/summary?by=day')[2] == []
+    assert request(port, 'GET', '/nothing')[0] == 404
+    assert request(port, 'GET', '/calendar?days=3')[0] == 400
+    assert request(port, 'GET', '/top?by=fastest')[0] == 400
+
+    # Unchanged data is revalidated without running any queries
+    print("Testing ETags...")
+    status, response, _ = request(port, 'GET', '/streaks')
+    etag = response.getheader('ETag')
+    with patch.object(tracker, 'iter_streak_rows') as rows, patch.object(tracker.backend, 'list_habits') as habits:
+        status, response, body = request(port, 'GET', '/streaks', headers={'If-None-Match': etag})
+    assert status == 304 and body is None and response.getheader('ETag') == etag
+    assert rows.call_count == 0 and habits.call_count == 0
+
+    # Read-only commands run against the same database leave it valid
+    if isinstance(tracker.backend, SQLiteBackend):
+        other = HabitTracker(test_db)
+        with patch('sys.stdout', new=StringIO()):
+            other.list_habits()
+            other.show_calendar()
+        del other
+        assert request(port, 'GET', '/streaks', headers={'If-None-Match': etag})[0] == 304
+
+    # Tracking over POST changes the ETag
+    print("Testing POST /track...")
+    status, _, body = request(port, 'POST', '/track', {'habit': "Exercise"})
+    assert status == 200 and body == {'id': 1, 'name': "Exercise", 'date': today.strftime('%Y-%m-%d'), 'done': True}
+    status, _, _ = request(port, 'GET', '/streaks', headers={'If-None-Match': etag})
+    assert status == 200
+    assert request(port, 'POST', '/track', {'habit': 2, 'date': "yesterday", 'done': False})[2]['date'] == yesterday
+    assert tracker.get_tracking_data(2, [yesterday]) == {yesterday: 0}
+    status, _, body = request(port, 'POST', '/track', {'tag': "morning", 'date': yesterday})
+    assert status == 200 and body['ids'] == [1]
+    assert request(port, 'GET', '/streaks')[2][0]['current_streak'] == 2
+
+    # Bad requests are refused with an error message
+    assert request(port, 'POST', '/track', {'habit': "Unknown"})[0] == 404
+    for habit in (10 ** 30, str(10 ** 30), -1, 0):
+        assert request(port, 'POST', '/track', {'habit': habit})[0] == 404
+    assert request(port, 'POST', '/track', {'habit': 1, 'done': "yes"})[0] == 400
+    status, _, body = request(port, 'POST', '/track', {'habit': 1, 'date': "-400"})
+    assert status == 400 and "not within" in body['error']
+    assert request(port, 'POST', '/track', {'tag': "evening"})[0] == 404
+    assert request(port, 'POST', '/elsewhere', {})[0] == 404
+    with patch('sys.stdout', new=StringIO()) as output:
+        status, _, body = request(port, 'GET', '/habits?tag=two%20words')
+    assert status == 400 and "Invalid tag" in body['error'] and output.getvalue() == ""
+    status, _, body = request(port, 'POST', '/track', headers={'Content-Length': 'lots'})
+    assert status == 400 and "Content-Length" in body['error']
+
+    # Stop the server and explicitly delete the tracker to ensure connections are closed
+    server.shutdown()
+    server.server_close()
+    del tracker, server
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All HTTP API tests passed!")
+
+if __name__ == "__main__":
+    test_http_api()
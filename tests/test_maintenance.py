@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for the maintain command and automatic maintenance
+"""
+
+import os
+import gc
+import sqlite3
+from habit_tracker import HabitTracker
+
+# Exercises SQLite-only features
+BACKENDS = ['sqlite']
+
+def test_maintenance():
+    """Test database statistics, checks, vacuum and automatic maintenance."""
+    # Use a test database
+    test_db = "test_maintenance.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+
+    # New databases use incremental auto-vacuum
+    print("Testing database statistics...")
+    tracker.add_habits("Exercise,Reading")
+    tracker.track_habit(1, True)
+    stats = tracker.get_db_stats()
+    assert stats['auto_vacuum'] == 'incremental'
+    assert stats['tables']['habits'][0] == 2
+    assert stats['tables']['tracking'][0] == 1
+    assert 'sqlite_autoindex_tracking_1' in stats['indexes']
+
+    # Opening an existing database does not write to it
+    counter = tracker.backend.file_change_counter()
+    HabitTracker(test_db).get_habits()
+    assert tracker.backend.file_change_counter() == counter
+
+    # Writes are counted towards the automatic maintenance threshold
+    print("Testing write counter...")
+    conn = sqlite3.connect(test_db)
+    writes = conn.execute("SELECT value FROM meta WHERE key = 'writes_since_maintenance'").fetchone()[0]
+    conn.close()
+    assert int(writes) == 3
+
+    # Full maintenance run succeeds and resets the counter
+    print("Testing full maintenance run...")
+    assert tracker.maintain(check=True, analyze=True, vacuum='full') == True
+    conn = sqlite3.connect(test_db)
+    writes = conn.execute("SELECT value FROM meta WHERE key = 'writes_since_maintenance'").fetchone()[0]
+    conn.close()
+    assert int(writes) == 0
+
+    # Reporting and checking alone leave the counter running
+    tracker.track_habit(2, True)
+    assert tracker.maintain() == True
+    assert tracker.maintain(check=True) == True
+    conn = sqlite3.connect(test_db)
+    writes = conn.execute("SELECT value FROM meta WHERE key = 'writes_since_maintenance'").fetchone()[0]
+    conn.close()
+    assert int(writes) == 1
+
+    # Incremental vacuum reclaims every free page, not just the first
+    print("Testing incremental vacuum...")
+    def free_pages_after_drop():
+        conn = sqlite3.connect(test_db)
+        conn.execute('CREATE TABLE filler (data BLOB)')
+        conn.executemany('INSERT INTO filler VALUES (?)', [(b'x' * 4000,) for _ in range(50)])
+        conn.commit()
+        conn.execute('DROP TABLE filler')
+        conn.commit()
+        free_pages = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.close()
+        return free_pages
+    assert free_pages_after_drop() >= 50
+    assert tracker.maintain(vacuum='incremental') == True
+    assert tracker.get_db_stats()['free_pages'] == 0
+
+    # The automatic pass reclaims its full quota of pages
+    free_pages = free_pages_after_drop()
+    tracker.AUTO_VACUUM_PAGES = 20
+    assert tracker._maybe_auto_maintain() == True
+    assert tracker.get_db_stats()['free_pages'] == free_pages - 20
+    assert tracker.maintain(vacuum='incremental') == True
+
+    # Automatic maintenance kicks in once the write threshold is reached
+    print("Testing automatic maintenance...")
+    tracker.AUTO_MAINTAIN_WRITES = 2
+    assert tracker._maybe_auto_maintain() == False
+    tracker.track_habit(2, True)
+    tracker.track_habit(2, False)  # Second write reaches the threshold
+    conn = sqlite3.connect(test_db)
+    writes = conn.execute("SELECT value FROM meta WHERE key = 'writes_since_maintenance'").fetchone()[0]
+    conn.close()
+    assert int(writes) == 0
+
+    # Data is untouched by maintenance
+    assert len(tracker.get_habits()) == 2
+    assert tracker.calculate_current_streak(1) == 1
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All maintenance tests passed!")
+
+if __name__ == "__main__":
+    test_maintenance()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for the Prometheus textfile metrics exporter
+"""
+
+import os
+import gc
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import HabitTracker, build_parser
+
+# Exercises SQLite-only features
+BACKENDS = ['sqlite']
+
+def read_samples(path):
+    """Parse a .prom file into a {sample: value} dictionary."""
+    samples = {}
+    with open(path) as prom_file:
+        for line in prom_file:
+            if line.startswith('#') or not line.strip():
+                continue
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+def test_metrics():
+    """Test metric values, atomic output and skipping unchanged rewrites."""
+    # Use a test database and metrics file
+    test_db = "test_metrics.db"
+    test_prom = "test_metrics.prom"
+
+    # Remove test files if they exist
+    for path in (test_db, test_prom):
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    tracker.add_habits('Exercise,Say "hi"')
+
+    today = datetime.now().date()
+    for i in [0, 1, 2, 5, 6, 7, 8, 40]:
+        tracker.track_habit(1, True, (today - timedelta(days=i)).strftime('%Y-%m-%d'))
+    tracker.rollup_tracking(keep_days=35)  # Older rows are read from the rollup tier
+
+    # Per-habit and self metrics
+    print("Testing metric values...")
+    assert tracker.export_metrics(test_prom) == True
+    samples = read_samples(test_prom)
+    assert samples['habit_tracker_current_streak_days{habit_id="1",habit="Exercise"}'] == 3
+    assert samples['habit_tracker_longest_streak_days{habit_id="1",habit="Exercise"}'] == 4
+    assert samples['habit_tracker_done_today{habit_id="1",habit="Exercise"}'] == 1
+    assert samples['habit_tracker_completion_rate_30d{habit_id="1",habit="Exercise"}'] == round(7 / 30, 4)
+    assert samples['habit_tracker_current_streak_days{habit_id="2",habit="Say \\"hi\\""}'] == 0
+    assert samples['habit_tracker_habits'] == 2
+    assert samples['habit_tracker_table_rows{table="habits"}'] == 2
+    assert samples['habit_tracker_db_size_bytes'] > 0
+
+    # Values match the streak calculators
+    assert samples['habit_tracker_current_streak_days{habit_id="1",habit="Exercise"}'] == tracker.calculate_current_streak(1)
+    assert samples['habit_tracker_longest_streak_days{habit_id="1",habit="Exercise"}'] == tracker.calculate_longest_streak(1)
+
+    # Unchanged data is not rewritten
+    print("Testing unchanged data is skipped...")
+    with open(test_prom, 'a') as prom_file:
+        prom_file.write('# marker\n')
+    assert tracker.export_metrics(test_prom) == True
+    with open(test_prom) as prom_file:
+        assert '# marker' in prom_file.read()
+
+    # Nor by a separate run, as from cron, with nothing written in between
+    inode = os.stat(test_prom).st_ino
+    assert HabitTracker(test_db).export_metrics(test_prom) == True
+    assert HabitTracker(test_db).export_metrics(test_prom) == True
+    assert os.stat(test_prom).st_ino == inode
+    with open(test_prom) as prom_file:
+        assert '# marker' in prom_file.read()
+
+    # A write causes a rewrite
+    print("Testing changed data is rewritten...")
+    tracker.track_habit(2, True)
+    assert tracker.export_metrics(test_prom) == True
+    with open(test_prom) as prom_file:
+        assert '# marker' not in prom_file.read()
+    samples = read_samples(test_prom)
+    assert samples['habit_tracker_done_today{habit_id="2",habit="Say \\"hi\\""}'] == 1
+
+    # A missing directory is reported, not raised
+    assert tracker.export_metrics(os.path.join("missing_metrics_dir", "habits.prom")) == False
+
+    # The export interval must be positive
+    parser = build_parser()[0]
+    assert parser.parse_args(['export-metrics', '--interval', '0.5']).interval == 0.5
+    for interval in ('-1', '0', 'nan', 'soon'):
+        with patch('sys.stderr', new=StringIO()):
+            try:
+                parser.parse_args(['export-metrics', '--interval', interval])
+                assert False, f"--interval {interval} was accepted"
+            except SystemExit:
+                pass
+
+    # No temporary files are left behind
+    assert not [name for name in os.listdir('.') if name.startswith('.habit_metrics_')]
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    for path in (test_db, test_prom):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print("All metrics tests passed!")
+
+if __name__ == "__main__":
+    test_metrics()
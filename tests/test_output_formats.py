@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for machine-readable JSON/JSONL/CSV output
+"""
+
+import os
+import gc
+import csv
+import json
+from io import StringIO
+from contextlib import redirect_stdout
+from datetime import datetime, timedelta
+from habit_tracker import HabitTracker
+
+def capture(func, *args):
+    """Run func and return everything it printed."""
+    buffer = StringIO()
+    with redirect_stdout(buffer):
+        func(*args)
+    return buffer.getvalue()
+
+def test_output_formats():
+    """Test the list, streaks and calendar views in every machine format."""
+    # Use a test database
+    test_db = "test_output_formats.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    tracker.add_habits("Exercise,Reading")
+
+    today = datetime.now().date()
+    yesterday = (today - timedelta(days=1)).strftime('%Y-%m-%d')
+    for i in range(3):
+        tracker.track_habit(1, True, (today - timedelta(days=i)).strftime('%Y-%m-%d'))
+    tracker.track_habit(2, False, yesterday)
+
+    # JSON list
+    print("Testing list output...")
+    habits = json.loads(capture(tracker.list_habits, 'json'))
+    assert habits == [{'id': 1, 'name': 'Exercise'}, {'id': 2, 'name': 'Reading'}]
+
+    # JSON lines streaks
+    print("Testing streaks output...")
+    lines = capture(tracker.show_streaks, 'jsonl').splitlines()
+    assert [json.loads(line) for line in lines] == [
+        {'id': 1, 'name': 'Exercise', 'current_streak': 3, 'longest_streak': 3},
+        {'id': 2, 'name': 'Reading', 'current_streak': 0, 'longest_streak': 0},
+    ]
+
+    # JSON calendar
+    print("Testing calendar output...")
+    output = capture(tracker.show_calendar, 'json')
+    assert '\033[' not in output
+    calendar = json.loads(output)
+    assert len(calendar) == 2
+    assert len(calendar[0]['days']) == 30
+    assert calendar[0]['days'][yesterday] == True
+    assert calendar[1]['days'][yesterday] == False
+    assert calendar[1]['days'][today.strftime('%Y-%m-%d')] is None
+    assert calendar[0]['current_streak'] == 3
+
+    # CSV calendar
+    output = capture(tracker.show_calendar, 'csv')
+    assert '\033[' not in output
+    rows = list(csv.DictReader(StringIO(output)))
+    assert rows[0]['name'] == 'Exercise'
+    assert rows[0][yesterday] == '1'
+    assert rows[1][yesterday] == '0'
+    assert rows[1][today.strftime('%Y-%m-%d')] == ''
+    assert rows[0]['longest_streak'] == '3'
+
+    # Empty databases still produce valid machine output
+    print("Testing empty output...")
+    tracker.remove_habits("1,2")
+    assert json.loads(capture(tracker.show_calendar, 'json')) == []
+    assert capture(tracker.show_streaks, 'jsonl') == ''
+    assert capture(tracker.list_habits, 'csv').strip() == 'id,name'
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All output format tests passed!")
+
+if __name__ == "__main__":
+    test_output_formats()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for parallel streak recomputation
+"""
+
+import os
+import gc
+import sqlite3
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import HabitTracker
+from habit_storage import SQLiteBackend, StorageError
+
+def test_recompute():
+    """Test that recompute matches the serial streak calculation and stores every habit."""
+    # Use a test database
+    test_db = "test_recompute.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker with habits on different schedules and histories
+    tracker = HabitTracker(test_db)
+    backend = tracker.backend
+    tracker.add_habits(",".join(f"Habit {i}" for i in range(1, 11)))
+    tracker.remove_habit(4)
+    tracker.set_schedules("Habit 2", "3/week")
+    tracker.set_schedules("Habit 3", "mon,wed,fri")
+    today = datetime.now().date()
+    for habit_id in (1, 2, 3, 5, 6, 7, 8, 9):
+        for i in range(500):
+            if (i + habit_id) % (habit_id + 2) != 0:
+                backend.upsert_tracking(habit_id, (today - timedelta(days=i)).strftime('%Y-%m-%d'), True)
+    if isinstance(backend, SQLiteBackend):
+        # Old history of one habit lives in the rolled-up tier
+        with patch('sys.stdout', new=StringIO()):
+            tracker.rollup_tracking(keep_days=100)
+
+    expected = {habit_id: tracker.calculate_streaks(habit_id) for habit_id, _ in tracker.get_habits()}
+
+    # Worker processes and the in-process path store the same statistics
+    print("Testing recompute...")
+    for workers in (3, 1):
+        with patch('sys.stdout', new=StringIO()) as output:
+            assert tracker.recompute_streaks(workers) == True
+        assert "Recomputing streaks: 9/9 habits" in output.getvalue()
+        stats = backend.get_habit_stats()
+        assert sorted(stats) == [1, 2, 3, 5, 6, 7, 8, 9, 10]
+        ranked = {habit_id: value for habit_id, _, value in tracker.rank_habits('current')}
+        assert ranked == {habit_id: current for habit_id, (current, _) in expected.items()}
+        assert {habit_id: row[0] for habit_id, row in stats.items()} == {
+            habit_id: longest for habit_id, (_, longest) in expected.items()}
+
+    # At least one worker is needed
+    with patch('sys.stdout', new=StringIO()):
+        assert tracker.recompute_streaks(0) == False
+        assert tracker.recompute_streaks(-1) == False
+
+    # Workers only read the database
+    if isinstance(backend, SQLiteBackend):
+        reader = SQLiteBackend(test_db, read_only=True)
+        assert dict(reader.iter_done_dates_by_habit(id_range=(2, 3))).keys() == {2, 3}
+        try:
+            reader.add_habit("Not allowed")
+            assert False, "read-only backend accepted a write"
+        except StorageError:
+            pass
+        conn = sqlite3.connect(test_db)
+        assert conn.execute("SELECT COUNT(*) FROM habits WHERE name = 'Not allowed'").fetchone()[0] == 0
+        conn.close()
+
+    # Nothing to do without habits
+    empty = HabitTracker(backend='memory')
+    with patch('sys.stdout', new=StringIO()):
+        assert empty.recompute_streaks() == False
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, backend, empty
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All recompute tests passed!")
+
+if __name__ == "__main__":
+    test_recompute()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for habit reminders and the reminder daemon
+"""
+
+import os
+import gc
+import sys
+import asyncio
+import shlex
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import HabitTracker, ReminderScheduler, build_parser
+from habit_schedule import WEEKDAYS
+
+def test_remind():
+    """Test reminder times, the timer heap and the command hook."""
+    # Use a test database and hook output file
+    test_db = "test_remind.db"
+    hook_output = "test_remind_hook.txt"
+
+    # Remove leftovers if they exist
+    for path in (test_db, hook_output):
+        if os.path.exists(path):
+            os.remove(path)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    backend = tracker.backend
+    tracker.add_habits("Exercise,Reading,Swimming,Guitar")
+
+    # Reminder times are validated and normalized
+    print("Testing reminder times...")
+    assert tracker.set_reminders("Exercise", "9:00") == True
+    assert tracker.set_reminders("Reading,Swimming", "09:30") == True
+    assert tracker.set_reminders("Guitar", "25:00") == False
+    assert tracker.set_reminders("99", "10:00") == False
+    assert backend.get_reminders() == {1: "09:00", 2: "09:30", 3: "09:30"}
+    assert tracker.set_reminders("Swimming", "off") == True
+    assert tracker.set_reminders("Swimming", "09:30") == True
+
+    # Reading is already done today; Swimming is not scheduled today
+    today = datetime.now().date()
+    tracker.track_habit(2, True)
+    tracker.set_schedules("Swimming", ",".join(day for weekday, day in enumerate(WEEKDAYS) if weekday != today.weekday()))
+    at = lambda hour, minute, days=0: datetime.combine(today + timedelta(days=days), datetime.min.time()).replace(
+        hour=hour, minute=minute)
+
+    # The scheduler sleeps until the earliest deadline, at most poll seconds
+    print("Testing the timer heap...")
+    scheduler = ReminderScheduler(tracker, poll=10000)
+    assert scheduler.due(at(8, 0)) == []
+    assert scheduler.seconds_until_next(at(8, 0)) == 3600
+    assert ReminderScheduler(tracker, poll=5).seconds_until_next(at(8, 0)) == 5
+
+    # Due reminders check only their own habit and date
+    with patch.object(backend, 'get_tracking', wraps=backend.get_tracking) as lookups:
+        assert scheduler.due(at(9, 45)) == [(1, "Exercise", today.strftime('%Y-%m-%d'))]
+    assert sorted(call.args for call in lookups.call_args_list) == [(1, [today.strftime('%Y-%m-%d')]),
+                                                                    (2, [today.strftime('%Y-%m-%d')])]
+
+    # Reminders are reloaded only when the data changes, and never fire twice
+    print("Testing reloads...")
+    with patch.object(backend, 'get_reminders', wraps=backend.get_reminders) as reloads:
+        assert scheduler.due(at(9, 50)) == []
+        assert reloads.call_count == 0
+        tracker.set_reminders("Guitar", "09:55")
+        assert scheduler.due(at(9, 56)) == [(4, "Guitar", today.strftime('%Y-%m-%d'))]
+        assert reloads.call_count == 1
+    assert scheduler.due(at(23, 0)) == []
+
+    # Reminders come round again the next day
+    tracker.track_habit(1, True, (today + timedelta(days=1)).strftime('%Y-%m-%d'))
+    due_tomorrow = [habit_id for habit_id, _, _ in scheduler.due(at(10, 0, days=1))]
+    assert due_tomorrow == [2, 3, 4]
+
+    # The hook runs with the habit in its environment
+    print("Testing the command hook...")
+    script = f"import os; open({hook_output!r}, 'w').write(os.environ['HABIT_NAME'] + ' ' + os.environ['HABIT_DATE'])"
+    hook_scheduler = ReminderScheduler(tracker, hook=f"{shlex.quote(sys.executable)} -c {shlex.quote(script)}")
+    asyncio.run(hook_scheduler.fire(1, "Exercise", "2024-01-15"))
+    with open(hook_output) as hook_file:
+        assert hook_file.read() == "Exercise 2024-01-15"
+
+    # A slow hook does not hold up later reminders or reloads
+    print("Testing slow hooks...")
+    slow_hook = f"{shlex.quote(sys.executable)} -c 'import time; time.sleep(30)'"
+    slow_scheduler = ReminderScheduler(tracker, hook=slow_hook, poll=0.05)
+    reminders = [[(1, "Exercise", "2024-01-15"), (2, "Reading", "2024-01-15")]]
+    polls = []
+    slow_scheduler.due = lambda now: polls.append(now) or (reminders.pop() if reminders else [])
+
+    async def run_briefly():
+        loop = asyncio.create_task(slow_scheduler.run())
+        await asyncio.sleep(0.5)
+        running = len(slow_scheduler.running)
+        loop.cancel()
+        for task in list(slow_scheduler.running):
+            task.cancel()
+        await asyncio.gather(loop, *slow_scheduler.running, return_exceptions=True)
+        return running
+    assert asyncio.run(run_briefly()) == 2
+    assert len(polls) > 2
+
+    # Hooks that hang are stopped
+    slow_scheduler.HOOK_TIMEOUT = 0.2
+    with patch('sys.stdout', new=StringIO()) as output:
+        asyncio.run(slow_scheduler.fire(1, "Exercise", "2024-01-15"))
+    assert "did not finish" in output.getvalue()
+
+    # The poll interval must be positive
+    with patch('sys.stdout', new=StringIO()):
+        assert tracker.remind(poll=0) == False
+    with patch('sys.stderr', new=StringIO()):
+        try:
+            build_parser()[0].parse_args(['remind', '--daemon', '--poll', '0'])
+            assert False, "--poll 0 was accepted"
+        except SystemExit:
+            pass
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, backend, scheduler, hook_scheduler, slow_scheduler
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    for path in (test_db, hook_output):
+        if os.path.exists(path):
+            os.remove(path)
+
+    print("All reminder tests passed!")
+
+if __name__ == "__main__":
+    test_remind()
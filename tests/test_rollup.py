@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for rolling old tracking rows up into monthly summaries
+"""
+
+import os
+import gc
+import sqlite3
+from datetime import datetime, timedelta
+from habit_tracker import HabitTracker
+
+# Exercises SQLite-only features
+BACKENDS = ['sqlite']
+
+def test_rollup():
+    """Test that rollups shrink the tracking table without changing results."""
+    # Use a test database
+    test_db = "test_rollup.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    tracker.add_habits("Exercise,Reading")
+
+    today = datetime.now().date()
+
+    # Habit 1: a 70-day streak ending today, crossing several month boundaries
+    for i in range(70):
+        tracker.track_habit(1, True, (today - timedelta(days=i)).strftime('%Y-%m-%d'))
+
+    # Habit 2: alternating done/not done 100-200 days ago
+    for i in range(100, 200):
+        tracker.track_habit(2, i % 2 == 0, (today - timedelta(days=i)).strftime('%Y-%m-%d'))
+
+    old_date = (today - timedelta(days=150)).strftime('%Y-%m-%d')
+    before = {
+        'current': [tracker.calculate_current_streak(1), tracker.calculate_current_streak(2)],
+        'longest': [tracker.calculate_longest_streak(1), tracker.calculate_longest_streak(2)],
+        'all': [tracker.get_all_tracking_data(1), tracker.get_all_tracking_data(2)],
+        'old': tracker.get_tracking_data(2, [old_date]),
+    }
+
+    # Roll up everything before the current month
+    print("Testing rollup...")
+    assert tracker.rollup_tracking(keep_days=0) == True
+
+    conn = sqlite3.connect(test_db)
+    cutoff = today.replace(day=1).strftime('%Y-%m-%d')
+    assert conn.execute('SELECT COUNT(*) FROM tracking WHERE date < ?', (cutoff,)).fetchone()[0] == 0
+    assert conn.execute('SELECT COUNT(*) FROM tracking_rollup').fetchone()[0] > 0
+    conn.close()
+
+    # Streaks and reads are unchanged across both tiers
+    print("Testing results are unchanged...")
+    assert [tracker.calculate_current_streak(1), tracker.calculate_current_streak(2)] == before['current']
+    assert [tracker.calculate_longest_streak(1), tracker.calculate_longest_streak(2)] == before['longest']
+    assert [tracker.get_all_tracking_data(1), tracker.get_all_tracking_data(2)] == before['all']
+    assert tracker.get_tracking_data(2, [old_date]) == before['old']
+
+    # Rolling up again is a no-op
+    assert tracker.rollup_tracking(keep_days=0) == True
+    assert tracker.get_all_tracking_data(1) == before['all'][0]
+
+    # Raw rows written into a rolled-up month override the summary
+    print("Testing writes into rolled-up months...")
+    break_date = (today - timedelta(days=50)).strftime('%Y-%m-%d')
+    if break_date < cutoff:
+        tracker.track_habit(1, False, break_date)
+        assert tracker.get_tracking_data(1, [break_date]) == {break_date: 0}
+        assert tracker.calculate_longest_streak(1) == 50
+        assert tracker.calculate_current_streak(1) == 50
+
+        # A second rollup folds the override into the summary
+        tracker.rollup_tracking(keep_days=0)
+        assert tracker.get_tracking_data(1, [break_date]) == {break_date: 0}
+        assert tracker.calculate_longest_streak(1) == 50
+
+    # Removing a habit removes its summaries as well
+    tracker.remove_habit(2)
+    conn = sqlite3.connect(test_db)
+    assert conn.execute('SELECT COUNT(*) FROM tracking_rollup WHERE habit_id = 2').fetchone()[0] == 0
+    conn.close()
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All rollup tests passed!")
+
+if __name__ == "__main__":
+    test_rollup()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test script for habit schedules and period-based streaks
+"""
+
+import os
+import gc
+import sqlite3
+from datetime import date, datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import HabitTracker
+from habit_schedule import WEEKDAYS, Schedule, streaks_from_dates
+from habit_storage import SQLiteBackend
+
+def test_schedules():
+    """Test schedule parsing, period streaks and schedule-aware views."""
+    # Use a test database
+    test_db = "test_schedules.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Schedule specs are validated and normalized
+    print("Testing schedule parsing...")
+    assert str(Schedule("Friday, mon,Wed")) == "mon,wed,fri"
+    assert str(Schedule(" 3 / Week ")) == "3/week"
+    for invalid in ["8/week", "0/month", "3/year", "mo", "funday"]:
+        try:
+            Schedule(invalid)
+            assert False, f"'{invalid}' must be rejected"
+        except ValueError:
+            pass
+
+    # Period streaks on fixed dates (2024-01-01 is a Monday)
+    print("Testing period streaks...")
+    monday = date(2024, 1, 1)
+    days = lambda *offsets: [monday + timedelta(days=offset) for offset in offsets]
+    weekly = Schedule("2/week")
+    done = days(0, 3, 8, 9, 14, 21, 22)  # weeks 1, 2 and 4 meet the target
+    assert streaks_from_dates(done, monday + timedelta(days=23), weekly) == (1, 2)
+    # The week in progress does not break the streak, a missed week does
+    assert streaks_from_dates(done, monday + timedelta(days=29), weekly) == (1, 2)
+    assert streaks_from_dates(done, monday + timedelta(days=36), weekly) == (0, 2)
+
+    # Weekday schedules ignore unscheduled days and skip over them
+    mwf = Schedule("mon,wed,fri")
+    done = days(0, 1, 2, 4, 7, 9)  # Tuesday does not count
+    assert streaks_from_dates(done, monday + timedelta(days=9), mwf) == (5, 5)
+    assert streaks_from_dates(done, monday + timedelta(days=10), mwf) == (5, 5)  # Thursday: Friday is still ahead
+    assert streaks_from_dates(done, monday + timedelta(days=12), mwf) == (0, 5)  # Friday was missed
+
+    # Daily schedules keep the original rule: today must be done
+    daily = Schedule()
+    assert streaks_from_dates(days(0, 1, 2), monday + timedelta(days=2), daily) == (3, 3)
+    assert streaks_from_dates(days(0, 1, 2), monday + timedelta(days=3), daily) == (0, 3)
+
+    # Schedules are stored per habit
+    print("Testing stored schedules...")
+    tracker = HabitTracker(test_db)
+    tracker.add_habits("Gym,Swimming")
+    assert tracker.set_schedules("Gym", "3/week") == True
+    assert tracker.set_schedules("Gym", "9/week") == False
+    assert tracker.set_schedules("99", "daily") == False
+    assert str(tracker.get_schedule(1)) == "3/week"
+    assert str(tracker.get_schedule(2)) == "daily"
+
+    # Three gym days in each of the last two full weeks; this week is in progress
+    today = datetime.now().date()
+    this_week = today - timedelta(days=today.weekday())
+    for week in (1, 2):
+        for offset in range(3):
+            tracker.track_habit(1, True, (this_week - timedelta(weeks=week, days=-offset)).strftime('%Y-%m-%d'))
+    assert tracker.calculate_current_streak(1) == 2
+    assert tracker.calculate_longest_streak(1) == 2
+
+    # The calendar marks days a habit is not scheduled on
+    print("Testing schedule-aware calendar and check-in...")
+    tracker.set_schedules("Swimming", ",".join(day for weekday, day in enumerate(WEEKDAYS) if weekday != today.weekday()))
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_calendar()
+    swimming_row = [line for line in output.getvalue().splitlines() if 'Swimming' in line][0]
+    assert swimming_row.count(' . ') == sum(1 for i in range(30) if i % 7 == 0)
+
+    # Check-in skips habits that are not due on the day
+    with patch('builtins.input', side_effect=['s']) as prompt, patch('sys.stdout', new=StringIO()) as output:
+        assert tracker.checkin() == True
+    assert prompt.call_count == 1
+    assert "Swimming is not scheduled" in output.getvalue()
+    assert "Progress this week: 0/3" in output.getvalue()
+
+    # Databases from before schedules existed are migrated
+    if isinstance(tracker.backend, SQLiteBackend):
+        print("Testing schema migration...")
+        del tracker
+        gc.collect()
+        os.remove(test_db)
+        conn = sqlite3.connect(test_db)
+        conn.execute('CREATE TABLE habits (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL)')
+        conn.execute("INSERT INTO habits (name) VALUES ('Old habit')")
+        conn.commit()
+        conn.close()
+        tracker = HabitTracker(test_db)
+        assert str(tracker.get_schedule(1)) == "daily"
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All schedule tests passed!")
+
+if __name__ == "__main__":
+    test_schedules()
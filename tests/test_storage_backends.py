@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for the storage backend interface
+"""
+
+import os
+import gc
+from habit_tracker import HabitTracker
+from habit_storage import DuplicateHabitError, MemoryBackend, SQLiteBackend
+
+def test_storage_backends():
+    """Test the backend operations HabitTracker relies on."""
+    # Use a test database
+    test_db = "test_storage_backends.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker with the default backend for this run
+    tracker = HabitTracker(test_db)
+    backend = tracker.backend
+    print(f"Testing {type(backend).__name__}...")
+
+    # Habits CRUD
+    print("Testing habits CRUD...")
+    assert backend.add_habit("Exercise") == 1
+    assert backend.add_habit("Reading") == 2
+    try:
+        backend.add_habit("Exercise")
+        assert False, "Duplicate habit names must be rejected"
+    except DuplicateHabitError:
+        pass
+    assert backend.get_habit_name(2) == "Reading"
+    assert backend.get_habit_name(99) is None
+    assert backend.remove_habit(2) == True
+    assert backend.remove_habit(2) == False
+    assert backend.add_habit("Meditation") == 3  # IDs are never reused
+    assert backend.list_habits() == [(1, "Exercise"), (3, "Meditation")]
+
+    # Upserts and reads
+    print("Testing tracking reads and writes...")
+    version = backend.data_version()
+    for day, done in [(5, True), (1, True), (3, False), (2, True)]:
+        backend.upsert_tracking(1, f"2024-01-{day:02d}", done)
+    backend.upsert_tracking(1, "2024-01-03", True)  # Replaces the earlier status
+    assert backend.data_version() != version
+    assert backend.get_tracking(1, ["2024-01-03", "2024-01-04"]) == {"2024-01-03": 1}
+    assert backend.get_tracking_range(1, "2024-01-02", "2024-01-04") == [("2024-01-02", 1), ("2024-01-03", 1)]
+    assert backend.get_done_dates(1) == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-05"]
+    assert backend.get_done_dates(3) == []
+    assert dict(backend.iter_done_dates_by_habit()) == {1: backend.get_done_dates(1)}
+
+    # Streaks are computed the same way on top of any backend
+    assert tracker.calculate_longest_streak(1) == 3
+
+    # Backends can be passed as instances
+    assert isinstance(HabitTracker(backend=MemoryBackend()).backend, MemoryBackend)
+    assert isinstance(HabitTracker(test_db, backend='sqlite').backend, SQLiteBackend)
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, backend
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All storage backend tests passed!")
+
+if __name__ == "__main__":
+    test_storage_backends()
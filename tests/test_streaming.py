@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the streaming tracking history reads
+"""
+
+import os
+import gc
+from datetime import datetime, timedelta
+from habit_tracker import HabitTracker
+from habit_storage import SQLiteBackend
+
+def test_streaming():
+    """Test that streamed reads match the materialized ones across both tiers."""
+    # Use a test database
+    test_db = "test_streaming.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    tracker.add_habits("Exercise,Reading")
+    backend = tracker.backend
+
+    # 80 days of history ending today, with a missed day every 5 days
+    today = datetime.now().date()
+    for i in range(80):
+        tracker.track_habit(1, i % 5 != 2, (today - timedelta(days=i)).strftime('%Y-%m-%d'))
+
+    # Fold the older part into monthly summaries where rollups are supported
+    if isinstance(backend, SQLiteBackend):
+        tracker.rollup_tracking(keep_days=20)
+        # A raw row written into a rolled-up month overrides the summary
+        tracker.track_habit(1, False, (today - timedelta(days=60)).strftime('%Y-%m-%d'))
+
+    # Streamed reads match the materialized ones, with tiny chunks too
+    print("Testing streamed reads...")
+    all_tracking = backend.get_tracking_range(1, '0000-00-00', '9999-99-99')
+    assert len(all_tracking) == 80
+    for chunk_size in (None, 1, 3):
+        assert list(backend.iter_tracking(1, chunk_size=chunk_size)) == all_tracking
+        assert list(backend.iter_done_dates(1, chunk_size=chunk_size)) == backend.get_done_dates(1)
+
+    # Date bounds are inclusive
+    start = (today - timedelta(days=45)).strftime('%Y-%m-%d')
+    end = (today - timedelta(days=10)).strftime('%Y-%m-%d')
+    assert list(tracker.iter_tracking_data(1, start, end)) == backend.get_tracking_range(1, start, end)
+    assert list(tracker.iter_all_tracking_data(1)) == tracker.get_all_tracking_data(1)
+    assert list(tracker.iter_all_tracking_data(2)) == []
+
+    # Iterators are lazy and can be abandoned part way
+    rows = backend.iter_tracking(1, chunk_size=2)
+    assert next(rows) == all_tracking[0]
+    rows.close()
+
+    # Streaks are computed from the stream
+    print("Testing streaks from streamed history...")
+    assert tracker.calculate_current_streak(1) == 2
+    assert tracker.calculate_longest_streak(1) == 4
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, backend, rows
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All streaming tests passed!")
+
+if __name__ == "__main__":
+    test_streaming()
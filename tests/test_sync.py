@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for two-way sync between habit databases
+"""
+
+import os
+import gc
+import sqlite3
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import HabitTracker
+
+# Exercises SQLite-only features
+BACKENDS = ['sqlite']
+
+def tracking_rows(tracker):
+    """Return every tracking row keyed by habit name, for comparing databases."""
+    return {(name, date, done) for habit_id, name in tracker.get_habits()
+            for date, done in tracker.get_all_tracking_data(habit_id)}
+
+def test_sync():
+    """Test that sync merges both ways, settles conflicts and transfers only changes."""
+    # Use two test databases
+    laptop_db = "test_sync_laptop.db"
+    server_db = "test_sync_server.db"
+
+    # Remove test databases if they exist
+    for db in (laptop_db, server_db):
+        if os.path.exists(db):
+            os.remove(db)
+
+    today = datetime.now().date()
+    day = lambda i: (today - timedelta(days=i)).strftime('%Y-%m-%d')
+
+    # Habits added in different orders get different IDs on each side
+    laptop = HabitTracker(laptop_db)
+    server = HabitTracker(server_db)
+    laptop.add_habits("Exercise,Reading")
+    server.add_habits("Reading,Meditation,Exercise")
+    for i in range(60):
+        laptop.track_habit(1, i % 3 != 0, day(i))
+    for i in range(0, 60, 2):
+        server.track_habit(1, True, day(i))
+
+    # A first sync exchanges habits and rows both ways
+    print("Testing first sync...")
+    counts = laptop.backend.sync_with(server_db)
+    assert counts['habits_received'] == 1 and counts['habits_sent'] == 0
+    assert counts['rows_received'] == 30 and counts['rows_sent'] == 60
+    assert sorted(name for _, name in laptop.get_habits()) == ["Exercise", "Meditation", "Reading"]
+    assert tracking_rows(laptop) == tracking_rows(server)
+
+    # Nothing differs afterwards
+    counts = laptop.backend.sync_with(server_db)
+    assert counts['months'] == 0 and counts['rows_received'] == counts['rows_sent'] == 0
+
+    # The most recent write of a day wins, whichever side it was made on
+    print("Testing conflicts...")
+    with patch('habit_storage.time.time', return_value=2_000_000_000):
+        server.track_habit(3, False, day(1))
+    with patch('habit_storage.time.time', return_value=1_000_000_000):
+        laptop.track_habit(1, True, day(1))
+    with patch('habit_storage.time.time', return_value=2_000_000_001):
+        laptop.track_habit(2, True, day(40))
+    with patch('habit_storage.time.time', return_value=1_000_000_000):
+        server.track_habit(1, False, day(40))
+    assert server.sync(laptop_db) == True
+    assert tracking_rows(laptop) == tracking_rows(server)
+    assert laptop.get_tracking_data(1, [day(1)]) == {day(1): 0}
+    assert server.get_tracking_data(1, [day(40)]) == {day(40): 1}
+
+    # Only the months that changed are compared
+    print("Testing that only changes are transferred...")
+    server.track_habit(2, True, day(5))
+    counts = laptop.backend.sync_with(server_db)
+    assert counts['months'] == 1 and counts['rows_received'] == 1 and counts['rows_sent'] == 0
+    assert tracking_rows(laptop) == tracking_rows(server)
+
+    # Digests kept by the triggers match digests computed from scratch
+    conn = sqlite3.connect(laptop_db)
+    kept = conn.execute('SELECT habit_id, month, digest, rows FROM tracking_digest ORDER BY 1, 2').fetchall()
+    conn.execute('DROP TABLE tracking_digest')
+    conn.commit()
+    conn.close()
+    laptop = HabitTracker(laptop_db)
+    conn = sqlite3.connect(laptop_db)
+    assert conn.execute('SELECT habit_id, month, digest, rows FROM tracking_digest ORDER BY 1, 2').fetchall() == kept
+    conn.close()
+
+    # Totals and streaks follow the synced rows
+    assert laptop.backend.get_completion_totals('day') == server.backend.get_completion_totals('day')
+    assert laptop.calculate_streaks(1) == server.calculate_streaks(3)
+
+    # Differences in rolled-up months are not merged, but are reported
+    print("Testing rolled-up months...")
+    with patch('sys.stdout', new=StringIO()):
+        laptop.rollup_tracking(keep_days=1)
+    server.track_habit(2, True, day(45))
+    with patch('sys.stdout', new=StringIO()) as output:
+        assert server.sync(laptop_db) == True
+    assert "skipped" in output.getvalue() and "not synced" in output.getvalue()
+    counts = laptop.backend.sync_with(server_db)
+    assert counts['months_skipped'] >= 1 and counts['rows_received'] == counts['rows_sent'] == 0
+
+    # Syncing with itself, a missing file or a foreign database is refused
+    print("Testing sync errors...")
+    assert laptop.sync(laptop_db) == False
+    assert laptop.sync("missing.db") == False
+    foreign_db = "test_sync_foreign.db"
+    sqlite3.connect(foreign_db).execute('CREATE TABLE other (x)').connection.close()
+    assert laptop.sync(foreign_db) == False
+    os.remove(foreign_db)
+
+    # Explicitly delete the trackers to ensure connections are closed
+    del laptop, server
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    for db in (laptop_db, server_db):
+        if os.path.exists(db):
+            os.remove(db)
+
+    print("All sync tests passed!")
+
+if __name__ == "__main__":
+    test_sync()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test script for habit tags, tag filters and tag-level tracking
+"""
+
+import os
+import gc
+import json
+import sqlite3
+from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import HabitTracker
+from habit_storage import SQLiteBackend
+
+def test_tags():
+    """Test tagging habits, filtering views by tag and tracking a whole tag."""
+    # Use a test database
+    test_db = "test_tags.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    backend = tracker.backend
+    tracker.add_habits("Exercise,Reading,Meditation,Drink Water")
+
+    # Tags are validated, and only added or removed once
+    print("Testing tagging...")
+    assert tracker.tag_habits("Exercise,Meditation,Drink Water", "@morning") == True
+    assert tracker.tag_habits("Reading,Meditation", "evening") == True
+    assert tracker.tag_habits("Exercise", "two words") == False
+    assert tracker.tag_habits("Unknown", "morning") == False
+    assert backend.tag_habits([1, 99], "morning") == 0
+    assert backend.get_tags() == {1: ["morning"], 2: ["evening"], 3: ["evening", "morning"], 4: ["morning"]}
+    assert tracker.tag_habits("Drink Water", "morning", remove=True) == True
+    assert backend.list_habits("morning") == [(1, "Exercise"), (3, "Meditation")]
+    assert backend.list_habits("nothing") == []
+
+    # A whole tag is tracked at once
+    print("Testing tag-level tracking...")
+    today = datetime.now().strftime('%Y-%m-%d')
+    assert tracker.parse_short_command(["+@morning"]) == True
+    assert backend.get_tracking_for_date(today) == {1: 1, 3: 1}
+    assert tracker.parse_short_command(["-@evening"]) == True
+    assert backend.get_tracking_for_date(today) == {1: 1, 2: 0, 3: 0}
+    assert tracker.parse_short_command(["+@nothing"]) == False
+    assert tracker.track_tag("morning", True, "2024-01-15") == True
+    assert backend.get_tracking_for_date("2024-01-15") == {1: 1, 3: 1}
+
+    # Views, stats and exports only cover the tagged habits
+    print("Testing tag filters...")
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_calendar('json', tag='morning')
+    assert [row['id'] for row in json.loads(output.getvalue())] == [1, 3]
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_streaks('json', tag='evening')
+    assert [row['id'] for row in json.loads(output.getvalue())] == [2, 3]
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.list_habits('json', tag='evening')
+    assert [row['name'] for row in json.loads(output.getvalue())] == ["Reading", "Meditation"]
+    assert [habit_id for habit_id, _, _ in tracker.rank_habits('current', tag='morning')] == [1, 3]
+    assert {habit_id: dates for habit_id, dates in backend.iter_done_dates_by_habit('evening') if dates} == {
+        3: ["2024-01-15"]}
+    if isinstance(backend, SQLiteBackend):
+        current_lines = [line for line in tracker.collect_metrics('morning')
+                         if line.startswith('habit_tracker_current_streak_days{')]
+        assert len(current_lines) == 2
+
+    # Check-in only asks about the tagged habits
+    with patch('builtins.input', side_effect=['y', 'n']) as prompt, patch('sys.stdout', new=StringIO()):
+        assert tracker.checkin(tag='evening') == True
+    assert prompt.call_count == 2
+    assert backend.get_tracking_for_date(today) == {1: 1, 2: 1, 3: 0}
+
+    # Removing a habit removes its tags
+    tracker.remove_habit(3)
+    assert backend.list_habits("morning") == [(1, "Exercise")]
+    if isinstance(backend, SQLiteBackend):
+        conn = sqlite3.connect(test_db)
+        assert conn.execute('SELECT COUNT(*) FROM habit_tags WHERE habit_id = 3').fetchone()[0] == 0
+        conn.close()
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, backend
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All tag tests passed!")
+
+if __name__ == "__main__":
+    test_tags()
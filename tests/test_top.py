@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test script for the top habits ranking and the sorted calendar
+"""
+
+import os
+import gc
+import json
+import random
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import HabitTracker, build_parser
+
+def test_top():
+    """Test that rankings match a full recompute and only changed habits are recomputed."""
+    # Use a test database
+    test_db = "test_top.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker with habits on a mix of schedules
+    tracker = HabitTracker(test_db)
+    backend = tracker.backend
+    tracker.add_habits(",".join(f"Habit{i}" for i in range(1, 13)))
+    tracker.set_schedules("2,5", "3/week")
+    tracker.set_schedules("3", "mon,wed,fri")
+
+    # Random history over the last 90 days
+    rng = random.Random(37)
+    today = datetime.now().date()
+    for habit_id in range(1, 13):
+        for i in range(90):
+            if rng.random() < 0.8:
+                tracker.track_habit(habit_id, rng.random() < habit_id / 13, (today - timedelta(days=i)).strftime('%Y-%m-%d'))
+
+    def expected(key, bottom=False):
+        streaks = {habit_id: tracker.calculate_streaks(habit_id) for habit_id, _ in tracker.get_habits()}
+        value = lambda habit_id: streaks[habit_id][0 if key == 'current' else 1]
+        order = sorted(streaks, key=lambda habit_id: (value(habit_id) if bottom else -value(habit_id), habit_id))
+        return [(habit_id, value(habit_id)) for habit_id in order]
+
+    # Rankings match the streaks computed from the full history
+    print("Testing rankings...")
+    for key in ('current', 'longest'):
+        for bottom in (False, True):
+            ranked = tracker.rank_habits(key, 5, bottom)
+            assert [(habit_id, value) for habit_id, _, value in ranked] == expected(key, bottom)[:5]
+            assert len(tracker.rank_habits(key, None, bottom)) == 12
+
+    # Rates are ordered and within bounds
+    rates = [value for _, _, value in tracker.rank_habits('rate')]
+    assert rates == sorted(rates, reverse=True) and all(0 <= rate <= 1 for rate in rates)
+
+    # Statistics are stored, and a write only invalidates the habit it touches
+    print("Testing invalidation...")
+    assert sorted(backend.get_habit_stats()) == list(range(1, 13))
+    tracker.track_habit(4, True)
+    tracker.set_schedules("6", "2/week")
+    assert sorted(backend.get_habit_stats()) == [1, 2, 3, 5, 7, 8, 9, 10, 11, 12]
+    with patch.object(backend, 'iter_done_dates', wraps=backend.iter_done_dates) as reads:
+        tracker.rank_habits('current', 3)
+    assert sorted(call.args[0] for call in reads.call_args_list) == [4, 6]
+    assert [(habit_id, value) for habit_id, _, value in tracker.rank_habits('current')] == expected('current')
+
+    # Statistics computed before a concurrent write are not stored
+    marker, _ = backend.tracking_changes_since(None)
+    tracker.track_habit(7, True, (today - timedelta(days=100)).strftime('%Y-%m-%d'))
+    backend.put_habit_stats([(7, 'daily', 99, None, 0), (8, 'weekly', 99, None, 0)], marker)
+    assert 7 not in backend.get_habit_stats()
+    assert backend.get_habit_stats()[8][0] != 99
+
+    # Removed habits drop out of the ranking
+    tracker.remove_habit(12)
+    assert 12 not in [habit_id for habit_id, _, _ in tracker.rank_habits('longest')]
+
+    # Output formats
+    print("Testing top and sorted calendar output...")
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_top('longest', 3, fmt='json')
+    top = json.loads(output.getvalue())
+    assert [row['id'] for row in top] == [habit_id for habit_id, _ in expected('longest')[:3]]
+    assert top[0]['rank'] == 1 and 'longest' in top[0]
+
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_calendar('json', sort_by='longest', limit=3)
+    assert [row['id'] for row in json.loads(output.getvalue())] == [row['id'] for row in top]
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_calendar(limit=2)
+    assert len(output.getvalue().splitlines()) == 4
+
+    # Counts must be positive
+    parser = build_parser()[0]
+    assert parser.parse_args(['calendar', '--sort', 'longest', '--limit', '3']).limit == 3
+    for args in (['calendar', '--limit', '-3'], ['calendar', '--limit', '0'], ['top', '-n', '-1']):
+        with patch('sys.stderr', new=StringIO()):
+            try:
+                parser.parse_args(args)
+                assert False, f"{args} was accepted"
+            except SystemExit:
+                pass
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, backend
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All top habits tests passed!")
+
+if __name__ == "__main__":
+    test_top()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Test script for the incrementally updated calendar used by the watch command
+"""
+
+import os
+import gc
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import CalendarWatcher, HabitTracker, build_parser
+
+def test_watch():
+    """Test that the watcher redraws only changed lines and rolls forward at midnight."""
+    # Use a test database
+    test_db = "test_watch.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    watcher = CalendarWatcher(tracker)
+    today = datetime.now().date()
+
+    # An empty database shows the placeholder line
+    print("Testing empty view...")
+    assert watcher.poll(today) == [(0, "No habits found. Add some habits to start tracking!")]
+
+    tracker.add_habits("Exercise,Reading,Meditation")
+    tracker.track_habit(1, True, (today - timedelta(days=1)).strftime('%Y-%m-%d'))
+    tracker.track_habit(1, True)
+
+    # The first poll after adding habits draws the header and every row
+    print("Testing initial draw...")
+    updates = watcher.poll(today)
+    assert [line_no for line_no, _ in updates] == [0, 1, 2, 3, 4]
+    assert watcher.lines[2] == tracker._format_calendar_row(1, "Exercise", [None] * 28 + [True, True], 2, 2)
+
+    # Nothing changed, nothing is redrawn
+    assert watcher.poll(today) == []
+
+    # Only the line of the tracked habit is redrawn
+    print("Testing diff-based redraw...")
+    tracker.track_habit(3, True)
+    updates = watcher.poll(today)
+    assert updates == [(4, tracker._format_calendar_row(3, "Meditation", [None] * 29 + [True], 1, 1))]
+
+    # Removing a habit shortens the view
+    tracker.remove_habit(2)
+    watcher.poll(today)
+    assert len(watcher.lines) == 4
+
+    # Rolling over midnight shifts the window without re-reading streak history
+    print("Testing midnight roll forward...")
+    tomorrow = today + timedelta(days=1)
+    loads = []
+    load_habit = watcher._load_habit
+    watcher._load_habit = lambda habit_id, habit_name: loads.append(habit_id) or load_habit(habit_id, habit_name)
+    updates = watcher.poll(tomorrow)
+    assert loads == []
+    assert updates[0][1] == tracker._format_calendar_header(tracker._calendar_dates(tomorrow))[0]
+    assert watcher.rows[1][1] == [None] * 27 + [True, True, None]
+    assert watcher.rows[1][2] == 0 and watcher.rows[1][3] == 2
+
+    # The incremental view matches a full rebuild
+    rebuilt = CalendarWatcher(tracker)
+    rebuilt.poll(tomorrow)
+    assert rebuilt.lines == watcher.lines
+
+    # The refresh interval must be positive
+    parser = build_parser()[0]
+    assert parser.parse_args(['watch', '--interval', '0.2']).interval == 0.2
+    for interval in ('-1', '0'):
+        with patch('sys.stderr', new=StringIO()):
+            try:
+                parser.parse_args(['watch', '--interval', interval])
+                assert False, f"--interval {interval} was accepted"
+            except SystemExit:
+                pass
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, watcher, rebuilt
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All watch tests passed!")
+
+if __name__ == "__main__":
+    test_watch()
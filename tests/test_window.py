@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for the tracking window and relative days
+"""
+
+import os
+import gc
+import json
+from datetime import date, datetime, timedelta
+from io import StringIO
+from unittest.mock import patch
+from habit_tracker import CalendarWatcher, HabitTracker
+from habit_storage import SQLiteBackend
+
+def test_window():
+    """Test day resolution, the window setting and the views that use it."""
+    # Use a test database
+    test_db = "test_window.db"
+
+    # Remove test database if it exists
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    # Initialize the tracker
+    tracker = HabitTracker(test_db)
+    tracker.add_habits("Exercise,Reading")
+    assert tracker.window_days == 30
+
+    # Days resolve to the most recent matching date, today included
+    print("Testing day resolution...")
+    friday = date(2024, 3, 1)
+    with patch('sys.stdout', new=StringIO()):
+        assert tracker._convert_day_to_date("1", friday) == "2024-03-01"
+        assert tracker._convert_day_to_date("15", friday) == "2024-02-15"
+        assert tracker._convert_day_to_date("today", friday) == "2024-03-01"
+        assert tracker._convert_day_to_date("Yesterday", friday) == "2024-02-29"
+        assert tracker._convert_day_to_date("-3", friday) == "2024-02-27"
+        assert tracker._convert_day_to_date("fri", friday) == "2024-03-01"
+        assert tracker._convert_day_to_date("thursday", friday) == "2024-02-29"
+        assert tracker._convert_day_to_date("sun", friday) == "2024-02-25"
+        # There is no 30th or 31st in February
+        assert tracker._convert_day_to_date("30", friday) is None
+        assert tracker._convert_day_to_date("-30", friday) is None
+        for bad_day in ("0", "32", "someday", "-x"):
+            assert tracker._convert_day_to_date(bad_day, friday) is None
+
+    # The window is validated and stored in the database
+    print("Testing the window setting...")
+    assert tracker.set_window(6) == False
+    assert tracker.set_window(367) == False
+    assert tracker.set_window(90) == True
+    assert tracker.window_days == 90
+    assert tracker._convert_day_to_date("30", friday) == "2024-01-30"
+    assert tracker._convert_day_to_date("31", friday) == "2024-01-31"
+    assert tracker._convert_day_to_date("-89", friday) == "2023-12-03"
+    if isinstance(tracker.backend, SQLiteBackend):
+        assert HabitTracker(test_db).window_days == 90
+
+    # The views share one list of dates that follows the window
+    dates = tracker._calendar_dates()
+    assert len(dates) == 90 and dates[-1] == datetime.now().strftime('%Y-%m-%d')
+    assert tracker._calendar_dates() is dates
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_calendar('json')
+    assert len(json.loads(output.getvalue())[0]['days']) == 90
+    with patch('sys.stdout', new=StringIO()) as output:
+        tracker.show_calendar()
+    assert len(output.getvalue().splitlines()[1]) == 20 + 90 * 3 + 15 + 15
+
+    # Long-running views follow a window set elsewhere
+    print("Testing window changes from another process...")
+    watcher = CalendarWatcher(tracker)
+    watcher.poll()
+    assert len(watcher.dates) == 90
+    other = HabitTracker(test_db) if isinstance(tracker.backend, SQLiteBackend) else tracker
+    with patch('sys.stdout', new=StringIO()):
+        assert other.set_window(14) == True
+    assert tracker.window_days == 14 and len(tracker._calendar_dates()) == 14
+    watcher.poll()
+    assert len(watcher.dates) == 14 and len(watcher.rows[1][1]) == 14
+    with patch('sys.stdout', new=StringIO()):
+        assert other.set_window(90) == True
+    assert tracker.window_days == 90
+
+    # Relative days work for quick tracking and check-in
+    print("Testing relative days in commands...")
+    today = datetime.now().date()
+    days_ago = lambda n: (today - timedelta(days=n)).strftime('%Y-%m-%d')
+    assert tracker.track_habit(1, True, "-3") == True
+    assert tracker.parse_short_command(["-2", "on", "yesterday"]) == True
+    assert tracker.parse_short_command(["+1", "on", today.strftime('%A')]) == True
+    assert tracker.get_tracking_data(1, [days_ago(3), days_ago(0)]) == {days_ago(3): 1, days_ago(0): 1}
+    assert tracker.get_tracking_data(2, [days_ago(1)]) == {days_ago(1): 0}
+    assert tracker.track_habit(1, True, "-90") == False
+    with patch('builtins.input', side_effect=['y', 'y']), patch('sys.stdout', new=StringIO()):
+        assert tracker.checkin("-60") == True
+    assert tracker.get_tracking_data(2, [days_ago(60)]) == {days_ago(60): 1}
+
+    # Explicitly delete the tracker to ensure connection is closed
+    del tracker, watcher, other
+    gc.collect()  # Force garbage collection
+
+    # Clean up
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    print("All window tests passed!")
+
+if __name__ == "__main__":
+    test_window()